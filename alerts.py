@@ -0,0 +1,222 @@
+"""Low-stock alerts driven by reorder points.
+
+A product is low on stock when its quantity drops below its reorder
+point: its own threshold when one is set, otherwise the global one.
+``LowStockMonitor`` follows the store events and keeps the products in a
+priority queue ordered by headroom (quantity minus reorder point), so:
+
+- every mutation costs O(log n) and raises an alert only when a product
+  crosses into low stock, not on every change while it stays low
+- the low-stock report reads the most urgent products straight from the
+  queue, without scanning the inventory
+
+Alerts go to a pluggable ``sink`` callable; ``file_sink`` appends them to
+a local CSV file.
+"""
+import csv
+import datetime
+import heapq
+import os
+
+from listeners import InventoryListener
+from utils import normalize_name
+
+# Reorder point of products without their own threshold
+DEFAULT_REORDER_THRESHOLD = 5
+
+
+class LowStockAlert:
+    """A product that just dropped below its reorder point."""
+
+    __slots__ = ("name", "quantity", "threshold")
+
+    def __init__(self, name, quantity, threshold):
+        self.name = name
+        self.quantity = quantity
+        self.threshold = threshold
+
+    def __repr__(self):
+        return f"LowStockAlert({self.name!r}, quantity={self.quantity}, threshold={self.threshold})"
+
+    def __str__(self):
+        return f"Low stock: {self.name} has {self.quantity} units (reorder point {self.threshold})."
+
+
+def file_sink(path):
+    """Return a sink appending every alert to ``path`` as time,name,quantity,threshold."""
+    def deliver(alert):
+        new_file = not os.path.exists(path)
+        with open(path, "a", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(["time", "name", "quantity", "threshold"])
+            writer.writerow([
+                datetime.datetime.now().isoformat(timespec="seconds"),
+                alert.name, alert.quantity, alert.threshold,
+            ])
+    return deliver
+
+
+class LowStockMonitor(InventoryListener):
+    """Reorder thresholds and a headroom priority queue over an inventory.
+
+    Parameters
+    ----------
+    default_threshold : int, optional
+        Global reorder point.
+    sink : callable, optional
+        Called with each ``LowStockAlert``; alerts are dropped when None.
+
+    The queue is a min-heap of (headroom, key) with lazy deletion: a
+    changed product pushes a new entry and stale entries are skipped
+    when read, as in ``stats._MaxTracker``. Threshold changes update the
+    queue but do not raise alerts.
+    """
+
+    def __init__(self, default_threshold=DEFAULT_REORDER_THRESHOLD, sink=None):
+        self.default_threshold = default_threshold
+        self.thresholds = {}
+        self.sink = sink
+        self._products = {}
+        self._headroom = {}
+        self._heap = []
+
+    def threshold_for(self, key):
+        return self.thresholds.get(key, self.default_threshold)
+
+    def _set(self, key, quantity):
+        headroom = quantity - self.threshold_for(key)
+        was_low = self._headroom.get(key, 0) < 0
+        self._headroom[key] = headroom
+        heapq.heappush(self._heap, (headroom, key))
+        # Keep stale entries from outgrowing the live ones
+        if len(self._heap) > 2 * len(self._headroom) + 64:
+            self._rebuild_heap()
+        else:
+            self._prune()
+        return headroom < 0 and not was_low
+
+    def _prune(self):
+        """Pop the stale entries at the top of the queue (amortized O(log n))."""
+        heap = self._heap
+        current = self._headroom
+        while heap and current.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _alert(self, key):
+        if self.sink is not None:
+            name, quantity = self._products[key]
+            self.sink(LowStockAlert(name, quantity, self.threshold_for(key)))
+
+    def _rebuild_heap(self):
+        self._heap = [(headroom, key) for key, headroom in self._headroom.items()]
+        heapq.heapify(self._heap)
+
+    def rebuild(self, store):
+        """Load the products of ``store`` without raising alerts."""
+        self._products = {store.key_for(name): (name, quantity) for name, _, quantity in store.iter_rows()}
+        self._recompute()
+
+    def _recompute(self):
+        threshold_for = self.threshold_for
+        self._headroom = {key: quantity - threshold_for(key) for key, (_, quantity) in self._products.items()}
+        self._rebuild_heap()
+
+    def on_insert(self, key, name, price, quantity):
+        self._products[key] = (name, quantity)
+        if self._set(key, quantity):
+            self._alert(key)
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self._products[key] = (name, quantity)
+        if quantity != old_quantity and self._set(key, quantity):
+            self._alert(key)
+
+    def on_delete(self, key, name, price, quantity):
+        self._products.pop(key, None)
+        self._headroom.pop(key, None)
+        self._prune()
+
+    def on_reset(self, store):
+        was_low = {key for key, headroom in self._headroom.items() if headroom < 0}
+        self.rebuild(store)
+        for key, headroom in self._headroom.items():
+            if headroom < 0 and key not in was_low:
+                self._alert(key)
+
+    def set_threshold(self, name, threshold):
+        """Give one product its own reorder point (None to use the global one again)."""
+        key = normalize_name(name)
+        if threshold is None:
+            self.thresholds.pop(key, None)
+        else:
+            self.thresholds[key] = threshold
+        if key in self._products:
+            self._set(key, self._products[key][1])
+
+    def set_default_threshold(self, threshold):
+        """Change the global reorder point (re-ranks every product once)."""
+        self.default_threshold = threshold
+        self._recompute()
+
+    def _low_entries(self):
+        """Yield (headroom, key) of the low products, most urgent first.
+
+        Walks the heap from the root and only descends into entries with
+        negative headroom, so the cost depends on the number of low
+        products (plus stale entries), not on the inventory size.
+        """
+        self._prune()
+        heap = self._heap
+        current = self._headroom
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        seen = set()
+        while frontier:
+            (headroom, key), index = heapq.heappop(frontier)
+            if headroom >= 0:
+                return
+            if current.get(key) == headroom and key not in seen:
+                seen.add(key)
+                yield headroom, key
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def low_stock(self, limit=None):
+        """Return the low products as (name, quantity, threshold), most urgent first."""
+        report = []
+        for _, key in self._low_entries():
+            if limit is not None and len(report) >= limit:
+                break
+            name, quantity = self._products[key]
+            report.append((name, quantity, self.threshold_for(key)))
+        return report
+
+    def load_thresholds(self, path):
+        """Read per-product reorder points from a name,threshold CSV file.
+
+        Returns the number of thresholds loaded; invalid rows are skipped.
+        """
+        loaded = 0
+        with open(path, "r", encoding="utf-8", newline="") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                try:
+                    name, threshold = row
+                    self.thresholds[normalize_name(name)] = int(threshold)
+                except ValueError:
+                    continue
+                loaded += 1
+        self._recompute()
+        return loaded
+
+    def save_thresholds(self, path):
+        """Write the per-product reorder points to a name,threshold CSV file."""
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["name", "threshold"])
+            for key, threshold in sorted(self.thresholds.items()):
+                writer.writerow([key, threshold])
@@ -1,10 +1,86 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+import batch
+import metrics
+from alerts import DEFAULT_REORDER_THRESHOLD, file_sink
+import service
+from listing import DEFAULT_PAGE_SIZE, SORT_KEYS
 from models import build_product
-from data import export_to_csv, import_from_csv, DEFAULT_PATH
+from lazy_store import DEFAULT_CACHE_SIZE, LazyInventoryStore
+from data import (apply_delta, ask_import_action, export_delta, export_is_current, export_to_csv, import_feeds,
+                  import_from_csv, DEFAULT_PATH, DEFAULT_CHUNK_SIZE)
+from snapshot import SnapshotError, snapshot_path_for, write_snapshot
+from sqlite_store import SQLiteInventoryStore
+from store import InventoryStore
+from wal import FSYNC_GROUP, WriteAheadLog, recover, set_aside
 from utils import (get_product_by_name,recalc_total_cost,recalc_total_cost_for_inventory,print_product,ensure_inventory_not_empty,
-                   validate_price,validate_quantity, validate_product_name)
+                   validate_price,validate_quantity, validate_product_name, name_cache_stats)
 
 CSV_PATH = "inventory.csv"
 
+# Delta file with the changes since the last sync (see data.export_delta)
+DELTA_PATH = "inventory.delta.csv"
+
+# Files larger than this are streamed into the inventory in batches
+STREAM_IMPORT_THRESHOLD = 50 * 1024 * 1024
+
+# Products shown per page by the inventory listing
+PAGE_SIZE = DEFAULT_PAGE_SIZE
+
+# Maximum number of suggestions shown by a search
+SEARCH_RESULT_LIMIT = 10
+
+# Products shown by a range query
+QUERY_RESULT_LIMIT = 50
+
+# Write-ahead log that makes every change durable between saves
+WAL_PATH = "inventory.wal"
+WAL_FSYNC_POLICY = FSYNC_GROUP
+
+# SQLite database used instead of the in-memory inventory (set by --db)
+DB_PATH = None
+
+# CSV file opened lazily, loading products on demand (set by --lazy)
+LAZY_PATH = None
+LAZY_CACHE_SIZE = DEFAULT_CACHE_SIZE
+
+# Global reorder point: products with fewer units raise a low-stock alert
+REORDER_THRESHOLD = DEFAULT_REORDER_THRESHOLD
+
+# Per-product reorder points (name,threshold), loaded at startup when present
+THRESHOLDS_PATH = "reorder_points.csv"
+
+# File that low-stock alerts are appended to (set by --alerts-file)
+ALERTS_PATH = None
+
+# Metric names of the menu options
+MENU_ACTIONS = {
+    1: "add_product",
+    2: "search_product",
+    3: "update_product",
+    4: "delete_product",
+    5: "show_inventory",
+    6: "statistics",
+    7: "save_csv",
+    8: "load_csv",
+    9: "exit",
+    10: "bulk_reprice",
+    11: "bulk_restock",
+    12: "metrics",
+    13: "sync_changes",
+    14: "import_feeds",
+    15: "query_products",
+    16: "low_stock",
+}
+
+# Machine-readable metrics written on exit (set by --metrics)
+METRICS_PATH = None
+
 """
 INVENTORY SYSTEM – DEVELOPMENT SUMMARY
 
@@ -31,8 +107,11 @@ Final Result:
 """
 
 
-# Global inventory list
-inventory = []
+# Global inventory store (indexed by normalized product name)
+inventory = InventoryStore()
+
+# Global write-ahead log journaling the inventory (opened by main)
+journal = None
 
 
 def collect_data():
@@ -149,78 +228,337 @@ def menu():
         "7. Save inventory to CSV\n"
         "8. Load inventory from CSV\n"
         "9. Exit\n"
+        "10. Bulk price change\n"
+        "11. Bulk restock\n"
+        "12. Metrics\n"
+        "13. Sync changes (delta files)\n"
+        "14. Import supplier feeds (directory or pattern)\n"
+        "15. Query products (price, quantity or stock value)\n"
+        "16. Low stock report\n"
     )
-    option = validate_option(menu_text, "Select an option (1-9): ", menu_started=True, minimum=1, maximum=9)
+    option = validate_option(menu_text, "Select an option (1-16): ", menu_started=True, minimum=1, maximum=16)
     return option
 
 def main():
     """Main function to run the inventory management system.
      Runs an interactive menu loop until the user chooses to exit."""
     
+    global inventory
+
     print("Welcome to the Product Inventory Management System!")
+    inventory = open_inventory()
     menu_started = True
 
 
     while menu_started:
+        # Group-commit the changes made by the previous action
+        commit_changes()
         option = menu()
 
-        if option == 1:
-            # Add product
-            name, quantity, price = collect_data()
-            add_product(name, quantity, price)
-            continue
-
-        elif option == 2:
-            # Search product
-            search_product(inventory)
-            continue
-
-        elif option == 3:
-            # Update product
-            update_product(inventory)
-            continue
-
-        elif option == 4:
-            # Delete product
-            delete_product(inventory)
-            continue
-
-        elif option == 5:
-            # Show inventory
-            show_inventory(inventory)
-            continue
-
-        elif option == 6:
-            # Statistics
-            total_value, total_quantity, most_expensive_product, most_stocked_product = calculate_statistics(
-                inventory
-            )
-            show_statistics(
-                total_value,
-                total_quantity,
-                most_expensive_product,
-                most_stocked_product,
-            )
-            continue
-
-        elif option == 7:
-            # Save to CSV
-            export_to_csv(inventory, CSV_PATH)
-            continue
-
-        elif option == 8:
-            # Load from CSV (overwrite or merge inside import_from_csv)
-            new_inventory = import_from_csv(inventory, CSV_PATH)
-            if new_inventory is not inventory:
-                inventory.clear()
-                inventory.extend(new_inventory)
-
-            continue
-
-        elif option == 9:
-            # Exit
-            menu_started = False
-            print("Exiting the menu. See you later!")
+        # Every action is timed; an armed profiling capture also covers it
+        with metrics.timed(f"menu.{MENU_ACTIONS[option]}"), metrics.registry.capture_armed():
+            if option == 1:
+                # Add product
+                name, quantity, price = collect_data()
+                add_product(name, quantity, price)
+                continue
+
+            elif option == 2:
+                # Search product
+                search_product(inventory)
+                continue
+
+            elif option == 3:
+                # Update product
+                update_product(inventory)
+                continue
+
+            elif option == 4:
+                # Delete product
+                delete_product(inventory)
+                continue
+
+            elif option == 5:
+                # Show inventory
+                show_inventory(inventory)
+                continue
+
+            elif option == 6:
+                # Statistics
+                total_value, total_quantity, most_expensive_product, most_stocked_product = calculate_statistics(
+                    inventory
+                )
+                show_statistics(
+                    total_value,
+                    total_quantity,
+                    most_expensive_product,
+                    most_stocked_product,
+                )
+                continue
+
+            elif option == 7:
+                # Save to CSV (plus a binary snapshot for fast startup)
+                save_inventory_file(CSV_PATH)
+                continue
+
+            elif option == 8:
+                # Load from CSV (overwrite or merge inside import_from_csv)
+                new_inventory = load_inventory_file(CSV_PATH)
+                if new_inventory is not inventory:
+                    inventory.replace(new_inventory)
+
+                continue
+
+            elif option == 9:
+                # Exit
+                menu_started = False
+                close_inventory()
+                print("Exiting the menu. See you later!")
+
+            elif option == 10:
+                # Bulk price change
+                bulk_reprice_products(inventory)
+                continue
+
+            elif option == 11:
+                # Bulk restock
+                bulk_restock_products(inventory)
+                continue
+
+            elif option == 12:
+                # Metrics
+                show_metrics()
+                continue
+
+            elif option == 13:
+                # Export or apply a delta file
+                sync_changes(inventory)
+                continue
+
+            elif option == 14:
+                # Import many CSV files at once
+                new_inventory = import_feed_files(inventory)
+                if new_inventory is not inventory:
+                    inventory.replace(new_inventory)
+                continue
+
+            elif option == 15:
+                # Range and top/bottom queries
+                query_products(inventory)
+                continue
+
+            elif option == 16:
+                # Low stock report and reorder points
+                show_low_stock(inventory)
+                continue
+
+def open_inventory():
+    """Open the inventory backend selected on the command line.
+    
+    With ``DB_PATH`` set, the products live in that SQLite database and
+    every change is committed to it. With ``LAZY_PATH`` set, only an index
+    of that CSV file is loaded and products are read when needed.
+    Otherwise the in-memory inventory is recovered from its snapshot and
+    write-ahead log.
+    
+    Returns
+    -------
+    InventoryStore
+        The inventory to work on.
+        """
+    if DB_PATH is not None:
+        store = SQLiteInventoryStore(DB_PATH)
+        print(f"Inventory database opened: {len(store)} products.")
+    elif LAZY_PATH is not None:
+        try:
+            store = LazyInventoryStore(LAZY_PATH, LAZY_CACHE_SIZE)
+        except (ValueError, OSError, UnicodeDecodeError) as e:
+            print(f"The inventory file could not be opened: {e}")
+            sys.exit(1)
+        print(f"Inventory indexed: {len(store)} products (loaded on demand).")
+        if store.invalid_rows:
+            print(f"Invalid rows skipped: {store.invalid_rows}")
+    else:
+        store = restore_inventory(CSV_PATH)
+    # The inventory as opened is the first sync point of the delta files (see sync_changes)
+    store.changes.mark_clean()
+    if not isinstance(store, LazyInventoryStore):
+        # The lazy store starts its monitor on first use: it reads every product
+        start_stock_alerts(store)
+    return store
+
+
+def start_stock_alerts(store):
+    """Load the reorder points and send low-stock alerts to stderr and ``ALERTS_PATH``.
+    
+    Parameters
+    ----------
+    store : InventoryStore
+        The inventory to watch.
+        """
+    monitor = store.stock_monitor
+    monitor.set_default_threshold(REORDER_THRESHOLD)
+    if os.path.exists(THRESHOLDS_PATH):
+        try:
+            monitor.load_thresholds(THRESHOLDS_PATH)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"The reorder points could not be loaded: {e}")
+
+    to_file = file_sink(ALERTS_PATH) if ALERTS_PATH is not None else None
+
+    def deliver(alert):
+        # stderr keeps alerts out of the batch result stream
+        print(f"ALERT: {alert}", file=sys.stderr)
+        if to_file is not None:
+            try:
+                to_file(alert)
+            except OSError as e:
+                print(f"The alert could not be saved: {e}", file=sys.stderr)
+
+    monitor.sink = deliver
+
+
+def commit_changes():
+    """Group-commit the pending changes to the journal and the store."""
+    if journal is not None:
+        journal.commit()
+    inventory.commit()
+
+
+def close_inventory():
+    """Commit the pending changes, close the journal and the store and dump the metrics."""
+    if journal is not None:
+        journal.close()
+    inventory.close()
+    if METRICS_PATH is not None:
+        metrics.registry.dump(METRICS_PATH)
+
+
+def restore_inventory(csv_path):
+    """Recover the inventory from its snapshot and write-ahead log.
+    
+    The snapshot saved next to the CSV file is memory-mapped and the log
+    records written after it are replayed. The write-ahead log is then
+    opened so every later change is journaled. When the snapshot is
+    unusable, its log is kept aside (see ``wal.set_aside``) with a
+    warning before a new one starts.
+    
+    Parameters
+    ----------
+    csv_path : str
+        The CSV file the snapshot belongs to.
+    
+    Returns
+    -------
+    InventoryStore
+        The recovered inventory, or the empty global ``inventory`` when
+        there was nothing to recover. The journal follows this store, so
+        it is the one to work on (even when it is empty).
+        """
+    global journal
+
+    snapshot_path = snapshot_path_for(csv_path)
+    try:
+        recovered, last_lsn = recover(InventoryStore, snapshot_path, WAL_PATH, source_path=csv_path)
+        usable = True
+    except (SnapshotError, OSError) as e:
+        print(f"Snapshot not loaded: {e}")
+        print("Use option 8 to load the CSV file.")
+        recovered, last_lsn, usable = None, 0, False
+
+    if not usable:
+        # The log only applies on top of the lost snapshot: keep it, don't truncate it
+        try:
+            kept_path, kept = set_aside(WAL_PATH)
+        except OSError as e:
+            print(f"The write-ahead log could not be kept aside: {e}")
+            sys.exit(1)
+        if kept_path is not None:
+            print(f"Warning: {kept} journaled changes could not be replayed; they were kept in {kept_path}.")
+
+    target = recovered if recovered is not None else inventory
+    journal = WriteAheadLog(target, WAL_PATH, snapshot_path, fsync_policy=WAL_FSYNC_POLICY, last_lsn=last_lsn)
+    if not usable:
+        # Replace the unusable snapshot with the current state and start a new log
+        journal.checkpoint()
+
+    if recovered is not None:
+        print(f"Inventory restored: {len(recovered)} products.")
+    return target
+
+
+def save_inventory_file(path):
+    """Export the inventory to CSV and refresh its binary snapshot.
+    
+    The snapshot doubles as a write-ahead log checkpoint, so the log is
+    emptied once the CSV file is written.
+    
+    Parameters
+    ----------
+    path : str
+        The CSV file to write.
+        """
+    if export_is_current(inventory, path):
+        # Neither the CSV nor the snapshot needs rewriting
+        print(f"No changes since the last save to {path}.")
+        return
+
+    if isinstance(inventory, LazyInventoryStore):
+        # The lazy store has no snapshot; its own file is saved by compaction
+        if os.path.abspath(path) != os.path.abspath(inventory.path):
+            export_to_csv(inventory, path)
+            return
+        try:
+            inventory.compact()
+        except (OSError, ValueError) as e:
+            print(f"The inventory could not be saved: {e}")
+            return
+        print(f"Inventory saved to: {path}")
+        return
+
+    if not export_to_csv(inventory, path):
+        return
+
+    try:
+        if journal is not None:
+            journal.checkpoint(source_path=path)
+        else:
+            write_snapshot(inventory, snapshot_path_for(path), source_path=path)
+    except (OSError, ValueError) as e:
+        print(f"The snapshot could not be written: {e}")
+
+
+def show_import_progress(loaded_rows, invalid_rows):
+    """Print a single, updating progress line for streamed imports."""
+    print(f"\rRows loaded: {loaded_rows} | Invalid rows: {invalid_rows}", end="", flush=True)
+
+
+def load_inventory_file(path):
+    """Import a CSV file, streaming it in batches when it is large.
+    
+    Parameters
+    ----------
+    path : str
+        The CSV file to load.
+    
+    Returns
+    -------
+    InventoryStore
+        The resulting inventory (the global one when merged in place).
+        """
+    try:
+        large_file = os.path.getsize(path) > STREAM_IMPORT_THRESHOLD
+    except OSError:
+        large_file = False
+
+    if not large_file:
+        return import_from_csv(inventory, path)
+
+    new_inventory = import_from_csv(
+        inventory, path, chunk_size=DEFAULT_CHUNK_SIZE, progress=show_import_progress
+    )
+    print()
+    return new_inventory
 
 
 def add_product(name, quantity, price):
@@ -236,6 +574,13 @@ def add_product(name, quantity, price):
         The product price.
         """
     global inventory
+    existing = get_product_by_name(inventory, name)
+    if existing is not None:
+        # Same merge rule as the CSV import: add the stock, keep the latest price
+        inventory.update(existing, price=price, quantity=existing["quantity"] + quantity)
+        print(f"\n{quantity} units added to the existing product {existing['name']}.\n")
+        return
+
     product = build_product(name, quantity, price)  
     recalc_total_cost(product)  
     inventory.append(product)
@@ -243,28 +588,69 @@ def add_product(name, quantity, price):
 
 
 def show_inventory(inv):
-    """Print all products in the inventory.
+    """Print the inventory one page at a time.
+    
+    Each page is written to the terminal in a single buffered write, and
+    sort orders are cached by the store, so a page costs the same however
+    large the inventory is.
     
     parameters
     ----------
-    inv : list
-        The inventory list of products."""
+    inv : InventoryStore
+        The inventory of products."""
         
     print("\n--- Product Inventory ---\n")
     if not ensure_inventory_not_empty(inv, "view the inventory"):
         print(inv)
         return
 
-    for index, product in enumerate(inv, start=1):
-        print_product(product, index)
+    if not hasattr(inv, "listing"):
+        for index, product in enumerate(inv, start=1):
+            print_product(product, index)
+        return
+
+    sort_key = input("Sort by (name/price/quantity/value, press Enter for insertion order): ").strip().lower() or "none"
+    if sort_key not in SORT_KEYS:
+        print("Unknown sort key. Showing insertion order.")
+        sort_key = "none"
+    descending = False
+    if sort_key != "none":
+        descending = input("Descending order? (Y/N): ").strip().upper() == "Y"
+
+    listing = inv.listing
+    pages = listing.page_count(PAGE_SIZE)
+    page = 1
+    while True:
+        # Rendered pages are cached until the next change
+        text = inv.results.get(
+            "page", (page, PAGE_SIZE, sort_key, descending),
+            lambda: listing.render_page(page, PAGE_SIZE, sort_key, descending),
+        )
+        sys.stdout.write(text)
+        sys.stdout.flush()
+        if pages == 1:
+            return
+
+        choice = input("[N]ext, [P]revious, page number or [Q]uit: ").strip().upper()
+        if choice == "N":
+            page = min(pages, page + 1)
+        elif choice == "P":
+            page = max(1, page - 1)
+        elif choice.isdigit() and 1 <= int(choice) <= pages:
+            page = int(choice)
+        elif choice in ("Q", ""):
+            return
+        else:
+            print(f"Invalid option. Enter N, P, Q or a page between 1 and {pages}.")
 
 
 def calculate_statistics(inv):
     """Calculate basic inventory statistics.
     parameters
     ----------
-    inv : list
-        The inventory list of products.
+    inv : InventoryStore or list
+        The inventory of products. An InventoryStore answers from its
+        statistics engine; a plain list is scanned.
         
     Returns
     -------
@@ -281,6 +667,11 @@ def calculate_statistics(inv):
     if not ensure_inventory_not_empty(inv, "calculate statistics"):
         return 0, 0, None, None
 
+    if hasattr(inv, "statistics"):
+        # Computed by the store (incrementally, or by its backend) and
+        # cached until the next change
+        return inv.results.get("statistics", (), inv.statistics)
+
     recalc_total_cost_for_inventory(inv)
 
     total_inventory_value = sum(p["total_cost"] for p in inv)
@@ -342,9 +733,154 @@ def search_product(inv):
         return product
 
     print("Product not found in the inventory.")
+    show_search_suggestions(inv, search_name)
     return None
 
 
+def show_low_stock(inv):
+    """Show the products below their reorder point and let the user change reorder points.
+    parameters
+    ----------
+    inv : InventoryStore
+        The inventory of products."""
+    monitor = inv.stock_monitor
+    if monitor.sink is None:
+        # Lazy inventories start the monitor here (see open_inventory)
+        start_stock_alerts(inv)
+    report = monitor.low_stock()
+
+    print(f"\n---- Low Stock (global reorder point: {monitor.default_threshold}) ----")
+    if not report:
+        print("No products are below their reorder point.")
+    for name, quantity, threshold in report:
+        print(f"{name}: {quantity} units (reorder point {threshold}, {threshold - quantity} short)")
+
+    choice = input(
+        "\n(S)et a product's reorder point, change the (G)lobal reorder point, or Enter to go back: "
+    ).strip().upper()
+
+    if choice == "S":
+        name = input("Product name: ").strip()
+        if get_product_by_name(inv, name) is None:
+            print("Product not found in the inventory.")
+            return
+        text = input("Reorder point (press Enter to use the global one): ").strip()
+        try:
+            monitor.set_threshold(name, int(text) if text else None)
+        except ValueError:
+            print("The reorder point must be a whole number.")
+            return
+        try:
+            monitor.save_thresholds(THRESHOLDS_PATH)
+        except OSError as e:
+            print(f"The reorder points could not be saved: {e}")
+            return
+        print("Reorder point saved.")
+    elif choice == "G":
+        try:
+            monitor.set_default_threshold(int(input("Global reorder point: ").strip()))
+        except ValueError:
+            print("The reorder point must be a whole number.")
+            return
+        print("Global reorder point changed for this session (use --reorder-point to keep it).")
+
+
+def ask_bound(message):
+    """Ask for an optional numeric bound; None when left empty.
+    parameters
+    ----------
+    message : str
+        The prompt shown to the user."""
+    while True:
+        text = input(message).strip()
+        if not text:
+            return None
+        try:
+            return float(text)
+        except ValueError:
+            print("Please enter a number or press Enter.")
+
+
+def query_products(inv):
+    """Show the products in a price, quantity or stock value range, or the top/bottom K.
+    parameters
+    ----------
+    inv : InventoryStore
+        The inventory of products."""
+    if not ensure_inventory_not_empty(inv, "query products"):
+        return
+
+    fields = {"P": "price", "Q": "quantity", "V": "value"}
+    field = fields.get(input("Query by (P)rice, (Q)uantity or stock (V)alue: ").strip().upper())
+    if field is None:
+        print("Invalid option.")
+        return
+
+    kind = input("(R)ange, (T)op K or (B)ottom K: ").strip().upper()
+    if kind == "R":
+        low = ask_bound("Minimum (press Enter for no minimum): ")
+        high = ask_bound("Maximum (press Enter for no maximum): ")
+        products = inv.results.get(
+            "range", (field, low, high, QUERY_RESULT_LIMIT + 1),
+            lambda: inv.products_in_range(field, low, high, limit=QUERY_RESULT_LIMIT + 1),
+        )
+        bounds = [f">= {low}"] if low is not None else []
+        bounds += [f"<= {high}"] if high is not None else []
+        title = f"Products by {field} " + (" and ".join(bounds) or "(all)")
+    elif kind in ("T", "B"):
+        k = validate_option("", "How many products? ", menu_started=True, minimum=1, maximum=len(inv))
+        if kind == "T":
+            products = inv.results.get("top", (field, k), lambda: inv.top_products(field, k))
+            title = f"Top {k} products by {field}"
+        else:
+            products = inv.results.get("bottom", (field, k), lambda: inv.bottom_products(field, k))
+            title = f"Bottom {k} products by {field}"
+    else:
+        print("Invalid option.")
+        return
+
+    if not products:
+        print("No products match the query.")
+        return
+
+    print(f"\n{title}:")
+    for index, product in enumerate(products[:QUERY_RESULT_LIMIT] if kind == "R" else products, start=1):
+        print_product(product, index)
+    if kind == "R" and len(products) > QUERY_RESULT_LIMIT:
+        print(f"\nShowing the first {QUERY_RESULT_LIMIT} matches.")
+
+
+def show_search_suggestions(inv, text):
+    """Print products whose name starts with, or closely matches, the text.
+    parameters
+    ----------
+    inv : InventoryStore
+        The inventory of products.
+    text : str
+        The name the user searched for."""
+    if not hasattr(inv, "search_index") or not text.strip():
+        return
+
+    # Search results hold only names: price and quantity changes keep them cached
+    results = inv.results
+    matches = results.get(
+        "prefix", (text, SEARCH_RESULT_LIMIT),
+        lambda: inv.search_index.prefix(text, SEARCH_RESULT_LIMIT), names_only=True,
+    )
+    if matches:
+        print(f"\nProducts starting with '{text}':")
+    else:
+        matches = results.get(
+            "fuzzy", (text, SEARCH_RESULT_LIMIT),
+            lambda: inv.search_index.fuzzy(text, SEARCH_RESULT_LIMIT), names_only=True,
+        )
+        if matches:
+            print("\nDid you mean:")
+
+    for key in matches:
+        print_product(inv.get(key))
+
+
 def update_product(inventory):
     """Update a product's price and/or quantity by name.
     parameters
@@ -368,12 +904,21 @@ def update_product(inventory):
 
     print("\nLeave any field empty to keep the current value.\n")
 
+    # Rename
+    new_name_input = input("Enter new name (or press Enter to keep current): ").strip()
+    if new_name_input:
+        try:
+            new_name = validate_product_name(new_name_input)
+            product = inventory.rename(product, new_name)
+        except ValueError as e:
+            print(e)
+
     # Update price
     new_price_input = input("Enter new price (or press Enter to keep current): ").strip()
     if new_price_input:
         try:
             new_price = validate_price(new_price_input)
-            product["price"] = new_price
+            inventory.update(product, price=new_price)
         except ValueError as e:
             print(e)
 
@@ -382,12 +927,10 @@ def update_product(inventory):
     if new_quantity_input:
         try:
             new_quantity = validate_quantity(new_quantity_input)
-            product["quantity"] = new_quantity
+            inventory.update(product, quantity=new_quantity)
         except ValueError as e:
             print(e)
 
-    recalc_total_cost(product)
-
     print("\nProduct updated successfully:")
     print_product(product)
 
@@ -425,5 +968,288 @@ def delete_product(inventory):
 
 
 
+def show_metrics():
+    """Show the operation metrics and offer a dump, a profiling capture or a reset.
+    
+    Menu timings include the time spent answering prompts; the csv.*
+    phases measure only the work done by data.py.
+        """
+    print("\n---- Operation Metrics ----")
+    print(metrics.registry.report())
+    cache = name_cache_stats()
+    if cache["hit_rate"] is not None:
+        print(f"\nName validation cache: {cache['hits']} hits, {cache['misses']} misses "
+              f"({cache['hit_rate']:.1%} hit rate), {cache['size']}/{cache['maxsize']} names")
+    results = inventory.results.stats()
+    if results["hit_rate"] is not None:
+        print(f"Result cache: {results['hits']} hits, {results['misses']} misses "
+              f"({results['hit_rate']:.1%} hit rate), {results['size']}/{results['maxsize']} results, "
+              f"{results['evictions']} evicted, {results['invalidations']} invalidated")
+    if isinstance(inventory, LazyInventoryStore):
+        records = inventory.cache_stats()
+        print(f"Record cache: {records['hits']} hits, {records['misses']} misses, "
+              f"{records['size']}/{records['capacity']} products, {records['dirty']} not written back")
+
+    choice = input(
+        "\n(D)ump to JSON, (P)rofile next action, (M)emory trace next action, "
+        "(R)eset, or Enter to go back: "
+    ).strip().upper()
+
+    if choice == "D":
+        path = input("File name (Enter for metrics.json): ").strip() or "metrics.json"
+        try:
+            metrics.registry.dump(path)
+            print(f"Metrics saved to: {path}")
+        except OSError as e:
+            print(f"The metrics could not be saved: {e}")
+    elif choice == "P":
+        metrics.registry.arm_capture(metrics.CAPTURE_CPROFILE)
+        print("The next menu action will be profiled with cProfile.")
+    elif choice == "M":
+        metrics.registry.arm_capture(metrics.CAPTURE_TRACEMALLOC)
+        print("The next menu action will be traced with tracemalloc.")
+    elif choice == "R":
+        metrics.registry.reset()
+        print("Metrics reset.")
+
+
+def import_feed_files(inventory):
+    """Import every CSV file of a directory or glob pattern in parallel.
+    
+    Files are parsed concurrently and merged in name order; a report line
+    is printed for each file.
+    
+    Parameters
+    ----------
+    inventory : InventoryStore
+        The current inventory.
+    
+    Returns
+    -------
+    InventoryStore
+        The resulting inventory (the given one when merged in place).
+        """
+    source = input("Feed directory or pattern (e.g. feeds/ or feeds/*.csv): ").strip()
+    if not source:
+        return inventory
+
+    action = ask_import_action()
+    started = time.perf_counter()
+    new_inventory, reports = import_feeds(inventory, source, action)
+    elapsed = time.perf_counter() - started
+
+    if not reports:
+        print("No CSV files were found.")
+        return inventory
+
+    for report in reports:
+        if report.error is not None:
+            print(f"{report.path}: skipped ({report.error})")
+        else:
+            print(f"{report.path}: {report.loaded} loaded, {report.invalid} invalid ({report.seconds:.2f} s)")
+
+    loaded = sum(report.loaded for report in reports)
+    invalid_rows = sum(report.invalid for report in reports)
+    print(f"{len(reports)} files, {loaded} products loaded, {invalid_rows} invalid rows skipped "
+          f"in {elapsed:.2f} s (action: {action}).")
+    if not loaded:
+        print("No valid products were found in the files.")
+    return new_inventory
+
+
+def sync_changes(inventory):
+    """Export the changes since the last sync, or apply a received delta file.
+    
+    Parameters
+    ----------
+    inventory : InventoryStore
+        The inventory whose changes are exported or updated in place.
+        """
+    tracker = inventory.changes
+    pending = "all products (bulk change)" if tracker.full else f"{len(tracker)} changed products"
+    print(f"\nPending changes: {pending}.")
+
+    choice = input("(E)xport changes, (A)pply a delta file, or Enter to go back: ").strip().upper()
+    if choice not in ("E", "A"):
+        return
+
+    path = input(f"Delta file (Enter for {DELTA_PATH}): ").strip() or DELTA_PATH
+    if choice == "E":
+        export_delta(inventory, path)
+        return
+
+    try:
+        applied, invalid_rows = apply_delta(inventory, path)
+    except FileNotFoundError:
+        print("Error: The delta file was not found.")
+        return
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        return
+    print(f"Delta applied: {applied} changes, {invalid_rows} invalid rows skipped.")
+
+
+def ask_name_filter():
+    """Ask for an optional name filter for bulk operations.
+    
+    Returns
+    -------
+    callable or None
+        A predicate matching names that contain the entered text
+        (case-insensitive), or None to select every product."""
+    text = input("Apply to names containing (press Enter for all products): ").strip().lower()
+    if not text:
+        return None
+    return lambda name: text in name.lower()
+
+
+def bulk_reprice_products(inventory):
+    """Change the price of all matching products by a percentage.
+    parameters
+    ----------
+    inventory : InventoryStore
+        The inventory of products.
+        """
+    if not ensure_inventory_not_empty(inventory, "change prices"):
+        return
+
+    try:
+        percent = float(input("Enter the price change in percent (e.g. 10 or -5): ").strip())
+    except ValueError:
+        print("Invalid input. Please enter a number.")
+        return
+
+    if percent <= -100:
+        print("The price change must be greater than -100%.")
+        return
+
+    changed = inventory.bulk_reprice(percent, ask_name_filter())
+    print(f"\nPrices updated for {changed} products.")
+
+
+def bulk_restock_products(inventory):
+    """Add (or remove) units for all matching products.
+    parameters
+    ----------
+    inventory : InventoryStore
+        The inventory of products.
+        """
+    if not ensure_inventory_not_empty(inventory, "restock products"):
+        return
+
+    try:
+        delta = int(input("Enter the units to add (negative to remove): ").strip())
+    except ValueError:
+        print("Invalid input. Please enter a whole number.")
+        return
+
+    changed = inventory.bulk_restock(delta, ask_name_filter())
+    print(f"\nStock updated for {changed} products.")
+
+
+def run_batch(commands_path, output_path="-"):
+    """Run a file of JSON commands without any prompt (see batch.py).
+    
+    Parameters
+    ----------
+    commands_path : str
+        File with one JSON command per line, or "-" for standard input.
+    output_path : str, optional
+        File receiving one JSON result per line, or "-" (default) for
+        standard output.
+    
+    Returns
+    -------
+    int
+        Process exit status: 0 when every command succeeded, 1 otherwise.
+        """
+    global inventory
+
+    # Status messages go to stderr so stdout carries only results
+    with contextlib.redirect_stdout(sys.stderr):
+        inventory = open_inventory()
+
+    commands = sys.stdin if commands_path == "-" else open(commands_path, "r", encoding="utf-8")
+    output = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8", buffering=1024 * 1024)
+    try:
+        executed, failed = batch.run(inventory, commands, output)
+    finally:
+        close_inventory()
+        if commands is not sys.stdin:
+            commands.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Commands run: {executed} | Failed: {failed}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_service(address):
+    """Share the inventory with socket clients until interrupted (see service.py).
+    
+    Parameters
+    ----------
+    address : str
+        "HOST:PORT" for a TCP socket, or a filesystem path for a Unix
+        socket.
+        """
+    global inventory
+
+    inventory = open_inventory()
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        target = {"host": host or "127.0.0.1", "port": int(port)}
+    else:
+        target = {"path": address}
+
+    print(f"Serving the inventory on {address} (Ctrl+C to stop).")
+    try:
+        asyncio.run(service.serve(inventory, on_commit=commit_changes, **target))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_inventory()
+        print("Service stopped.")
+
+
+def parse_arguments(argv=None):
+    """Parse the command-line options of the application."""
+    parser = argparse.ArgumentParser(description="Product inventory management system.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="run JSON commands from FILE ('-' for stdin) instead of the menu")
+    parser.add_argument("--output", metavar="FILE", default="-",
+                        help="where batch results are written (default: stdout)")
+    parser.add_argument("--db", metavar="FILE",
+                        help="keep the inventory in the SQLite database FILE instead of memory")
+    parser.add_argument("--lazy", metavar="FILE",
+                        help="open the CSV file FILE on demand instead of loading it into memory")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, metavar="N",
+                        help=f"products kept in memory with --lazy (default: {DEFAULT_CACHE_SIZE})")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write the operation metrics as JSON to FILE on exit ('-' for stdout)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="serve the inventory on HOST:PORT or a Unix socket path instead of the menu")
+    parser.add_argument("--reorder-point", type=int, default=DEFAULT_REORDER_THRESHOLD, metavar="N",
+                        help=f"global reorder point for low-stock alerts (default: {DEFAULT_REORDER_THRESHOLD})")
+    parser.add_argument("--alerts-file", metavar="FILE",
+                        help="append low-stock alerts to FILE as CSV")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    arguments = parse_arguments()
+    DB_PATH = arguments.db
+    LAZY_PATH = arguments.lazy
+    LAZY_CACHE_SIZE = arguments.cache_size
+    if LAZY_PATH is not None:
+        # Save (compact) and load the lazily opened file
+        CSV_PATH = LAZY_PATH
+    METRICS_PATH = arguments.metrics
+    REORDER_THRESHOLD = arguments.reorder_point
+    ALERTS_PATH = arguments.alerts_file
+    if arguments.batch:
+        sys.exit(run_batch(arguments.batch, arguments.output))
+    if arguments.serve:
+        run_service(arguments.serve)
+        sys.exit(0)
     main()
@@ -0,0 +1,399 @@
+"""Non-interactive command pipeline for the inventory.
+
+Reads one JSON command per line and writes one JSON result per line, so
+bulk loads and scripts run without any prompt. Examples::
+
+    {"op": "add", "name": "Pan", "price": 2.5, "quantity": 10}
+    {"op": "update", "name": "Pan", "price": 3}
+    {"op": "delete", "name": "Pan"}
+    {"op": "search", "name": "Pan"}
+    {"op": "search", "name": "pa", "mode": "prefix", "limit": 5}
+    {"op": "search", "name": "Pna", "mode": "fuzzy"}
+    {"op": "rename", "name": "Pan", "new_name": "Bread"}
+    {"op": "query", "field": "quantity", "mode": "range", "high": 10, "limit": 50}
+    {"op": "query", "field": "value", "mode": "top", "k": 50}
+    {"op": "stats"}
+    {"op": "low_stock", "limit": 20}
+    {"op": "set_reorder_point", "name": "Pan", "threshold": 12}
+    {"op": "export", "path": "inventory.csv"}
+    {"op": "import", "path": "feed.csv", "mode": "merge"}
+    {"op": "validate", "path": "feed.csv"}
+    {"op": "import_feeds", "source": "feeds/", "mode": "merge", "workers": 4}
+    {"op": "export_delta", "path": "changes.csv"}
+    {"op": "import_delta", "path": "changes.csv"}
+    {"op": "metrics"}
+
+Every result carries the input line number and ``"ok"``; failures add an
+``"error"`` message instead of stopping the run. Input values go through
+the same validators as the interactive menu.
+"""
+import contextlib
+import csv
+import json
+import sys
+
+from data import (
+    DEFAULT_CHUNK_SIZE,
+    apply_delta,
+    check_header,
+    export_delta,
+    export_to_csv,
+    import_feeds,
+    open_csv,
+    stream_import_csv,
+    validate_csv,
+)
+from metrics import registry, timed
+from models import build_product
+from search import DEFAULT_LIMIT
+from utils import name_cache_stats, validate_price, validate_product_name, validate_quantity
+
+# Results are written in blocks of this many lines
+OUTPUT_BLOCK_LINES = 4096
+
+
+class CommandError(ValueError):
+    """Raised for a malformed command (unknown op, missing field)."""
+
+
+def product_record(product):
+    """Return a JSON-serializable copy of a product."""
+    return {
+        "name": product["name"],
+        "price": product["price"],
+        "quantity": product["quantity"],
+        "total_cost": product["price"] * product["quantity"],
+    }
+
+
+def _field(command, field):
+    """Return a required text field (names, paths)."""
+    if field not in command:
+        raise CommandError(f"Missing field '{field}'.")
+    value = command[field]
+    if not isinstance(value, str):
+        raise CommandError(f"Field '{field}' must be a string.")
+    return value
+
+
+def _value(command, field):
+    """Return a price or quantity as text for the validators; it may be given as a number or a string."""
+    if field not in command:
+        raise CommandError(f"Missing field '{field}'.")
+    value = command[field]
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise CommandError(f"Field '{field}' must be a number.")
+    return str(value)
+
+
+def _number(command, field, default=None, integer=False):
+    """Return an optional numeric field, or ``default`` when it is missing or null."""
+    value = command.get(field)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise CommandError(f"Field '{field}' must be {'a whole number' if integer else 'a number'}.")
+    return value if integer else float(value)
+
+
+def _add(store, command):
+    name = validate_product_name(_field(command, "name"))
+    price = validate_price(_value(command, "price"))
+    quantity = validate_quantity(_value(command, "quantity"))
+
+    existing = store.get(name)
+    if existing is not None:
+        # Same merge rule as the interactive add and the CSV import
+        product = store.update(existing, price=price, quantity=existing["quantity"] + quantity)
+    else:
+        product = store.append(build_product(name, quantity, price))
+    return {"product": product_record(product)}
+
+
+def _update(store, command):
+    product = store.get(_field(command, "name"))
+    if product is None:
+        raise CommandError("Product not found in the inventory.")
+
+    price = validate_price(_value(command, "price")) if command.get("price") is not None else None
+    quantity = validate_quantity(_value(command, "quantity")) if command.get("quantity") is not None else None
+    product = store.update(product, price=price, quantity=quantity)
+    return {"product": product_record(product)}
+
+
+def _delete(store, command):
+    product = store.get(_field(command, "name"))
+    if product is None:
+        raise CommandError("Product not found in the inventory.")
+
+    record = product_record(product)
+    store.remove(product)
+    return {"product": record}
+
+
+def _search(store, command):
+    name = _field(command, "name")
+    mode = command.get("mode", "exact")
+    if mode == "exact":
+        product = store.get(name)
+        return {"product": product_record(product) if product is not None else None}
+
+    if mode not in ("prefix", "fuzzy"):
+        raise CommandError("Mode must be 'exact', 'prefix' or 'fuzzy'.")
+    limit = _number(command, "limit", DEFAULT_LIMIT, integer=True)
+    find = store.search_index.prefix if mode == "prefix" else store.search_index.fuzzy
+    # Search results hold only names: price and quantity changes keep them cached
+    keys = store.results.get(mode, (name, limit), lambda: find(name, limit), names_only=True)
+    return {"products": [product_record(store.get(key)) for key in keys]}
+
+
+def _query(store, command):
+    field = _field(command, "field")
+    mode = command.get("mode", "range")
+    if mode == "range":
+        bounds = (
+            field,
+            _number(command, "low"),
+            _number(command, "high"),
+            _number(command, "limit", integer=True),
+        )
+        products = store.results.get("range", bounds, lambda: store.products_in_range(*bounds))
+    elif mode in ("top", "bottom"):
+        k = _number(command, "k", integer=True)
+        if k is None:
+            raise CommandError("Missing field 'k'.")
+        find = store.top_products if mode == "top" else store.bottom_products
+        products = store.results.get(mode, (field, k), lambda: find(field, k))
+    else:
+        raise CommandError("Mode must be 'range', 'top' or 'bottom'.")
+    return {"field": field, "mode": mode, "products": [product_record(product) for product in products]}
+
+
+def _low_stock(store, command):
+    report = store.stock_monitor.low_stock(_number(command, "limit", integer=True))
+    return {
+        "products": [
+            {"name": name, "quantity": quantity, "threshold": threshold}
+            for name, quantity, threshold in report
+        ]
+    }
+
+
+def _set_reorder_point(store, command):
+    threshold = _number(command, "threshold", integer=True)
+    monitor = store.stock_monitor
+    if "name" not in command:
+        if threshold is None:
+            raise CommandError("A global reorder point needs a 'threshold'.")
+        monitor.set_default_threshold(threshold)
+        return {"threshold": threshold}
+
+    product = store.get(_field(command, "name"))
+    if product is None:
+        raise CommandError("Product not found in the inventory.")
+    monitor.set_threshold(product["name"], threshold)
+    return {"name": product["name"], "threshold": monitor.threshold_for(store.key_for(product["name"]))}
+
+
+def _rename(store, command):
+    product = store.get(_field(command, "name"))
+    if product is None:
+        raise CommandError("Product not found in the inventory.")
+
+    new_name = validate_product_name(_field(command, "new_name"))
+    return {"product": product_record(store.rename(product, new_name))}
+
+
+def _stats(store, command):
+    total_value, total_units, max_price, max_quantity = store.results.get("statistics", (), store.statistics)
+    return {
+        "total_value": total_value,
+        "total_units": total_units,
+        "max_price": max_price,
+        "max_quantity": max_quantity,
+    }
+
+
+def _export(store, command):
+    path = _field(command, "path")
+    # Keep the human-readable messages out of the result stream
+    with contextlib.redirect_stdout(sys.stderr):
+        saved = export_to_csv(store, path)
+    if not saved:
+        raise CommandError("The inventory could not be exported.")
+    return {"path": path, "products": len(store)}
+
+
+def _import(store, command):
+    path = _field(command, "path")
+    mode = command.get("mode", "merge")
+    if mode not in ("merge", "overwrite"):
+        raise CommandError("Mode must be 'merge' or 'overwrite'.")
+    chunk_size = _number(command, "chunk_size", DEFAULT_CHUNK_SIZE, integer=True)
+    if chunk_size < 1:
+        raise CommandError("Field 'chunk_size' must be at least 1.")
+
+    with open_csv(path) as file:
+        check_header(next(csv.reader(file), None))
+
+    final_inventory, loaded, invalid_rows = stream_import_csv(store, path, mode, chunk_size)
+    if final_inventory is not store:
+        store.replace(final_inventory)
+    return {"path": path, "mode": mode, "loaded": loaded, "invalid_rows": invalid_rows}
+
+
+def _validate(store, command):
+    path = _field(command, "path")
+    counter = validate_csv(path)
+    return {
+        "path": path,
+        "valid": counter.loaded,
+        "invalid_rows": counter.invalid,
+        "errors": [{"line": line, "reason": reason} for line, reason in counter.errors],
+    }
+
+
+def feed_records(reports):
+    """Return the per-file results of a multi-file import as JSON-ready dicts."""
+    return [
+        {"path": report.path, "loaded": report.loaded, "invalid_rows": report.invalid, "error": report.error}
+        for report in reports
+    ]
+
+
+def _import_feeds(store, command):
+    source = _field(command, "source")
+    mode = command.get("mode", "merge")
+    if mode not in ("merge", "overwrite"):
+        raise CommandError("Mode must be 'merge' or 'overwrite'.")
+    workers = _number(command, "workers", integer=True)
+
+    final_inventory, reports = import_feeds(store, source, mode, workers or None)
+    if not reports:
+        raise CommandError(f"No CSV files match '{source}'.")
+    if final_inventory is not store:
+        store.replace(final_inventory)
+    return {"source": source, "mode": mode, "files": feed_records(reports)}
+
+
+def _export_delta(store, command):
+    path = _field(command, "path")
+    with contextlib.redirect_stdout(sys.stderr):
+        rows = export_delta(store, path)
+    if rows is None:
+        raise CommandError("The changes could not be exported.")
+    return {"path": path, "rows": rows}
+
+
+def _import_delta(store, command):
+    path = _field(command, "path")
+    applied, invalid_rows = apply_delta(store, path)
+    return {"path": path, "applied": applied, "invalid_rows": invalid_rows}
+
+
+def _metrics(store, command):
+    return {
+        "metrics": registry.snapshot(),
+        "name_cache": name_cache_stats(),
+        "result_cache": store.results.stats(),
+    }
+
+
+COMMANDS = {
+    "add": _add,
+    "update": _update,
+    "delete": _delete,
+    "search": _search,
+    "rename": _rename,
+    "query": _query,
+    "low_stock": _low_stock,
+    "set_reorder_point": _set_reorder_point,
+    "stats": _stats,
+    "export": _export,
+    "import": _import,
+    "validate": _validate,
+    "import_feeds": _import_feeds,
+    "export_delta": _export_delta,
+    "import_delta": _import_delta,
+    "metrics": _metrics,
+}
+
+
+# Errors that fail a single command (JSON, validation and CSVFormatError
+# are all ValueErrors; TypeError and KeyError come from values of the
+# wrong type reaching the store)
+COMMAND_ERRORS = (ValueError, OSError, TypeError, KeyError)
+
+
+def execute(store, command):
+    """Run one command dict against the store and return its result dict.
+
+    Raises
+    ------
+    CommandError, ValueError, OSError
+        When the command is malformed, a value fails validation or a
+        file operation fails. Values of an unexpected type can also
+        raise TypeError or KeyError deeper down (see ``COMMAND_ERRORS``).
+    """
+    if not isinstance(command, dict):
+        raise CommandError("A command must be a JSON object.")
+
+    op = command.get("op")
+    handler = COMMANDS.get(op) if isinstance(op, str) else None
+    if handler is None:
+        raise CommandError(f"Unknown op '{op}'.")
+    with timed(f"op.{op}"):
+        return handler(store, command)
+
+
+def run(store, lines, output):
+    """Execute every command line and write one JSON result per line.
+
+    Parameters
+    ----------
+    store : InventoryStore
+        The inventory the commands act on.
+    lines : iterable of str
+        JSON command lines; blank lines and lines starting with ``#`` are
+        skipped.
+    output : file
+        Text stream receiving the JSON results.
+
+    Returns
+    -------
+    tuple
+        (commands_run, commands_failed)
+    """
+    # Reused codec objects skip the per-call setup of json.loads/json.dumps
+    decode = json.JSONDecoder().decode
+    encode = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+    block = []
+    executed = 0
+    failed = 0
+
+    for line_number, line in enumerate(lines, start=1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+
+        executed += 1
+        try:
+            command = decode(text)
+            result = execute(store, command)
+            result["ok"] = True
+            result["op"] = command["op"]
+        except COMMAND_ERRORS as e:
+            # One bad command is reported on its line; the run goes on
+            failed += 1
+            result = {"ok": False, "error": str(e) or e.__class__.__name__}
+
+        result["line"] = line_number
+        block.append(encode(result))
+        if len(block) >= OUTPUT_BLOCK_LINES:
+            output.write("\n".join(block) + "\n")
+            block.clear()
+
+    if block:
+        output.write("\n".join(block) + "\n")
+    output.flush()
+    return executed, failed
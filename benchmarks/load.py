@@ -0,0 +1,111 @@
+"""Load generator for the inventory service (see service.py).
+
+Opens several client connections and sends a mix of reads and writes as
+fast as the service answers, then reports requests/sec and latency
+percentiles. Start the service first, then run from the project
+directory:
+
+    python app.py --serve 127.0.0.1:8765
+    python -m benchmarks.load --address 127.0.0.1:8765 --clients 50 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def percentile(sorted_values, fraction):
+    """Return the value at ``fraction`` (0-1) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def product_name(index):
+    """Return a valid (letters only) product name for an index."""
+    letters = ""
+    while True:
+        index, digit = divmod(index, 26)
+        letters += "abcdefghijklmnopqrstuvwxyz"[digit]
+        if not index:
+            return f"Load {letters}"
+
+
+def make_request(rng, products, write_ratio):
+    """Return one random command: a search, stats or an add/update."""
+    name = product_name(rng.randrange(products))
+    if rng.random() < write_ratio:
+        if rng.random() < 0.5:
+            return {"op": "add", "name": name, "price": round(rng.uniform(1, 100), 2), "quantity": 1}
+        return {"op": "update", "name": name, "quantity": rng.randrange(100)}
+    if rng.random() < 0.1:
+        return {"op": "stats"}
+    return {"op": "search", "name": name}
+
+
+async def open_connection(address):
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return await asyncio.open_connection(host or "127.0.0.1", int(port))
+    return await asyncio.open_unix_connection(address)
+
+
+async def run_client(address, count, seed, products, write_ratio, latencies):
+    """Send ``count`` requests one after another and record their latencies."""
+    rng = random.Random(seed)
+    reader, writer = await open_connection(address)
+    failures = 0
+    try:
+        for request_id in range(count):
+            command = make_request(rng, products, write_ratio)
+            command["id"] = request_id
+            started = time.perf_counter()
+            writer.write(json.dumps(command).encode("utf-8") + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            # Updates of products not added yet are expected to fail
+            if not response["ok"] and command["op"] != "update":
+                failures += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return failures
+
+
+async def run_load(address, clients, requests, products, write_ratio):
+    latencies = []
+    started = time.perf_counter()
+    failures = await asyncio.gather(*(
+        run_client(address, requests, seed, products, write_ratio, latencies)
+        for seed in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed, sum(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--address", default="127.0.0.1:8765", help="HOST:PORT or Unix socket path")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per client")
+    parser.add_argument("--products", type=int, default=50, help="distinct product names used")
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    latencies, elapsed, failures = asyncio.run(
+        run_load(args.address, args.clients, args.requests, args.products, args.write_ratio)
+    )
+    latencies.sort()
+    print(f"Requests: {len(latencies)} from {args.clients} clients in {elapsed:.2f} s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} req/s | Unexpected failures: {failures}")
+    print("Latency (ms): " + " | ".join(
+        f"p{label} {percentile(latencies, fraction) * 1000:.2f}"
+        for label, fraction in (("50", 0.50), ("90", 0.90), ("99", 0.99))
+    ) + f" | max {latencies[-1] * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
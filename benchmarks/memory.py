@@ -0,0 +1,61 @@
+"""Compare the memory used by the list-of-dicts and columnar inventories.
+
+Run from the project directory:
+
+    python -m benchmarks.memory --products 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from columnar import ColumnarInventoryStore
+from models import build_product
+from store import InventoryStore
+
+
+def synthetic_products(count):
+    """Yield ``count`` product dicts with distinct names."""
+    for index in range(count):
+        yield build_product(f"Product {index}", index % 500 + 1, float(index % 1000) + 0.99)
+
+
+def measure(factory, count):
+    """Return the bytes allocated while building an inventory of ``count`` products."""
+    gc.collect()
+    tracemalloc.start()
+    inventory = factory(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del inventory
+    return current
+
+
+def build_list(count):
+    return list(synthetic_products(count))
+
+
+def build_store(count):
+    return InventoryStore(synthetic_products(count))
+
+
+def build_columnar(count):
+    return ColumnarInventoryStore(synthetic_products(count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"Products: {args.products}")
+    for label, factory in (
+        ("list of dicts", build_list),
+        ("InventoryStore", build_store),
+        ("ColumnarInventoryStore", build_columnar),
+    ):
+        used = measure(factory, args.products)
+        print(f"{label:<24} {used / 1024 / 1024:10.1f} MiB  {used / args.products:8.1f} bytes/product")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""Benchmark suite for CRUD, statistics and CSV I/O at several scales.
+
+Builds synthetic inventories (10^3 to 10^7 products), times the real
+application functions on them and reports throughput, latency
+percentiles and peak memory. Results are saved as JSON; pass a previous
+results file as ``--baseline`` to flag regressions. Run from the
+project directory:
+
+    python -m benchmarks.suite --sizes 1000 100000 --output results.json
+    python -m benchmarks.suite --sizes 1000 100000 --baseline results.json --threshold 0.15
+
+The exit status is 1 when a regression beyond the threshold was found.
+"""
+import argparse
+import builtins
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import app
+from data import PHASE_ROWS, export_to_csv, import_from_csv, parse_row
+from models import build_product
+from store import InventoryStore
+import utils
+from utils import get_product_by_name, validate_product_name
+from validation import validate_rows
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Single-product operations timed per size
+DEFAULT_SAMPLES = 2_000
+
+# Runs of whole-inventory operations (statistics, export, import)
+DEFAULT_REPEATS = 3
+
+# Times each name appears in the repetitive feed benchmarks
+FEED_REPEATS = 8
+
+# Relative throughput loss reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+_ADJECTIVES = (
+    "fresh", "organic", "whole", "large", "small", "premium", "classic", "light",
+    "dark", "sweet", "spicy", "frozen", "dried", "roasted", "natural", "extra",
+)
+_NOUNS = (
+    "milk", "bread", "coffee", "rice", "beans", "apple", "banana", "cheese",
+    "butter", "flour", "sugar", "tea", "pasta", "tomato", "onion", "chicken",
+    "juice", "water", "salt", "pepper", "honey", "yogurt", "cereal", "lettuce",
+)
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _letters_for(index):
+    """Encode an index with letters only (product names allow no digits)."""
+    code = ""
+    while True:
+        index, digit = divmod(index, 26)
+        code += _LETTERS[digit]
+        if not index:
+            return code
+
+
+def synthetic_name(rng, index):
+    """Return a unique, realistic product name for ``index``.
+
+    Names share a skewed set of common words (a few nouns dominate, as in
+    real catalogues) followed by a distinct variant code.
+    """
+    noun = _NOUNS[min(len(_NOUNS) - 1, int(rng.expovariate(0.25)))]
+    if rng.random() < 0.6:
+        noun = f"{rng.choice(_ADJECTIVES)} {noun}"
+    return f"{noun} {_letters_for(index)}".capitalize()
+
+
+def synthetic_inventory(count, seed=0):
+    """Return ``count`` product dicts with realistic prices and quantities."""
+    rng = random.Random(seed)
+    products = []
+    for index in range(count):
+        price = round(min(10_000.0, rng.lognormvariate(2.5, 1.0)), 2) + 0.01
+        quantity = int(rng.expovariate(1 / 40))
+        products.append(build_product(synthetic_name(rng, index), quantity, price))
+    return products
+
+
+def summarize(latencies, items):
+    """Return throughput and latency percentiles for a list of durations (seconds).
+
+    ``items`` is the number of operations or rows processed over all runs.
+    """
+    latencies = sorted(latencies)
+    total = sum(latencies)
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1e6
+
+    return {
+        "runs": len(latencies),
+        "items": items,
+        "seconds": total,
+        "throughput": items / total if total else None,
+        "p50_us": percentile(0.50),
+        "p90_us": percentile(0.90),
+        "p99_us": percentile(0.99),
+        "max_us": latencies[-1] * 1e6,
+    }
+
+
+def peak_memory(setup, operation):
+    """Return the peak bytes allocated by ``operation(setup())``, not counting the setup."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        state = setup()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        operation(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+@contextlib.contextmanager
+def quiet(answers=()):
+    """Silence stdout and answer ``input()`` prompts from ``answers``."""
+    replies = iter(answers)
+    original_input = builtins.input
+    builtins.input = lambda prompt="": next(replies)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = original_input
+
+
+def fresh_store(products):
+    return InventoryStore(dict(product) for product in products)
+
+
+def bench_get_product_by_name(products, samples, rng):
+    store = fresh_store(products)
+    names = [rng.choice(products)["name"] for _ in range(samples)]
+    # One lookup in ten misses
+    names[::10] = [f"Missing {_letters_for(i)}" for i in range(len(names[::10]))]
+
+    timer = time.perf_counter
+    latencies = []
+    for name in names:
+        started = timer()
+        get_product_by_name(store, name)
+        latencies.append(timer() - started)
+    return summarize(latencies, len(names)), lambda: store, lambda store: [get_product_by_name(store, name) for name in names]
+
+
+def bench_add_product(products, samples, rng):
+    app.inventory = fresh_store(products)
+    new = synthetic_inventory(samples, seed=rng.random())
+    # Half of the adds merge into existing products
+    new[::2] = [dict(product) for product in rng.sample(products, min(len(products), len(new[::2])))]
+
+    timer = time.perf_counter
+    latencies = []
+    with quiet():
+        for product in new:
+            started = timer()
+            app.add_product(product["name"], product["quantity"], product["price"])
+            latencies.append(timer() - started)
+
+    def setup():
+        app.inventory = fresh_store(products)
+
+    def run_once(state):
+        with quiet():
+            for product in new:
+                app.add_product(product["name"], product["quantity"], product["price"])
+
+    return summarize(latencies, len(new)), setup, run_once
+
+
+def bench_delete_product(products, samples, rng):
+    victims = [product["name"] for product in rng.sample(products, min(samples, len(products)))]
+    inventory = fresh_store(products)
+
+    timer = time.perf_counter
+    latencies = []
+    for name in victims:
+        with quiet((name, "Y")):
+            started = timer()
+            app.delete_product(inventory)
+            latencies.append(timer() - started)
+
+    def run_once(store):
+        with quiet([answer for name in victims for answer in (name, "Y")]):
+            for _ in victims:
+                app.delete_product(store)
+
+    return summarize(latencies, len(victims)), lambda: fresh_store(products), run_once
+
+
+def repetitive_names(products, samples, rng):
+    """Return ``samples`` raw names drawn from 1/FEED_REPEATS of the products, as a feed repeats them.
+
+    Every name is a distinct string object, as when it is read from a file.
+    """
+    pool = [product["name"] for product in products[:max(1, len(products) // FEED_REPEATS)]]
+    return [f" {rng.choice(pool).lower()} " for _ in range(samples)]
+
+
+def _validate_uncached(user_input):
+    """validate_product_name without its LRU cache (fast path included)."""
+    name, error = utils._checked_name.__wrapped__(user_input)
+    if error is not None:
+        raise ValueError(error)
+    return name
+
+
+def bench_validate_product_name(products, samples, rng, cached=True):
+    check = validate_product_name if cached else _validate_uncached
+    names = repetitive_names(products, samples, rng)
+    utils._checked_name.cache_clear()
+
+    timer = time.perf_counter
+    latencies = []
+    for name in names:
+        started = timer()
+        check(name)
+        latencies.append(timer() - started)
+    return summarize(latencies, len(names)), lambda: names, lambda names: [check(name) for name in names]
+
+
+def raw_rows(products):
+    """Return the products as CSV rows of strings, as the import reads them."""
+    return [[product["name"], repr(product["price"]), str(product["quantity"])] for product in products]
+
+
+def _parse_rows(block):
+    """Validate a block row by row with parse_row (the pre-columnar import path)."""
+    products = []
+    for row in block:
+        try:
+            product = parse_row(row)
+        except ValueError:
+            continue
+        if product is not None:
+            products.append(product)
+    return products
+
+
+def bench_validate_rows(products, repeats, columnar=True):
+    check = validate_rows if columnar else _parse_rows
+    rows = raw_rows(products)
+    blocks = [rows[start:start + PHASE_ROWS] for start in range(0, len(rows), PHASE_ROWS)]
+
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for block in blocks:
+            check(block)
+        latencies.append(time.perf_counter() - started)
+
+    def run_once(blocks):
+        for block in blocks:
+            check(block)
+
+    return summarize(latencies, repeats * len(rows)), lambda: blocks, run_once
+
+
+def bench_calculate_statistics(products, repeats, rng):
+    inventory = fresh_store(products)
+    latencies = []
+    for _ in range(repeats):
+        # Touch one product so each run sees a changed inventory
+        inventory.update(inventory.get(rng.choice(products)["name"]), quantity=rng.randrange(100))
+        started = time.perf_counter()
+        app.calculate_statistics(inventory)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, repeats), lambda: inventory, app.calculate_statistics
+
+
+def bench_export_to_csv(products, repeats, directory, rng):
+    inventory = fresh_store(products)
+    path = os.path.join(directory, "export.csv")
+
+    def touch(inventory):
+        # A changed inventory defeats the skip of unchanged exports (export_is_current)
+        inventory.update(inventory.get(rng.choice(products)["name"]), quantity=rng.randrange(100))
+
+    latencies = []
+    with quiet():
+        for _ in range(repeats):
+            touch(inventory)
+            started = time.perf_counter()
+            export_to_csv(inventory, path)
+            latencies.append(time.perf_counter() - started)
+
+    def run_once(inventory):
+        touch(inventory)
+        with quiet():
+            export_to_csv(inventory, path)
+
+    return summarize(latencies, repeats * len(products)), lambda: inventory, run_once
+
+
+def bench_import_from_csv(products, repeats, directory, action):
+    path = os.path.join(directory, "import.csv")
+    if not os.path.exists(path):
+        with quiet():
+            export_to_csv(products, path)
+    # Merge into an inventory that already holds half of the file
+    base = products[::2] if action == "merge" else products[:1]
+
+    latencies = []
+    with quiet():
+        for _ in range(repeats):
+            inventory = fresh_store(base)
+            started = time.perf_counter()
+            import_from_csv(inventory, path, action=action)
+            latencies.append(time.perf_counter() - started)
+
+    def run_once(inventory):
+        with quiet():
+            import_from_csv(inventory, path, action=action)
+
+    return summarize(latencies, repeats * len(products)), lambda: fresh_store(base), run_once
+
+
+def bench_import_repetitive_feed(products, repeats, directory, rng):
+    path = os.path.join(directory, "feed.csv")
+    rows = [
+        {"name": name.strip(), "price": round(rng.uniform(1, 100), 2), "quantity": rng.randrange(10)}
+        for name in repetitive_names(products, len(products), rng)
+    ]
+    with quiet():
+        export_to_csv(rows, path)
+
+    latencies = []
+    with quiet():
+        for _ in range(repeats):
+            inventory = fresh_store(())
+            started = time.perf_counter()
+            import_from_csv(inventory, path, action="merge")
+            latencies.append(time.perf_counter() - started)
+
+    def run_once(inventory):
+        with quiet():
+            import_from_csv(inventory, path, action="merge")
+
+    return summarize(latencies, repeats * len(rows)), lambda: fresh_store(()), run_once
+
+
+def run_size(count, samples, repeats, measure_memory, seed=0):
+    """Run every benchmark on an inventory of ``count`` products."""
+    rng = random.Random(seed)
+    products = synthetic_inventory(count, seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        benchmarks = {
+            "get_product_by_name": lambda: bench_get_product_by_name(products, samples, rng),
+            "add_product": lambda: bench_add_product(products, samples, rng),
+            "delete_product": lambda: bench_delete_product(products, samples, rng),
+            "calculate_statistics": lambda: bench_calculate_statistics(products, repeats, rng),
+            "export_to_csv": lambda: bench_export_to_csv(products, repeats, directory, rng),
+            "import_from_csv_overwrite": lambda: bench_import_from_csv(products, repeats, directory, "overwrite"),
+            "import_from_csv_merge": lambda: bench_import_from_csv(products, repeats, directory, "merge"),
+            "import_repetitive_feed": lambda: bench_import_repetitive_feed(products, repeats, directory, rng),
+            "validate_product_name": lambda: bench_validate_product_name(products, samples, rng),
+            "validate_product_name_uncached": lambda: bench_validate_product_name(products, samples, rng, cached=False),
+            "validate_rows": lambda: bench_validate_rows(products, repeats),
+            "validate_rows_parse_row": lambda: bench_validate_rows(products, repeats, columnar=False),
+        }
+        for name, benchmark in benchmarks.items():
+            gc.collect()
+            summary, setup, run_once = benchmark()
+            if measure_memory:
+                summary["peak_memory_bytes"] = peak_memory(setup, run_once)
+            results[name] = summary
+            print(
+                f"{count:>10,} {name:<26} {summary['throughput']:>14,.0f}/s"
+                f"  p50 {summary['p50_us']:>10.1f} us  p99 {summary['p99_us']:>10.1f} us"
+                + (f"  peak {summary['peak_memory_bytes'] / 1024 / 1024:8.1f} MiB" if measure_memory else ""),
+                file=sys.stderr,
+            )
+    return results
+
+
+def environment():
+    """Describe the machine and the commit the results belong to."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """Return (size, benchmark, old, new) for every throughput drop beyond ``threshold``."""
+    regressions = []
+    for size, benchmarks in results["results"].items():
+        for name, summary in benchmarks.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not old or not old.get("throughput") or not summary.get("throughput"):
+                continue
+            if summary["throughput"] < old["throughput"] * (1 - threshold):
+                regressions.append((size, name, old["throughput"], summary["throughput"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="inventory sizes to benchmark (up to 10^7)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help="single-product operations timed per size")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="runs of whole-inventory operations per size")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative throughput loss flagged as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "results": {}}
+    for count in args.sizes:
+        results["results"][str(count)] = run_size(count, args.samples, args.repeats, not args.no_memory)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results saved to: {args.output}", file=sys.stderr)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for size, name, old, new in regressions:
+            print(f"REGRESSION {name} at {size} products: {old:,.0f}/s -> {new:,.0f}/s "
+                  f"({(new / old - 1) * 100:+.1f}%)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from listeners import InventoryListener
+
+
+class ChangeTracker(InventoryListener):
+    """Dirty tracking of an inventory since the last sync point.
+
+    Follows store events and remembers which products were added or
+    changed (``changed``) and which were deleted (``deleted``, key ->
+    last name), so a delta export touches only those products. A bulk
+    change (``on_reset``: clear, overwrite import, bulk price change)
+    cannot be narrowed down and marks the whole inventory as changed
+    (``full``).
+
+    Memory and delta size grow with the number of changed products, not
+    with the size of the inventory.
+    """
+
+    def __init__(self):
+        self.changed = set()
+        self.deleted = {}
+        self.full = False
+
+    def __len__(self):
+        return len(self.changed) + len(self.deleted)
+
+    def __bool__(self):
+        return self.full or bool(self.changed) or bool(self.deleted)
+
+    def on_insert(self, key, name, price, quantity):
+        self.changed.add(key)
+        self.deleted.pop(key, None)
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self.changed.add(key)
+
+    def on_delete(self, key, name, price, quantity):
+        self.changed.discard(key)
+        self.deleted[key] = name
+
+    def on_reset(self, store):
+        self.changed.clear()
+        self.deleted.clear()
+        self.full = True
+
+    def mark_clean(self):
+        """Start a new sync point (after a delta or full export was shipped)."""
+        self.changed = set()
+        self.deleted = {}
+        self.full = False
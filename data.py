@@ -1,48 +1,845 @@
 # files.py
+import contextlib
 import csv
+import glob
+import gzip
+import io
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from metrics import registry, timed
+from store import InventoryStore
+from utils import normalize_name, recalc_total_cost
+from validation import validate_rows
 
 DEFAULT_PATH = "inventory.csv"
 
+# Rows applied per batch by streamed imports
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Below this many bytes per worker a parallel parse is not worth the overhead
+MIN_PARALLEL_RANGE_BYTES = 4 * 1024 * 1024
+
+# Uncompressed files at least this large are parsed in a process pool on import
+PARALLEL_IMPORT_BYTES = 2 * MIN_PARALLEL_RANGE_BYTES
+
+# Rows tokenized, then validated, per timed step of an import
+PHASE_ROWS = 4096
+
+# Invalid rows kept (line number and reason) per import for the error report
+MAX_REPORTED_ERRORS = 100
+
+# Invalid rows printed after an interactive import
+MAX_PRINTED_ERRORS = 10
+
+# Rows handed to csv.writer.writerows at a time by the export
+EXPORT_CHUNK_ROWS = 8192
+
+# Write buffer of the export file
+EXPORT_BUFFER_BYTES = 1024 * 1024
+
+# gzip level of compressed exports (speed over size)
+EXPORT_GZIP_LEVEL = 6
+
+# File names picked up when a feed source is a directory
+FEED_PATTERNS = ("*.csv", "*.csv.gz")
+
+# Delta files: product columns plus the operation of each row
+DELTA_HEADER = ["name", "price", "quantity", "op"]
+DELTA_UPSERT = "upsert"
+DELTA_DELETE = "delete"  # tombstone: the product was removed
+DELTA_RESET = "reset"    # the receiver clears its inventory first
+
+# Inventory -> {absolute path: (version, file fingerprint)} of the last saves
+_saved_exports = weakref.WeakKeyDictionary()
+
+
+class CSVFormatError(ValueError):
+    """Raised when a CSV file cannot be imported as a whole (bad header)."""
+
+
+class ImportCounter:
+    """Running counts of loaded and invalid rows during an import.
+
+    ``errors`` keeps (line number, reason) of the first MAX_REPORTED_ERRORS
+    invalid rows.
+    """
+
+    def __init__(self):
+        self.loaded = 0
+        self.invalid = 0
+        self.errors = []
+
+    def add(self, block):
+        """Count a validated block (see validation.ValidatedBlock)."""
+        invalid = block.invalid
+        self.loaded += len(block)
+        self.invalid += invalid
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        if invalid and room > 0:
+            self.errors.extend(islice(block.errors(), room))
+
+
+class FeedReport:
+    """Outcome of one file of a multi-file import."""
+
+    def __init__(self, path, loaded=0, invalid=0, seconds=0.0, error=None):
+        self.path = path
+        self.loaded = loaded
+        self.invalid = invalid
+        self.seconds = seconds
+        self.error = error
+
+    def __repr__(self):
+        return f"FeedReport({self.path!r}, loaded={self.loaded}, invalid={self.invalid}, error={self.error!r})"
+
+
+# Fingerprint of a file on disk (None when it does not exist)
+def file_fingerprint(path):
+    """Returns (size, mtime_ns) of the file, or None."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+# Check whether a file already holds the current inventory
+def export_is_current(inventory, path):
+    """
+    Returns True when ``path`` is untouched since export_to_csv wrote it
+    and the inventory's ``version`` has not changed since then. Plain
+    lists have no version and are never considered current.
+    """
+    try:
+        saved = _saved_exports.get(inventory, {}).get(os.path.abspath(path))
+    except TypeError:
+        # Unhashable or not weak-referenceable (plain lists, snapshots)
+        return False
+    if saved is None:
+        return False
+
+    version, fingerprint = saved
+    return version == getattr(inventory, "version", None) and fingerprint == file_fingerprint(path)
+
+
+def _format_block(block):
+    """
+    Returns the CSV text of a block of (name, price, quantity) rows, or
+    None when a field would need quoting (csv.writer then handles it).
+    """
+    text = "".join([f"{name},{price},{quantity}\r\n" for name, price, quantity in block])
+    rows = len(block)
+    if text.count(",") != 2 * rows or text.count("\n") != rows or text.count("\r") != rows or '"' in text:
+        return None
+    return text
+
+
+# Write a text file through a temp file and an atomic rename
+@contextlib.contextmanager
+def atomic_text_file(path, compress=False):
+    """
+    Yields a UTF-8 text file (newline="") that replaces ``path`` only when
+    the block completes: the data goes to ``path + ".tmp"`` through a
+    large buffer, is fsynced and then atomically renamed over ``path``, so
+    a crash never leaves a half-written file. ``compress`` gzips it.
+    """
+    temp_path = path + ".tmp"
+    with timed("csv.export.open"):
+        raw = open(temp_path, "wb", buffering=EXPORT_BUFFER_BYTES)
+
+    try:
+        with raw:
+            if compress:
+                file = gzip.open(raw, "wt", compresslevel=EXPORT_GZIP_LEVEL, encoding="utf-8", newline="")
+            else:
+                file = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+            yield file
+
+            if compress:
+                file.close()
+            else:
+                file.flush()
+                file.detach()
+            raw.flush()
+            os.fsync(raw.fileno())
+
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+# Write blocks of (name, price, quantity) rows
+def write_rows(file, rows, preformat=True):
+    """
+    Writes the rows in blocks of EXPORT_CHUNK_ROWS with csv.writer, or as
+    preformatted text when ``preformat`` is set and no field of the block
+    needs quoting. Returns the number of rows written.
+    """
+    writer = csv.writer(file)
+    written = 0
+    while True:
+        block = list(islice(rows, EXPORT_CHUNK_ROWS))
+        if not block:
+            return written
+        text = _format_block(block) if preformat else None
+        if text is None:
+            writer.writerows(block)
+        else:
+            file.write(text)
+        written += len(block)
+
 
 # Save inventory to CSV file
-def export_to_csv(inventory, path=DEFAULT_PATH, include_header=True):
+def export_to_csv(inventory, path=DEFAULT_PATH, include_header=True, compress=None):
     """
     Saves the inventory to a CSV file.
     Format: name,price,quantity
+    Returns True when the file was written (or was already up to date).
+
+    Rows are written in blocks (preformatted when no field needs quoting)
+    and the file is replaced atomically (see atomic_text_file). When the
+    inventory has not changed since it was last saved to the same
+    (untouched) file, nothing is rewritten.
+
+    compress: gzip the file; by default, when the path ends with ".gz".
     """
     try:
         if not inventory:
             print("The inventory is empty. There is no data to save.")
-            return
+            return False
 
-        with open(path, "w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
+        if export_is_current(inventory, path):
+            print(f"Inventory unchanged since the last save: {path}")
+            return True
+
+        if compress is None:
+            compress = path.endswith(".gz")
 
+        with atomic_text_file(path, compress) as file, timed("csv.export.write") as write:
             if include_header:
                 # Header as specified
-                writer.writerow(["name", "price", "quantity"])
+                file.write("name,price,quantity\r\n")
 
-            for product in inventory:
-                writer.writerow(
-                    [
-                        product.get("name"),
-                        product.get("price"),
-                        product.get("quantity"),
-                    ]
-                )
+            if hasattr(inventory, "iter_rows"):
+                # Stores yield plain tuples, which can be preformatted
+                write["rows"] = write_rows(file, inventory.iter_rows())
+            else:
+                rows = ((product.get("name"), product.get("price"), product.get("quantity"))
+                        for product in inventory)
+                write["rows"] = write_rows(file, rows, preformat=False)
+
+        with contextlib.suppress(TypeError):
+            _saved_exports.setdefault(inventory, {})[os.path.abspath(path)] = (
+                getattr(inventory, "version", None),
+                file_fingerprint(path),
+            )
 
         print(f"Inventory saved to: {path}")
+        return True
 
     except PermissionError:
         print("The file could not be saved due to permission issues.")
     except Exception as e:
         print(f"An error occurred while saving the CSV: {e}")
 
+    return False
+
+
+# Save only the products changed since the last delta
+def export_delta(inventory, path, compress=None):
+    """
+    Writes the changes recorded by ``inventory.changes`` (see changes.py)
+    as a delta file and starts a new sync point.
+    Format: name,price,quantity,op
+
+    - changed or added product: its current values, op "upsert"
+    - deleted product: a tombstone row (name only), op "delete"
+    - after a bulk change: a "reset" row followed by every product
+
+    Rows are sorted by name, so the same changes give the same file. The
+    cost depends on the number of changes, not on the inventory size.
+    Returns the number of change rows written, or None on error.
+    """
+    tracker = inventory.changes
+    try:
+        if compress is None:
+            compress = path.endswith(".gz")
+
+        with atomic_text_file(path, compress) as file, timed("csv.export.delta") as write:
+            writer = csv.writer(file)
+            writer.writerow(DELTA_HEADER)
+
+            if tracker.full:
+                writer.writerow(["", "", "", DELTA_RESET])
+                rows = ((name, price, quantity, DELTA_UPSERT) for name, price, quantity in inventory.iter_rows())
+            else:
+                upserts = (inventory.get(key) for key in sorted(tracker.changed))
+                rows = [
+                    (product["name"], product["price"], product["quantity"], DELTA_UPSERT)
+                    for product in upserts if product is not None
+                ]
+                rows.extend((name, "", "", DELTA_DELETE) for _, name in sorted(tracker.deleted.items()))
+
+            write["rows"] = write_rows(file, iter(rows), preformat=False)
+
+        tracker.mark_clean()
+        print(f"Changes saved to: {path} ({write['rows']} rows)")
+        return write["rows"]
+
+    except PermissionError:
+        print("The file could not be saved due to permission issues.")
+    except Exception as e:
+        print(f"An error occurred while saving the delta: {e}")
+
+    return None
+
+
+# Parse and validate a single delta row
+def parse_delta_row(row):
+    """
+    Returns (op, product) for a delta row, or (None, None) for blank rows.
+    For tombstones the product only has a name; for "reset" it is None.
+    Raises ValueError for invalid rows.
+    """
+    if not row or all(col.strip() == "" for col in row):
+        return None, None
+
+    if len(row) != 4:
+        raise ValueError("Expected 4 columns.")
+
+    op = row[3].strip().lower()
+    if op == DELTA_UPSERT:
+        return op, parse_row(row[:3])
+    if op == DELTA_DELETE:
+        name = row[0].strip()
+        if not name:
+            raise ValueError("A tombstone needs a product name.")
+        return op, {"name": name}
+    if op == DELTA_RESET:
+        return op, None
+
+    raise ValueError(f"Unknown delta op '{row[3]}'.")
+
+
+# Apply a delta file to an inventory store
+def apply_delta(store, path):
+    """
+    Applies a delta file written by export_delta to the store in place:
+    upserts set the price and quantity (they are not summed), tombstones
+    remove the product, "reset" clears the store. Work is proportional to
+    the size of the delta.
+
+    Returns (rows_applied, invalid_rows).
+    Raises CSVFormatError when the header is not name,price,quantity,op.
+    """
+    applied = 0
+    invalid_rows = 0
+
+    with open_csv(path) as file, timed("csv.import.delta") as counter:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None or [col.strip().lower() for col in header] != DELTA_HEADER:
+            raise CSVFormatError("Invalid delta header. Expected: name,price,quantity,op.")
+
+        for row in reader:
+            try:
+                op, product = parse_delta_row(row)
+            except ValueError:
+                invalid_rows += 1
+                continue
+            if op is None:
+                continue
+
+            if op == DELTA_RESET:
+                store.clear()
+            else:
+                existing = store.get(product["name"])
+                if op == DELTA_DELETE:
+                    if existing is not None:
+                        store.remove(existing)
+                elif existing is not None:
+                    store.update(existing, price=product["price"], quantity=product["quantity"])
+                else:
+                    store.append(product)
+            applied += 1
+
+        counter["rows"] = applied + invalid_rows
+
+    return applied, invalid_rows
+
+
+# Apply a delta file on top of a base CSV file
+def apply_delta_to_csv(base_path, delta_path, output_path=None):
+    """
+    Loads the base CSV file, applies the delta and saves the result to
+    ``output_path`` (the base file itself by default, replaced atomically).
+
+    Returns (rows_applied, invalid_rows).
+    Raises CSVFormatError when either header is invalid, OSError when the
+    result cannot be saved.
+    """
+    products, _ = read_csv_products(base_path)
+    base = merge_products(InventoryStore(), products)
+    result = apply_delta(base, delta_path)
+    output_path = output_path or base_path
+    if not base:
+        # Every product was deleted: export_to_csv refuses an empty inventory
+        with atomic_text_file(output_path, output_path.endswith(".gz")) as file:
+            file.write("name,price,quantity\r\n")
+    elif not export_to_csv(base, output_path):
+        raise OSError(f"The result could not be saved to {output_path}.")
+    return result
+
+
+# Merge loaded products into an indexed inventory store
+def merge_products(store, products):
+    """
+    Merges products into the store using the name index.
+
+    Rules:
+    - Existing product (same normalized name): quantities are summed and
+      the loaded price replaces the current one
+    - New product: appended to the store
+
+    Rows repeating a name are combined first (quantities summed, last
+    price kept), so the store and its listeners see one write per
+    distinct product instead of one per row.
+    """
+    with timed("csv.import.merge") as merge:
+        rows = 0
+        combined = {}
+        for new_product in products:
+            key = normalize_name(new_product["name"])
+            entry = combined.get(key)
+            if entry is None:
+                combined[key] = [new_product, new_product["price"], new_product["quantity"]]
+            else:
+                entry[1] = new_product["price"]
+                entry[2] += new_product["quantity"]
+            rows += 1
+
+        for key, (new_product, price, quantity) in combined.items():
+            existing = store.get(key)
+
+            if existing:
+                store.update(existing, price=price, quantity=existing["quantity"] + quantity)
+            else:
+                if quantity != new_product["quantity"] or price != new_product["price"]:
+                    new_product["price"] = price
+                    new_product["quantity"] = quantity
+                    if "total_cost" in new_product:
+                        recalc_total_cost(new_product)
+                store.append(new_product)
+        merge["rows"] = rows
+
+    return store
+
+
+# Validate the CSV header
+def check_header(header):
+    """
+    Raises CSVFormatError when the header is missing or is not
+    name,price,quantity (case and surrounding spaces are ignored).
+    """
+    if header is None:
+        raise CSVFormatError("The CSV file is empty.")
+
+    expected_header = ["name", "price", "quantity"]
+    normalized_header = [col.strip().lower() for col in header]
+
+    if normalized_header != expected_header:
+        raise CSVFormatError("Invalid header. Expected: name,price,quantity.")
+
+
+# Parse and validate a single CSV row
+def parse_row(row):
+    """
+    Converts a CSV row into a product dict.
+
+    Returns None for blank rows (they are ignored, not counted).
+    Raises ValueError for invalid rows:
+    - not exactly 3 columns
+    - price not a float >= 0
+    - quantity not an int >= 0
+    """
+    if len(row) == 3:
+        # Fast path for the usual row: only look at the other columns when
+        # the name is blank
+        name = row[0].strip()
+        if not name and not row[1].strip() and not row[2].strip():
+            return None
+    elif not row or all(col.strip() == "" for col in row):
+        return None
+    else:
+        raise ValueError("Expected 3 columns.")
+
+    price = float(row[1])
+    quantity = int(row[2])
+
+    if price < 0 or quantity < 0:
+        raise ValueError("Price and quantity must be >= 0.")
+
+    return {
+        "name": name,
+        "price": price,
+        "quantity": quantity,
+    }
+
 
+# Stream validated blocks of rows out of an open CSV file
+def iter_csv_blocks(file, counter):
+    """
+    Generator yielding one validation.ValidatedBlock per PHASE_ROWS rows,
+    after checking the header. Rows are validated column by column (see
+    validation.py), so only one block is held in memory and each phase is
+    timed per block. Loaded and invalid rows (with their line numbers)
+    are counted on ``counter`` as they are read.
+    """
+    reader = csv.reader(file)
+    check_header(next(reader, None))
+    clock = time.perf_counter
+
+    while True:
+        started = clock()
+        first_line = reader.line_num + 1
+        rows = list(islice(reader, PHASE_ROWS))
+        if not rows:
+            return
+        parsed = clock()
+        registry.record("csv.import.parse", parsed - started, len(rows))
+
+        block = validate_rows(rows, first_line)
+        counter.add(block)
+        registry.record("csv.import.validate", clock() - parsed, len(rows))
+
+        yield block
+
+
+# Stream valid products out of an open CSV file
+def iter_csv_products(file, counter):
+    """
+    Generator yielding one product dict per valid row (see
+    iter_csv_blocks for the checks and the counting).
+    """
+    for block in iter_csv_blocks(file, counter):
+        yield from block.products()
+
+
+# Read every valid product of a CSV file
+def read_csv_products(path, counter=None, workers=None):
+    """
+    Returns (products, invalid_rows) for the whole file; pass an
+    ImportCounter as ``counter`` to also get the invalid line numbers.
+    Files worth it (see use_parallel_parse) are parsed in a process pool
+    by parse_csv_parallel, as is any file when ``workers`` is given; the
+    result is the same as a sequential read.
+    Raises CSVFormatError on a missing or invalid header.
+    """
+    if workers is not None or use_parallel_parse(path):
+        return parse_csv_parallel(path, workers, counter)
+    return _read_csv_sequential(path, counter)
+
+
+# Read every valid product of a CSV file in this process
+def _read_csv_sequential(path, counter=None):
+    counter = counter if counter is not None else ImportCounter()
+    with open_csv(path) as file:
+        products = list(iter_csv_products(file, counter))
+    return products, counter.invalid
+
+
+# Decide whether an import parses the file in a process pool
+def use_parallel_parse(path):
+    """
+    Returns True for uncompressed files of at least PARALLEL_IMPORT_BYTES
+    on a machine with more than one core.
+    """
+    if path.endswith(".gz") or (os.cpu_count() or 1) < 2:
+        return False
+    try:
+        return os.path.getsize(path) >= PARALLEL_IMPORT_BYTES
+    except OSError:
+        return False
+
+
+# Check a CSV file without importing it
+def validate_csv(path):
+    """
+    Validates every row of the file with the import rules and returns the
+    ImportCounter: valid rows (``loaded``), invalid rows, and the line
+    number and reason of the first MAX_REPORTED_ERRORS invalid rows.
+    Raises CSVFormatError on a missing or invalid header.
+    """
+    counter = ImportCounter()
+    with open_csv(path) as file:
+        for _ in iter_csv_blocks(file, counter):
+            pass
+    return counter
+
+
+# Print the line numbers and reasons of invalid rows
+def print_row_errors(errors, invalid_rows):
+    """Prints the first MAX_PRINTED_ERRORS errors and how many were left out."""
+    shown = errors[:MAX_PRINTED_ERRORS]
+    for line, reason in shown:
+        print(f"  Line {line}: {reason}")
+    if shown and invalid_rows > len(shown):
+        print(f"  ... and {invalid_rows - len(shown)} more invalid rows")
+
+
+# Open a CSV file for reading (timed as the import "open" phase)
+def open_csv(path):
+    """Returns the file opened as UTF-8 text for the csv module (gzip when it ends with .gz)."""
+    with timed("csv.import.open"):
+        if path.endswith(".gz"):
+            return gzip.open(path, "rt", encoding="utf-8", newline="")
+        return open(path, "r", encoding="utf-8", newline="")
+
+
+# Split an iterable into lists of at most `size` items
+def iter_batches(iterable, size):
+    """Yields consecutive lists of up to ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# Ask the user whether to overwrite or merge
+def ask_import_action():
+    """Returns "overwrite" or "merge" from a Y/N prompt."""
+    while True:
+        choice = input(
+            "Overwrite current inventory? (Y/N): "
+        ).strip().upper()
+        if choice in ("Y", "N"):
+            break
+        print("Invalid option. Please answer Y or N.")
+
+    return "overwrite" if choice == "Y" else "merge"
+
+
+# Split a CSV file into byte ranges aligned on line boundaries
+def split_byte_ranges(path, parts):
+    """
+    Returns a list of (start, end) byte offsets covering the data rows of
+    the file (the header line is excluded). Every range starts at the
+    beginning of a line and ends right after a newline (or at EOF).
+
+    Quoted fields containing line breaks are not supported by this split;
+    product names never contain them.
+    """
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as file:
+        file.readline()
+        data_start = file.tell()
+        span = max(1, (size - data_start) // max(1, parts))
+
+        boundaries = [data_start]
+        for index in range(1, parts):
+            position = data_start + index * span
+            if position <= boundaries[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()
+            boundary = file.tell()
+            if boundary >= size:
+                break
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+
+
+# Parse one byte range of a CSV file (runs inside a worker process)
+def parse_byte_range(path, start, end):
+    """
+    Parses the rows between two byte offsets with the same rules as
+    parse_row (validated by column, see validation.py). Returns (rows,
+    counter, lines): the (name, price, quantity) tuples in file order, an
+    ImportCounter whose error line numbers count from 1 at ``start``, and
+    the number of lines in the range.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8")
+
+    rows = []
+    counter = ImportCounter()
+    reader = csv.reader(io.StringIO(text, newline=""))
+    while True:
+        first_line = reader.line_num + 1
+        block = list(islice(reader, PHASE_ROWS))
+        if not block:
+            break
+        validated = validate_rows(block, first_line)
+        counter.add(validated)
+        rows.extend(validated.rows())
+
+    return rows, counter, reader.line_num
+
+
+# Parse a whole CSV file on several cores
+def parse_csv_parallel(path, workers=None, counter=None):
+    """
+    Parses and validates a CSV file in a process pool.
+
+    The file is split into line-aligned byte ranges, each range is parsed
+    by parse_byte_range, and the partial results are concatenated in file
+    order, so the products, the invalid-row total and the reported line
+    numbers are exactly the ones a sequential read produces. Small and
+    gzip-compressed files are parsed in-process.
+
+    Returns (products, invalid_rows); ``counter`` (an ImportCounter) also
+    receives the invalid line numbers.
+    Raises CSVFormatError on a missing or invalid header.
+    """
+    counter = counter if counter is not None else ImportCounter()
+    if path.endswith(".gz"):
+        # Compressed files cannot be split into byte ranges
+        return _read_csv_sequential(path, counter)
+
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        check_header(next(csv.reader(file), None))
+
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    workers = max(1, min(workers, size // MIN_PARALLEL_RANGE_BYTES))
+    ranges = split_byte_ranges(path, workers)
+
+    with timed("csv.import.parse") as parse:
+        if len(ranges) <= 1:
+            partials = [parse_byte_range(path, start, end) for start, end in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+                partials = list(pool.map(
+                    parse_byte_range,
+                    [path] * len(ranges),
+                    [start for start, _ in ranges],
+                    [end for _, end in ranges],
+                ))
+
+        products = []
+        line = 1  # the header
+        for rows, partial, lines in partials:
+            products.extend(
+                {"name": name, "price": price, "quantity": quantity}
+                for name, price, quantity in rows
+            )
+            counter.loaded += partial.loaded
+            counter.invalid += partial.invalid
+            room = MAX_REPORTED_ERRORS - len(counter.errors)
+            counter.errors.extend((line + offset, reason) for offset, reason in partial.errors[:max(0, room)])
+            line += lines
+        parse["rows"] = counter.loaded + counter.invalid
+
+    return products, counter.invalid
+
+
+# Save the current state of the products a batch is about to change
+def remember_products(store, products, undo):
+    """
+    Records in undo (key -> product copy, or None when new) the state of
+    each product in the batch before it is first changed.
+    """
+    for product in products:
+        key = normalize_name(product["name"])
+        if key not in undo:
+            existing = store.get(key)
+            undo[key] = dict(existing) if existing is not None else None
+
+
+# Undo a partial merge
+def restore_products(store, undo):
+    """
+    Puts the products recorded by remember_products back as they were:
+    new products are removed and changed ones get their old values.
+    """
+    for key, before in undo.items():
+        current = store.get(key)
+        if before is None:
+            if current is not None:
+                store.remove(current)
+        elif current is not None:
+            store.update(current, price=before["price"], quantity=before["quantity"])
+        else:
+            store.append(before)
+
+
+# Stream a CSV file into the inventory in fixed-size batches
+def stream_import_csv(current_inventory, path, action, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Applies a CSV file to the inventory batch by batch.
+
+    Rows are parsed lazily and applied in batches of ``chunk_size``, so
+    peak memory does not depend on the file size (a merge only keeps the
+    previous values of the products it touches). The file is always read
+    in this process: a parallel parse (parse_csv_parallel) would hold
+    every row before the first batch. For "merge" the batches
+    go straight into the live inventory; if the file fails partway (for
+    example a decoding error on a later line), the products already
+    merged are put back as they were and the error is raised. For
+    "overwrite" they fill a new store that replaces the inventory only
+    if the whole file was read and had valid rows.
+
+    Parameters:
+    - current_inventory: InventoryStore or list of products
+    - path: CSV file path
+    - action: "overwrite" or "merge"
+    - chunk_size: rows per batch
+    - progress: optional callable(loaded_rows, invalid_rows) called after each batch
+
+    Returns (final_inventory, loaded_rows, invalid_rows).
+    Raises CSVFormatError on a missing or invalid header.
+    """
+    counter = ImportCounter()
+
+    if action == "overwrite":
+        target = InventoryStore()
+    elif isinstance(current_inventory, InventoryStore):
+        target = current_inventory
+    else:
+        target = InventoryStore(current_inventory)
+
+    # Previous state of the live products a merge touched, to undo a failed file
+    undo = {} if target is current_inventory else None
+    try:
+        with open_csv(path) as file:
+            for batch in iter_batches(iter_csv_products(file, counter), chunk_size):
+                if undo is not None:
+                    remember_products(target, batch, undo)
+                merge_products(target, batch)
+                if progress is not None:
+                    progress(counter.loaded, counter.invalid)
+    except BaseException:
+        if undo:
+            restore_products(target, undo)
+        raise
+
+    if action == "overwrite" and not counter.loaded:
+        target = current_inventory
+
+    return target, counter.loaded, counter.invalid
 
 
 # Load CSV file and merge or overwrite inventory
-def import_from_csv(current_inventory, path=DEFAULT_PATH):
+def import_from_csv(current_inventory, path=DEFAULT_PATH, action=None, chunk_size=None, progress=None,
+                    workers=None):
     """
     Loads products from a CSV file and replaces or merges with the current inventory.
 
@@ -52,96 +849,68 @@ def import_from_csv(current_inventory, path=DEFAULT_PATH):
     - price -> float >= 0
     - quantity -> int >= 0
     - Invalid rows are skipped and counted
-    """
-    loaded_inventory = []
-    invalid_rows = 0
 
+    Options:
+    - action: "overwrite" or "merge"; when None the user is asked
+    - chunk_size: when given, the file is streamed in batches of this
+      size (see stream_import_csv) instead of being loaded all at once;
+      the user is then asked before reading the rows
+    - progress: callable(loaded_rows, invalid_rows) for streamed imports
+    - workers: when given (and not streaming), rows are parsed in a pool
+      of this many processes (see parse_csv_parallel); by default files
+      of PARALLEL_IMPORT_BYTES or more use one process per core
+
+    The line numbers of the first invalid rows are printed when the file
+    is read in one piece.
+    """
+    errors = []
     try:
-        with open(path, "r", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            header = next(reader, None)
+        if chunk_size is not None:
+            with open_csv(path) as file:
+                check_header(next(csv.reader(file), None))
 
-            if header is None:
-                print("The CSV file is empty.")
-                return current_inventory
+            if action is None:
+                action = ask_import_action()
 
-            expected_header = ["name", "price", "quantity"]
-            normalized_header = [col.strip().lower() for col in header]
+            final_inventory, loaded, invalid_rows = stream_import_csv(
+                current_inventory, path, action, chunk_size, progress
+            )
+            if not loaded:
+                print("No valid products were found in the file.")
+                return current_inventory
+        else:
+            counter = ImportCounter()
+            loaded_inventory, invalid_rows = read_csv_products(path, counter, workers)
+            errors = counter.errors
+            loaded = len(loaded_inventory)
 
-           
-            if normalized_header != expected_header:
-                print("Invalid header. Expected: name,price,quantity.")
+            if not loaded_inventory:
+                print("No valid products were found in the file.")
                 return current_inventory
 
-            for row in reader:
-                
-                if not row or all(col.strip() == "" for col in row):
-                    continue
-
-                if len(row) != 3:
-                    invalid_rows += 1
-                    continue
-
-                try:
-                    name = row[0].strip()
-                    price = float(row[1])
-                    quantity = int(row[2])
-
-                    if price < 0 or quantity < 0:
-                        raise ValueError
-
-                    loaded_inventory.append(
-                        {
-                            "name": name,
-                            "price": price,
-                            "quantity": quantity,
-                        }
-                    )
-
-                except ValueError:
-                    invalid_rows += 1
-
-        if not loaded_inventory:
-            print("No valid products were found in the file.")
-            return current_inventory
-
-       
-        while True:
-            choice = input(
-                "Overwrite current inventory? (Y/N): "
-            ).strip().upper()
-            if choice in ("Y", "N"):
-                break
-            print("Invalid option. Please answer Y or N.")
+            if action is None:
+                action = ask_import_action()
 
-        if choice == "Y":
-            action = "overwrite"
-            final_inventory = loaded_inventory
-        else:
-            action = "merge"
-            final_inventory = current_inventory.copy()
-
-            for new_product in loaded_inventory:
-                existing = next(
-                    (p for p in final_inventory if p["name"] == new_product["name"]),
-                    None,
-                )
-
-                if existing:
-                    
-                    existing["quantity"] += new_product["quantity"]
-                    if existing["price"] != new_product["price"]:
-                        existing["price"] = new_product["price"]
-                else:
-                    final_inventory.append(new_product)
+            if action == "overwrite":
+                final_inventory = InventoryStore()
+            # Merge in place when the inventory is already indexed
+            elif isinstance(current_inventory, InventoryStore):
+                final_inventory = current_inventory
+            else:
+                final_inventory = InventoryStore(current_inventory)
+
+            merge_products(final_inventory, loaded_inventory)
 
         print(f"Inventory loaded from: {path}")
-        print(f"Products loaded: {len(loaded_inventory)}")
+        print(f"Products loaded: {loaded}")
         print(f"Invalid rows skipped: {invalid_rows}")
+        print_row_errors(errors, invalid_rows)
         print(f"Action performed: {action}")
 
         return final_inventory
 
+    except CSVFormatError as e:
+        print(e)
     except FileNotFoundError:
         print("The specified file was not found.")
     except UnicodeDecodeError:
@@ -152,4 +921,108 @@ def import_from_csv(current_inventory, path=DEFAULT_PATH):
     return current_inventory
 
 
+# List the CSV files of a directory or glob pattern
+def expand_feed_paths(source):
+    """
+    Returns the sorted list of files named by ``source``: every .csv and
+    .csv.gz file of a directory, or the files matching a glob pattern.
+    The sorted order is the order in which the feeds are merged.
+    """
+    if os.path.isdir(source):
+        paths = [path for pattern in FEED_PATTERNS for path in glob.glob(os.path.join(source, pattern))]
+    else:
+        paths = glob.glob(source)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+# Parse one feed file (runs inside a worker process)
+def parse_feed(path):
+    """
+    Returns (rows, invalid_rows, seconds, error) for one file, where rows
+    is a list of (name, price, quantity) tuples in file order. A file that
+    cannot be read gives no rows and an error message instead of raising,
+    so one bad feed does not stop the others.
+    """
+    started = time.perf_counter()
+    counter = ImportCounter()
+    rows = []
+    try:
+        with open_csv(path) as file:
+            for block in iter_csv_blocks(file, counter):
+                rows.extend(block.rows())
+    except FileNotFoundError:
+        return [], 0, time.perf_counter() - started, "The file was not found."
+    except UnicodeDecodeError:
+        return [], 0, time.perf_counter() - started, "Encoding error."
+    except (ValueError, OSError) as e:
+        return [], 0, time.perf_counter() - started, str(e)
+
+    return rows, counter.invalid, time.perf_counter() - started, None
+
+
+# Parse several feed files concurrently
+def parse_feeds(paths, workers=None):
+    """
+    Parses every file in its own worker process (at most ``workers`` at
+    a time), so with enough workers the parse takes as long as the
+    slowest file rather than the sum of all of them.
+
+    Returns a list of (FeedReport, products) in the order of ``paths``.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+
+    with timed("csv.import.feeds.parse") as parse:
+        if workers == 1:
+            results = [parse_feed(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(parse_feed, paths))
+        parse["rows"] = sum(len(rows) + invalid for rows, invalid, _, _ in results)
+
+    parsed = []
+    for path, (rows, invalid_rows, seconds, error) in zip(paths, results):
+        products = [{"name": name, "price": price, "quantity": quantity} for name, price, quantity in rows]
+        parsed.append((FeedReport(path, len(products), invalid_rows, seconds, error), products))
+    return parsed
+
+
+# Merge the products of several parsed feeds in a fixed order
+def merge_feeds(store, parsed):
+    """
+    Applies the feeds returned by parse_feeds with merge_products, one
+    file after the other in path order: quantities are summed, and when
+    several feeds price the same product the last file (then the last
+    row) wins. The result does not depend on which worker finished
+    first, and products repeated across feeds are written once.
+
+    Returns the list of FeedReport.
+    """
+    merge_products(store, chain.from_iterable(products for _, products in parsed))
+    return [report for report, _ in parsed]
+
+
+# Import every CSV file of a directory or glob pattern
+def import_feeds(current_inventory, source, action="merge", workers=None):
+    """
+    Parses the files named by ``source`` (see expand_feed_paths) in a
+    process pool and merges them into the inventory, or into a new one
+    for "overwrite".
+
+    Returns (final_inventory, reports), with one FeedReport per file.
+    Files that could not be read are reported with their error and
+    skipped; the inventory is unchanged when no file had valid rows.
+    """
+    paths = expand_feed_paths(source)
+    parsed = parse_feeds(paths, workers) if paths else []
+
+    if not any(report.loaded for report, _ in parsed):
+        return current_inventory, [report for report, _ in parsed]
+
+    if action == "overwrite":
+        final_inventory = InventoryStore()
+    elif isinstance(current_inventory, InventoryStore):
+        final_inventory = current_inventory
+    else:
+        final_inventory = InventoryStore(current_inventory)
 
+    return final_inventory, merge_feeds(final_inventory, parsed)
@@ -0,0 +1,735 @@
+"""Inventory backend that loads products from its CSV file on demand.
+
+Opening a ``LazyInventoryStore`` reads no product records: it builds (or
+reloads) a compact offset index of the CSV file and materializes a
+product only when it is looked up, updated or listed.
+
+- Index: the byte offset of every valid row, in file order, plus the
+  rows sorted by a 32-bit hash of their normalized name, so a lookup is
+  a binary search and one line read. It costs 16 bytes per product
+  (two arrays) and is saved next to the CSV (``inventory.idx``) with the
+  file's size and modification time, so later opens just load it.
+- Records: materialized products live in an LRU cache of ``cache_size``
+  entries. Changed records are marked dirty and written back when they
+  are evicted or on ``commit()``.
+- Write-back: changes are appended to a pending file next to the CSV
+  (``inventory.pending.csv``, in the delta format of ``data.py``), which
+  is replayed on open. ``compact()`` folds the pending changes into the
+  CSV file and re-indexes it.
+
+Resident memory is the index, the cache and the location of every
+product changed since the last compaction, whatever the size of the
+file. Names must not contain line breaks (as in ``split_byte_ranges``).
+"""
+import bisect
+import csv
+import heapq
+import io
+import mmap
+import operator
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from itertools import accumulate, compress, count, islice, repeat
+
+from data import (
+    DELTA_DELETE,
+    DELTA_HEADER,
+    DELTA_UPSERT,
+    CSVFormatError,
+    atomic_text_file,
+    check_header,
+    parse_row,
+    write_rows,
+)
+from listing import DEFAULT_PAGE_SIZE, InventoryListing
+from query import check_field
+from store import InventoryStore
+from utils import normalize_name
+from validation import ROW_VALID, validate_rows
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the index is sorted with sorted()
+    np = None
+
+# Materialized products kept in memory
+DEFAULT_CACHE_SIZE = 10_000
+
+# Bytes of the CSV file read per block while indexing or iterating
+SCAN_BLOCK_BYTES = 1024 * 1024
+
+# First block read while iterating (blocks then double up to SCAN_BLOCK_BYTES)
+FIRST_BLOCK_BYTES = 16 * 1024
+
+CSV_HEADER = "name,price,quantity\r\n"
+
+INDEX_MAGIC = b"INVIDX\0\0"
+INDEX_VERSION = 1
+
+# magic, version, little endian flag, invalid rows, source size, source mtime, rows
+INDEX_HEADER = struct.Struct("<8sHHQQqQ")
+
+_ROW_MASK = 0xFFFFFFFF
+
+_QUERY_VALUES = {
+    "price": lambda price, quantity: price,
+    "quantity": lambda price, quantity: quantity,
+    "value": lambda price, quantity: price * quantity,
+}
+
+
+def index_path_for(csv_path):
+    """Return the offset index path that belongs to a CSV file."""
+    return os.path.splitext(csv_path)[0] + ".idx"
+
+
+def pending_path_for(csv_path):
+    """Return the path of the pending changes of a lazily opened CSV file."""
+    return os.path.splitext(csv_path)[0] + ".pending.csv"
+
+
+def _fingerprint(path):
+    info = os.stat(path)
+    return info.st_size, info.st_mtime_ns
+
+
+def _name_hash(key):
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def _name_hashes(keys):
+    """``_name_hash`` of every key, at C speed."""
+    return map(zlib.crc32, map(str.encode, keys))
+
+
+def _csv_line(fields):
+    text = io.StringIO()
+    csv.writer(text).writerow(fields)
+    return text.getvalue().encode("utf-8")
+
+
+def _parse_line(line):
+    """Return the product of one CSV line (bytes)."""
+    return parse_row(next(csv.reader([line.decode("utf-8")]))[:3])
+
+
+def _rank(hashes):
+    """Return the row numbers sorted by hash, packed as hash << 32 | row."""
+    if np is not None:
+        slots = np.asarray(hashes, dtype=np.uint64) << np.uint64(32)
+        slots |= np.arange(len(hashes), dtype=np.uint64)
+        slots.sort()
+        ranked = array("Q")
+        ranked.frombytes(slots.tobytes())
+        return ranked
+    return array("Q", sorted(map(operator.or_, map(operator.lshift, hashes, repeat(32)), count())))
+
+
+def _has_shared_hash(slots):
+    """True when two neighbouring ranked slots have the same hash."""
+    if len(slots) < 2:
+        return False
+    if np is not None:
+        hashes = np.frombuffer(slots, dtype=np.uint64) >> np.uint64(32)
+        return bool((hashes[1:] == hashes[:-1]).any())
+    hashes = [slot >> 32 for slot in slots]
+    return any(map(operator.eq, hashes, islice(hashes, 1, None)))
+
+
+class LazyListing(InventoryListing):
+    """Paged listing that reads insertion-order pages straight from the file."""
+
+    def page_products(self, page, page_size=DEFAULT_PAGE_SIZE, sort_key="none", descending=False):
+        if sort_key != "none" or descending:
+            return super().page_products(page, page_size, sort_key, descending)
+        start = (page - 1) * page_size
+        return list(islice(self.store, start, start + page_size))
+
+
+class LazyInventoryStore(InventoryStore):
+    """Inventory backend over a CSV file, loaded on demand (see module docstring).
+
+    Parameters
+    ----------
+    path : str
+        The CSV file (name,price,quantity); created when missing.
+    cache_size : int, optional
+        Number of materialized products kept in memory.
+
+    Products are returned as plain dicts and stay valid while cached;
+    ``update`` also refreshes the dict it is given, as the SQLite store
+    does. Reads may run in one worker thread while the others read on
+    the main thread (the service does this for statistics); the record
+    cache and the pending file are guarded by a lock. Mutations must not
+    run at the same time. Whole-inventory operations (statistics, queries, exports)
+    stream the file without caching what they read. Rows repeating a name
+    are indexed once (the last one wins); invalid rows are skipped and
+    counted in ``invalid_rows``.
+    """
+
+    incremental_statistics = False
+
+    def __init__(self, path, cache_size=DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = max(1, cache_size)
+        self.index_path = index_path_for(path)
+        self.pending_path = pending_path_for(path)
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+        self._dirty = set()
+        # Products changed since the last compaction: key -> offset in the
+        # pending file, or None when deleted
+        self._moved = {}
+        # Live products that are not in the CSV file, in insertion order
+        self._added = {}
+
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.write(CSV_HEADER)
+        self._open_base()
+        self._open_pending()
+        super().__init__()
+
+    def __iter__(self):
+        for name, price, quantity in self.iter_rows():
+            yield {"name": name, "price": price, "quantity": quantity}
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __repr__(self):
+        return f"LazyInventoryStore({self.path!r}, {self._count} products)"
+
+    @property
+    def listing(self):
+        if self._listing is None:
+            self._listing = LazyListing(self)
+        return self._listing
+
+    # Index of the CSV file
+
+    def _open_base(self):
+        self._base = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._base.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._base.close()
+            raise CSVFormatError("Invalid header. Expected: name,price,quantity.")
+        if not self._load_index():
+            try:
+                self._build_index()
+            except ValueError:
+                self._close_base()
+                raise
+            try:
+                self._save_index()
+            except OSError:
+                pass  # The index is rebuilt on the next open
+        self._count = len(self._offsets)
+
+    def _close_base(self):
+        self._map.close()
+        self._base.close()
+
+    def _load_index(self):
+        """Load the saved index when it matches the CSV file; True when loaded."""
+        try:
+            with open(self.index_path, "rb") as file:
+                header = file.read(INDEX_HEADER.size)
+                if len(header) < INDEX_HEADER.size:
+                    return False
+                magic, version, little, invalid_rows, size, mtime_ns, rows = INDEX_HEADER.unpack(header)
+                if (magic != INDEX_MAGIC or version != INDEX_VERSION
+                        or little != (sys.byteorder == "little")
+                        or (size, mtime_ns) != _fingerprint(self.path)):
+                    return False
+                offsets = array("q")
+                slots = array("Q")
+                offsets.fromfile(file, rows)
+                slots.fromfile(file, rows)
+        except (OSError, EOFError):
+            return False
+
+        self._offsets = offsets
+        self._slots = slots
+        self.invalid_rows = invalid_rows
+        return True
+
+    def _save_index(self):
+        size, mtime_ns = _fingerprint(self.path)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION, sys.byteorder == "little",
+                self.invalid_rows, size, mtime_ns, len(self._offsets),
+            ))
+            self._offsets.tofile(file)
+            self._slots.tofile(file)
+        os.replace(temp_path, self.index_path)
+
+    def _build_index(self):
+        """Scan the CSV file once, validating the rows a block at a time.
+
+        Raises CSVFormatError on a missing or invalid header.
+        """
+        base = self._base
+        base.seek(0)
+        header = base.readline()
+        check_header(next(csv.reader([header.decode("utf-8")]), None))
+
+        offsets = array("q")
+        hashes = array("L")
+        invalid_rows = 0
+        position = len(header)
+        line = 2
+        while True:
+            lines = base.readlines(SCAN_BLOCK_BYTES)
+            if not lines:
+                break
+            starts = list(accumulate(map(len, lines), initial=position))
+            position = starts.pop()
+            rows = list(csv.reader(io.StringIO(b"".join(lines).decode("utf-8"), newline="")))
+            if len(rows) != len(lines):
+                raise ValueError("Line breaks inside a field are not supported by the lazy inventory.")
+
+            block = validate_rows(rows, line)
+            line += len(lines)
+            invalid_rows += block.invalid
+            offsets.extend(compress(starts, [reason == ROW_VALID for reason in block.reasons]))
+            hashes.extend(_name_hashes(map(normalize_name, block.names)))
+
+        self._offsets = offsets
+        self._slots = _rank(hashes)
+        self.invalid_rows = invalid_rows
+        if _has_shared_hash(self._slots):
+            self._drop_repeated_names(hashes)
+
+    def _drop_repeated_names(self, hashes):
+        """Keep only the last row of every name that appears more than once.
+
+        Only the rows whose hash is shared are read back to compare names.
+        """
+        counts = Counter(hashes)
+        rows_by_key = {}
+        for row, name_hash in enumerate(hashes):
+            if counts[name_hash] > 1:
+                key = normalize_name(_parse_line(self._line(self._offsets[row]))["name"])
+                rows_by_key.setdefault(key, []).append(row)
+
+        dropped = {row for rows in rows_by_key.values() for row in rows[:-1]}
+        if dropped:
+            kept = [row for row in range(len(hashes)) if row not in dropped]
+            self._offsets = array("q", [self._offsets[row] for row in kept])
+            self._slots = _rank(array("L", [hashes[row] for row in kept]))
+
+    def _line(self, offset):
+        end = self._map.find(b"\n", offset)
+        return self._map[offset:] if end < 0 else self._map[offset:end + 1]
+
+    def _find_base(self, key):
+        """Return the product stored in the CSV file under ``key``, or None."""
+        slots = self._slots
+        name_hash = _name_hash(key)
+        index = bisect.bisect_left(slots, name_hash << 32)
+        while index < len(slots) and slots[index] >> 32 == name_hash:
+            product = _parse_line(self._line(self._offsets[slots[index] & _ROW_MASK]))
+            if normalize_name(product["name"]) == key:
+                return product
+            index += 1
+        return None
+
+    def _base_texts(self):
+        """Yield the indexed lines of the CSV file as blocks of text, in file order.
+
+        Blocks are read from the memory map, so the file may be replaced
+        (e.g. by an export) while the store is open. They start small, so
+        the first rows come quickly, and grow to SCAN_BLOCK_BYTES.
+        """
+        offsets = self._offsets
+        count = len(offsets)
+        data = self._map
+        size = len(data)
+        block_bytes = FIRST_BLOCK_BYTES
+        index = 0
+        while index < count:
+            start = offsets[index]
+            end = data.find(b"\n", min(start + block_bytes, size) - 1)
+            end = size if end < 0 else end + 1
+            block_bytes = min(2 * block_bytes, SCAN_BLOCK_BYTES)
+            live = bisect.bisect_left(offsets, end, index)
+            chunk = data[start:end]
+            if live - index == chunk.count(b"\n") + (not chunk.endswith(b"\n")):
+                # Every line of the block is indexed
+                yield chunk.decode("utf-8")
+            else:
+                yield b"".join(map(self._line, offsets[index:live])).decode("utf-8")
+            index = live
+
+    # Pending changes (write-back)
+
+    def _open_pending(self):
+        self._pending = open(self.pending_path, "a+b")
+        self._pending.seek(0)
+        header = self._pending.readline()
+        if not header:
+            self._pending.write(_csv_line(DELTA_HEADER))
+            self._pending.flush()
+            return
+
+        # Replay the changes written before the last close
+        position = len(header)
+        for line in iter(self._pending.readline, b""):
+            if line.endswith(b"\n"):
+                row = next(csv.reader([line.decode("utf-8")]), None)
+                if row is not None and len(row) == 4:
+                    key = normalize_name(row[0])
+                    self._replay(key, None if row[3] == DELTA_DELETE else position)
+            position += len(line)
+
+    def _replay(self, key, position):
+        was_live = self._live(key)
+        self._moved[key] = position
+        if position is None:
+            self._added.pop(key, None)
+            self._count -= was_live
+        elif not was_live:
+            self._count += 1
+            if self._find_base(key) is None:
+                self._added[key] = None
+
+    def _live(self, key):
+        if key in self._moved:
+            return self._moved[key] is not None
+        return self._find_base(key) is not None
+
+    def _write_back(self, key, product):
+        """Append the product (None: a deletion) to the pending file."""
+        pending = self._pending
+        position = pending.seek(0, os.SEEK_END)
+        if product is None:
+            pending.write(_csv_line([key, "", "", DELTA_DELETE]))
+        else:
+            pending.write(_csv_line([product["name"], product["price"], product["quantity"], DELTA_UPSERT]))
+        self._moved[key] = None if product is None else position
+
+    # Materialized records
+
+    def _read(self, key):
+        if key in self._moved:
+            position = self._moved[key]
+            if position is None:
+                return None
+            self._pending.seek(position)
+            return _parse_line(self._pending.readline())
+        return self._find_base(key)
+
+    def _peek(self, key):
+        """Return the current product of ``key`` without caching it."""
+        with self._lock:
+            product = self._cache.get(key)
+            return product if product is not None else self._read(key)
+
+    def _load(self, key):
+        """Return the current product of ``key`` (None when absent), through the cache."""
+        with self._lock:
+            cache = self._cache
+            product = cache.get(key)
+            if product is not None:
+                cache.move_to_end(key)
+                self.hits += 1
+                return product
+
+            self.misses += 1
+            product = self._read(key)
+            if product is not None:
+                # Evicting a dirty record writes it back to the pending file
+                self._cache_put(key, product)
+            return product
+
+    def _cache_put(self, key, product, dirty=False):
+        cache = self._cache
+        cache[key] = product
+        cache.move_to_end(key)
+        if dirty:
+            self._dirty.add(key)
+        while len(cache) > self.cache_size:
+            evicted_key, evicted = cache.popitem(last=False)
+            if evicted_key in self._dirty:
+                self._dirty.discard(evicted_key)
+                self._write_back(evicted_key, evicted)
+
+    def cache_stats(self):
+        """Return the size, capacity, dirty records, hits and misses of the record cache."""
+        return {
+            "size": len(self._cache),
+            "capacity": self.cache_size,
+            "dirty": len(self._dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # Store interface
+
+    def get(self, name):
+        """Return the product with the given name as a dict, or None."""
+        return self._load(normalize_name(name))
+
+    def append(self, product):
+        """Add a product, or replace the price and quantity of an existing one."""
+        key = normalize_name(product["name"])
+        previous = self._load(key)
+        if previous is None:
+            self._count += 1
+            if self._find_base(key) is None:
+                self._added[key] = None
+            self._cache_put(key, product, dirty=True)
+            self._notify_insert(key, product["name"], product["price"], product["quantity"])
+        else:
+            self._cache_put(key, product, dirty=True)
+            self._notify_update(
+                key, product["name"],
+                previous["price"], previous["quantity"],
+                product["price"], product["quantity"],
+            )
+        return product
+
+    def update(self, product, price=None, quantity=None):
+        """Change the price and/or quantity of a stored product."""
+        key = normalize_name(product["name"])
+        current = self._load(key)
+        if current is None:
+            raise ValueError(f"Product '{product['name']}' is not in the inventory.")
+
+        old_price = current["price"]
+        old_quantity = current["quantity"]
+        for record in (current, product):
+            if price is not None:
+                record["price"] = price
+            if quantity is not None:
+                record["quantity"] = quantity
+            if "total_cost" in record:
+                record["total_cost"] = record["price"] * record["quantity"]
+        self._cache_put(key, current, dirty=True)
+
+        self._notify_update(key, current["name"], old_price, old_quantity, current["price"], current["quantity"])
+        return product
+
+    def rename(self, product, new_name):
+        """Give a stored product a new name (see ``InventoryStore.rename``)."""
+        old_key = normalize_name(product["name"])
+        new_key = normalize_name(new_name)
+        if new_key != old_key and self._load(new_key) is not None:
+            raise ValueError(f"A product named '{new_name}' already exists.")
+
+        current = self._load(old_key)
+        if current is None:
+            raise ValueError(f"Product '{product['name']}' is not in the inventory.")
+        old_name = current["name"]
+        self._forget(old_key)
+        current["name"] = new_name
+        product["name"] = new_name
+        if self._find_base(new_key) is None:
+            self._added[new_key] = None
+        self._cache_put(new_key, current, dirty=True)
+
+        self._notify_delete(old_key, old_name, current["price"], current["quantity"])
+        self._notify_insert(new_key, new_name, current["price"], current["quantity"])
+        return product
+
+    def _forget(self, key):
+        self._cache.pop(key, None)
+        self._dirty.discard(key)
+        self._added.pop(key, None)
+        self._write_back(key, None)
+
+    def remove(self, product):
+        """Remove a product (a deletion is written to the pending file).
+
+        Raises
+        ------
+        ValueError
+            If the product is not in the store.
+        """
+        key = normalize_name(product["name"])
+        current = self._load(key)
+        if current is None:
+            raise ValueError(f"Product '{product['name']}' is not in the inventory.")
+
+        self._forget(key)
+        self._count -= 1
+        self._notify_delete(key, current["name"], current["price"], current["quantity"])
+
+    def clear(self):
+        """Remove every product (the CSV file is left with its header only)."""
+        self._rewrite(iter(()))
+        self._notify_reset()
+
+    def replace(self, products):
+        """Replace every product, writing the new CSV file before swapping it in.
+
+        The rows go to a temporary file that ``os.replace`` puts over the
+        CSV file once it is complete (see ``atomic_text_file``), so the
+        file never holds just the header while the new products are added.
+        """
+        self._rewrite((product["name"], product["price"], product["quantity"]) for product in products)
+        self._notify_reset()
+
+    def _row_blocks(self):
+        """Yield lists of the current (name, price, quantity) rows, a block at a time.
+
+        The CSV file comes first, in order, then the added products.
+        Changed products are read from the cache or the pending file; the
+        cache is left as it is.
+        """
+        moved = self._moved
+        dirty = self._dirty
+        for text in self._base_texts():
+            rows = validate_rows(list(csv.reader(io.StringIO(text, newline="")))).rows()
+            if moved or dirty:
+                current = []
+                for name, price, quantity in rows:
+                    key = normalize_name(name)
+                    if key in dirty or key in moved:
+                        product = self._peek(key)
+                        if product is None:
+                            continue
+                        name, price, quantity = product["name"], product["price"], product["quantity"]
+                    current.append((name, price, quantity))
+                rows = current
+            yield rows
+
+        added = [self._peek(key) for key in list(self._added)]
+        if added:
+            yield [(product["name"], product["price"], product["quantity"]) for product in added]
+
+    def iter_rows(self):
+        """Yield (name, price, quantity) tuples: the CSV file in order, then the added products."""
+        for rows in self._row_blocks():
+            yield from rows
+
+    def copy(self):
+        """Return an in-memory InventoryStore with the same products."""
+        return InventoryStore(self)
+
+    def commit(self):
+        """Write the dirty cached records back to the pending file and sync it."""
+        with self._lock:
+            for key in list(self._dirty):
+                self._write_back(key, self._cache[key])
+            self._dirty.clear()
+            self._pending.flush()
+            os.fsync(self._pending.fileno())
+
+    def close(self):
+        """Commit and close the files."""
+        self.commit()
+        self._pending.close()
+        self._close_base()
+
+    def compact(self):
+        """Fold the pending changes into the CSV file and re-index it."""
+        self._rewrite(self.iter_rows())
+
+    def _rewrite(self, rows):
+        """Replace the CSV file with ``rows``, index it and empty the pending file."""
+        with atomic_text_file(self.path) as file:
+            file.write(CSV_HEADER)
+            write_rows(file, rows)
+
+        self._close_base()
+        self._pending.close()
+        with open(self.pending_path, "wb") as pending:
+            pending.write(_csv_line(DELTA_HEADER))
+        self._cache.clear()
+        self._dirty.clear()
+        self._moved.clear()
+        self._added.clear()
+        self._open_base()
+        self._open_pending()
+
+    def statistics(self):
+        """Return (total_value, total_units, max_price, max_quantity) in one pass over the file."""
+        total_value = 0
+        total_units = 0
+        max_price = None
+        max_quantity = None
+        price_of = operator.itemgetter(1)
+        quantity_of = operator.itemgetter(2)
+        for rows in self._row_blocks():
+            if not rows:
+                continue
+            prices = list(map(price_of, rows))
+            quantities = list(map(quantity_of, rows))
+            total_value += sum(map(operator.mul, prices, quantities))
+            total_units += sum(quantities)
+            max_price = max(prices) if max_price is None else max(max_price, max(prices))
+            max_quantity = max(quantities) if max_quantity is None else max(max_quantity, max(quantities))
+        return total_value, total_units, max_price, max_quantity
+
+    def _ranked(self, field):
+        check_field(field)
+        value = _QUERY_VALUES[field]
+        return (
+            (value(price, quantity), normalize_name(name), name, price, quantity)
+            for name, price, quantity in self.iter_rows()
+        )
+
+    @staticmethod
+    def _records(ranked):
+        return [{"name": name, "price": price, "quantity": quantity} for _, _, name, price, quantity in ranked]
+
+    def products_in_range(self, field, low=None, high=None, limit=None):
+        """Return the products whose ``field`` is between ``low`` and ``high`` in one pass.
+
+        Only the matches (at most ``limit`` of them) are kept in memory.
+        """
+        matches = (
+            entry for entry in self._ranked(field)
+            if (low is None or entry[0] >= low) and (high is None or entry[0] <= high)
+        )
+        if limit is None:
+            return self._records(sorted(matches))
+        return self._records(heapq.nsmallest(max(0, limit), matches))
+
+    def top_products(self, field, k):
+        """Return the ``k`` products with the highest ``field``, highest first."""
+        return self._records(heapq.nlargest(max(0, k), self._ranked(field)))
+
+    def bottom_products(self, field, k):
+        """Return the ``k`` products with the lowest ``field``, lowest first."""
+        return self._records(heapq.nsmallest(max(0, k), self._ranked(field)))
+
+    def _bulk(self, change, predicate):
+        changed = 0
+
+        def changed_rows():
+            nonlocal changed
+            for name, price, quantity in self.iter_rows():
+                if predicate is None or predicate(name):
+                    price, quantity = change(price, quantity)
+                    changed += 1
+                yield name, price, quantity
+
+        self._rewrite(changed_rows())
+        if changed:
+            self._notify_reset()
+        return changed
+
+    def bulk_reprice(self, percent, predicate=None):
+        """Change matching prices by a percentage, rewriting the CSV file in one pass."""
+        factor = 1 + percent / 100
+        return self._bulk(lambda price, quantity: (price * factor, quantity), predicate)
+
+    def bulk_restock(self, delta, predicate=None):
+        """Add ``delta`` units to matching products (never below zero) in one pass."""
+        return self._bulk(lambda price, quantity: (price, max(0, quantity + delta)), predicate)
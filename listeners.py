@@ -0,0 +1,21 @@
+class InventoryListener:
+    """Base class for objects that follow inventory mutations.
+
+    An ``InventoryStore`` calls these hooks after every change so derived
+    structures (statistics, indexes, logs) stay in sync without rescanning
+    the inventory. Values are passed explicitly because product records
+    may be mutated or discarded after the call. Every hook is a no-op by
+    default; subclasses override the ones they need.
+    """
+
+    def on_insert(self, key, name, price, quantity):
+        """Called after a new product is added under the normalized ``key``."""
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        """Called after the price and/or quantity of a product change."""
+
+    def on_delete(self, key, name, price, quantity):
+        """Called after a product is removed; values are its last state."""
+
+    def on_reset(self, store):
+        """Called after a bulk change; rebuild state by iterating ``store``."""
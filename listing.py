@@ -0,0 +1,85 @@
+import sys
+
+from utils import display_result
+
+DEFAULT_PAGE_SIZE = 20
+
+# Sort keys offered by the paged listing
+SORT_KEYS = ("none", "name", "price", "quantity", "value")
+
+_SORT_FIELDS = {
+    "price": lambda product: product["price"],
+    "quantity": lambda product: product["quantity"],
+    "value": lambda product: product["price"] * product["quantity"],
+}
+
+
+class InventoryListing:
+    """Paged, sorted views of an inventory.
+
+    The order for each (sort key, direction) is computed once and cached
+    until the store's ``version`` changes, so rendering a page only
+    touches the products on that page. Name order comes straight from the
+    store's search index, which is already kept sorted.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._orders = {}
+
+    def order(self, sort_key="none", descending=False):
+        """Return the list of product keys in the requested order."""
+        if sort_key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort_key}'. Use one of: {', '.join(SORT_KEYS)}.")
+
+        store = self.store
+        cached = self._orders.get((sort_key, descending))
+        if cached is not None and cached[0] == store.version:
+            return cached[1]
+
+        if sort_key == "none":
+            keys = [store.key_for(product["name"]) for product in store]
+        elif sort_key == "name":
+            keys = store.search_index.sorted_keys()
+        else:
+            field = _SORT_FIELDS[sort_key]
+            # Ties are broken by name so the order is stable across rebuilds
+            ranked = sorted((field(product), store.key_for(product["name"])) for product in store)
+            keys = [key for _, key in ranked]
+
+        if descending:
+            keys.reverse()
+        self._orders[(sort_key, descending)] = (store.version, keys)
+        return keys
+
+    def page_count(self, page_size=DEFAULT_PAGE_SIZE):
+        """Number of pages needed for the whole inventory."""
+        return max(1, -(-len(self.store) // page_size))
+
+    def page_products(self, page, page_size=DEFAULT_PAGE_SIZE, sort_key="none", descending=False):
+        """Return the products on one page (pages are numbered from 1)."""
+        keys = self.order(sort_key, descending)
+        start = (page - 1) * page_size
+        get = self.store.get
+        return [get(key) for key in keys[start:start + page_size]]
+
+    def render_page(self, page, page_size=DEFAULT_PAGE_SIZE, sort_key="none", descending=False):
+        """Return the text of one page (pages are numbered from 1)."""
+        products = self.page_products(page, page_size, sort_key, descending)
+        start = (page - 1) * page_size
+        lines = []
+        for index, product in enumerate(products, start=start + 1):
+            lines.append(f"\nProduct {index}:" + display_result(
+                product["name"],
+                product["quantity"],
+                product["price"],
+                product.get("total_cost"),
+            ) + "\n")
+        lines.append(f"\n-- Page {page} of {self.page_count(page_size)} ({len(self.store)} products) --\n")
+        return "".join(lines)
+
+    def write_page(self, page, page_size=DEFAULT_PAGE_SIZE, sort_key="none", descending=False, output=None):
+        """Render a page and send it to ``output`` (stdout) in a single write."""
+        output = output or sys.stdout
+        output.write(self.render_page(page, page_size, sort_key, descending))
+        output.flush()
@@ -0,0 +1,228 @@
+"""Lightweight operation metrics and opt-in profiling.
+
+Every instrumented operation (menu actions, CSV import/export phases)
+is recorded in the global ``registry``. For each operation it keeps:
+
+- a call counter and an error counter
+- a latency histogram with power-of-two microsecond buckets
+- the number of rows processed, for rows/sec
+
+Recording an operation costs two ``perf_counter`` calls and a few
+integer updates, so the metrics stay on all the time.
+
+For a closer look at one slow operation, ``registry.arm_capture("cprofile")``
+or ``registry.arm_capture("tracemalloc")`` profiles the next block run
+under ``capture_armed()`` and prints the report.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+
+# Capture modes for a single operation
+CAPTURE_CPROFILE = "cprofile"
+CAPTURE_TRACEMALLOC = "tracemalloc"
+
+# Lines shown by a capture report
+CAPTURE_REPORT_LINES = 20
+
+# Bucket i counts latencies below 2**i microseconds (the last one is open)
+HISTOGRAM_BUCKETS = 32
+
+
+class LatencyHistogram:
+    """Fixed-size, log2-bucketed latency histogram."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        index = int(seconds * 1_000_000).bit_length()
+        self.buckets[min(index, HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the bucket holding the ``fraction`` quantile."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(self.max, (1 << index) / 1_000_000)
+        return self.max
+
+
+class OperationMetrics:
+    """Counters and latency histogram of one named operation."""
+
+    __slots__ = ("calls", "errors", "rows", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self):
+        latency = self.latency
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_seconds": latency.total,
+            "rows_per_second": self.rows / latency.total if self.rows and latency.total else None,
+            "min_seconds": latency.min,
+            "max_seconds": latency.max,
+            "p50_seconds": latency.percentile(0.50),
+            "p90_seconds": latency.percentile(0.90),
+            "p99_seconds": latency.percentile(0.99),
+            "histogram_us": {f"<{1 << index}": count for index, count in enumerate(latency.buckets) if count},
+        }
+
+
+class MetricsRegistry:
+    """Named operation metrics plus the opt-in single-operation capture."""
+
+    def __init__(self):
+        self.operations = {}
+        self.started = time.time()
+        self._capture = None
+
+    def _metrics(self, name):
+        metrics = self.operations.get(name)
+        if metrics is None:
+            metrics = self.operations[name] = OperationMetrics()
+        return metrics
+
+    def record(self, name, seconds, rows=0, error=False):
+        """Record one call of ``name`` that took ``seconds``."""
+        metrics = self._metrics(name)
+        metrics.calls += 1
+        metrics.rows += rows
+        if error:
+            metrics.errors += 1
+        metrics.latency.record(seconds)
+
+    @contextlib.contextmanager
+    def timed(self, name, rows=0):
+        """Time the block as one call of ``name``.
+
+        The yielded dict can be updated with ``counter["rows"] = n`` when
+        the row count is only known at the end. Exceptions are counted as
+        errors and re-raised.
+        """
+        counter = {"rows": rows}
+        started = time.perf_counter()
+        try:
+            yield counter
+        except BaseException:
+            self.record(name, time.perf_counter() - started, counter["rows"], error=True)
+            raise
+        self.record(name, time.perf_counter() - started, counter["rows"])
+
+    def reset(self):
+        """Forget every recorded operation."""
+        self.operations = {}
+        self.started = time.time()
+
+    def snapshot(self):
+        """Return every metric as a JSON-serializable dict."""
+        return {
+            "since": self.started,
+            "operations": {name: metrics.to_dict() for name, metrics in sorted(self.operations.items())},
+        }
+
+    def dump(self, path):
+        """Write the snapshot as JSON to ``path`` ("-" for stdout)."""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path == "-":
+            print(text)
+            return
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+
+    def report(self):
+        """Return a human-readable table of the metrics."""
+        if not self.operations:
+            return "No operations recorded yet."
+
+        lines = [f"{'Operation':<28}{'Calls':>8}{'Errors':>8}{'p50 ms':>10}{'p99 ms':>10}"
+                 f"{'Max ms':>10}{'Rows/s':>12}"]
+        for name, metrics in sorted(self.operations.items()):
+            data = metrics.to_dict()
+            rate = data["rows_per_second"]
+            lines.append(
+                f"{name:<28}{data['calls']:>8}{data['errors']:>8}"
+                f"{data['p50_seconds'] * 1000:>10.2f}{data['p99_seconds'] * 1000:>10.2f}"
+                f"{data['max_seconds'] * 1000:>10.2f}{(f'{rate:,.0f}' if rate else '-'):>12}"
+            )
+        return "\n".join(lines)
+
+    def arm_capture(self, mode):
+        """Profile the next ``capture_armed()`` block with cProfile or tracemalloc."""
+        if mode not in (CAPTURE_CPROFILE, CAPTURE_TRACEMALLOC):
+            raise ValueError(f"Unknown capture mode: {mode}")
+        self._capture = mode
+
+    @contextlib.contextmanager
+    def capture_armed(self, output=None):
+        """Run the block under the armed capture (if any) and print its report."""
+        mode, self._capture = self._capture, None
+        if mode is None:
+            yield
+            return
+
+        output = output or sys.stdout
+        if mode == CAPTURE_CPROFILE:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                text = io.StringIO()
+                pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(CAPTURE_REPORT_LINES)
+                output.write("\n---- cProfile capture ----\n" + text.getvalue())
+            return
+
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+            lines = [f"\n---- tracemalloc capture (peak {peak / 1024:.1f} KiB) ----"]
+            own_frames = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            after = after.filter_traces(own_frames)
+            before = before.filter_traces(own_frames)
+            for stat in after.compare_to(before, "lineno")[:CAPTURE_REPORT_LINES]:
+                lines.append(str(stat))
+            output.write("\n".join(lines) + "\n")
+
+
+# Process-wide registry used by the application modules
+registry = MetricsRegistry()
+timed = registry.timed
@@ -0,0 +1,182 @@
+import bisect
+
+from listeners import InventoryListener
+
+# Fields that can be queried; "value" is the stock value (price * quantity)
+QUERY_FIELDS = ("price", "quantity", "value")
+
+
+def check_field(field):
+    """Raise ValueError unless ``field`` is one of QUERY_FIELDS."""
+    if field not in QUERY_FIELDS:
+        raise ValueError(f"Unknown query field '{field}'. Use one of: {', '.join(QUERY_FIELDS)}.")
+
+
+# Entries per block of a SortedFieldIndex (a block is split at twice this)
+BLOCK_SIZE = 1000
+
+
+class SortedFieldIndex:
+    """Product keys sorted by one numeric field (ties broken by key).
+
+    Entries are (value, key) pairs kept in a list of sorted blocks of at
+    most 2 * BLOCK_SIZE entries, plus the last entry of every block. A
+    lookup is two binary searches (block, then position), and an insert
+    or removal only shifts one block, so updates stay cheap at millions
+    of products and a range or top-K query costs O(log n + k).
+    """
+
+    def __init__(self):
+        self._blocks = []
+        self._maxes = []
+        self._current = {}
+
+    def __len__(self):
+        return len(self._current)
+
+    def set(self, key, value):
+        current = self._current.get(key)
+        if current is not None:
+            if current == value:
+                return
+            self.discard(key)
+        self._current[key] = value
+        entry = (value, key)
+
+        blocks = self._blocks
+        maxes = self._maxes
+        if not blocks:
+            blocks.append([entry])
+            maxes.append(entry)
+            return
+
+        index = bisect.bisect_left(maxes, entry)
+        if index == len(blocks):
+            # Past the end: append to the last block
+            index -= 1
+            blocks[index].append(entry)
+            maxes[index] = entry
+        else:
+            bisect.insort(blocks[index], entry)
+
+        block = blocks[index]
+        if len(block) > 2 * BLOCK_SIZE:
+            blocks[index:index + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            maxes[index:index + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+
+    def discard(self, key):
+        value = self._current.pop(key, None)
+        if value is None:
+            return
+        entry = (value, key)
+        index = bisect.bisect_left(self._maxes, entry)
+        block = self._blocks[index]
+        del block[bisect.bisect_left(block, entry)]
+        if not block:
+            del self._blocks[index]
+            del self._maxes[index]
+        elif index < len(self._maxes) and self._maxes[index] == entry:
+            self._maxes[index] = block[-1]
+
+    def rebuild(self, items):
+        """Replace the contents with (key, value) pairs in one sort."""
+        ranked = sorted((value, key) for key, value in items)
+        self._blocks = [ranked[start:start + BLOCK_SIZE] for start in range(0, len(ranked), BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._current = {key: value for value, key in ranked}
+
+    def _locate(self, value):
+        """Return (block index, position) of the first entry with a value >= ``value``."""
+        index = bisect.bisect_left(self._maxes, (value,))
+        if index == len(self._blocks):
+            return index, 0
+        return index, bisect.bisect_left(self._blocks[index], (value,))
+
+    def _forward(self, index, position):
+        blocks = self._blocks
+        while index < len(blocks):
+            block = blocks[index]
+            for entry_index in range(position, len(block)):
+                yield block[entry_index]
+            index += 1
+            position = 0
+
+    def range(self, low=None, high=None, limit=None):
+        """Return the keys whose value is between ``low`` and ``high`` (inclusive), ascending.
+
+        At most ``limit`` keys are returned when it is given.
+        """
+        index, position = (0, 0) if low is None else self._locate(low)
+        keys = []
+        if limit is not None and limit <= 0:
+            return keys
+        for value, key in self._forward(index, position):
+            if high is not None and value > high:
+                break
+            keys.append(key)
+            if limit is not None and len(keys) >= limit:
+                break
+        return keys
+
+    def bottom(self, k):
+        """Return the ``k`` keys with the lowest values, lowest first."""
+        return self.range(limit=max(0, k))
+
+    def top(self, k):
+        """Return the ``k`` keys with the highest values, highest first."""
+        keys = []
+        for block in reversed(self._blocks):
+            if len(keys) >= k:
+                break
+            for _, key in reversed(block):
+                if len(keys) >= k:
+                    break
+                keys.append(key)
+        return keys
+
+
+class QueryIndex(InventoryListener):
+    """Sorted secondary indexes on price, quantity and stock value.
+
+    Follows the store events, so every mutation updates the three
+    indexes in O(log n) (plus a shift inside one block) and queries never
+    scan the inventory. A bulk change (``on_reset``) rebuilds them with one sort
+    per field.
+    """
+
+    def __init__(self):
+        self.indexes = {field: SortedFieldIndex() for field in QUERY_FIELDS}
+
+    def _set(self, key, price, quantity):
+        indexes = self.indexes
+        indexes["price"].set(key, price)
+        indexes["quantity"].set(key, quantity)
+        indexes["value"].set(key, price * quantity)
+
+    def on_insert(self, key, name, price, quantity):
+        self._set(key, price, quantity)
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self._set(key, price, quantity)
+
+    def on_delete(self, key, name, price, quantity):
+        for index in self.indexes.values():
+            index.discard(key)
+
+    def on_reset(self, store):
+        rows = [(store.key_for(name), price, quantity) for name, price, quantity in store.iter_rows()]
+        self.indexes["price"].rebuild((key, price) for key, price, _ in rows)
+        self.indexes["quantity"].rebuild((key, quantity) for key, _, quantity in rows)
+        self.indexes["value"].rebuild((key, price * quantity) for key, price, quantity in rows)
+
+    def range_keys(self, field, low=None, high=None, limit=None):
+        check_field(field)
+        return self.indexes[field].range(low, high, limit)
+
+    def top_keys(self, field, k):
+        check_field(field)
+        return self.indexes[field].top(k)
+
+    def bottom_keys(self, field, k):
+        check_field(field)
+        return self.indexes[field].bottom(k)
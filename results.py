@@ -0,0 +1,126 @@
+"""Cache of read-only query results over an inventory.
+
+``ResultCache`` (available as ``store.results``) keeps the results of
+read operations (statistics, searches, queries, listing pages) keyed by
+operation and arguments, in LRU order. Every entry is stamped with the
+inventory version it was computed at and is served only while that
+version is current, so any add, update, delete or import invalidates it
+without touching the cache.
+
+Results that only depend on the product names (``names_only``, e.g.
+prefix and fuzzy searches) are stamped with a names version instead,
+which only inserts, deletes and bulk changes advance: price and quantity
+updates keep them valid.
+
+Cached results are shared between callers and must not be modified.
+The cache may be used from worker threads; results are computed outside
+its lock.
+"""
+import threading
+from collections import OrderedDict
+
+from listeners import InventoryListener
+
+# Results kept before the least recently used one is evicted
+DEFAULT_MAX_ENTRIES = 256
+
+# Lists longer than this are returned without being cached
+MAX_CACHED_ROWS = 1000
+
+
+class ResultCache(InventoryListener):
+    """LRU cache of query results, invalidated by inventory mutations.
+
+    Parameters
+    ----------
+    store : InventoryStore
+        The inventory the results are computed from.
+    max_entries : int, optional
+        Number of results kept.
+    max_rows : int, optional
+        Longest list result that is cached.
+    """
+
+    def __init__(self, store, max_entries=DEFAULT_MAX_ENTRIES, max_rows=MAX_CACHED_ROWS):
+        self.store = store
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.names_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _stamp(self, names_only):
+        return ("names", self.names_version) if names_only else ("all", self.store.version)
+
+    def get(self, operation, args, compute, names_only=False):
+        """Return the cached result of ``operation`` with ``args``, or compute and cache it.
+
+        Parameters
+        ----------
+        operation : str
+            Name of the read operation.
+        args : tuple
+            Hashable arguments of the operation.
+        compute : callable
+            Called without arguments on a miss; its result is cached.
+        names_only : bool, optional
+            True when the result only depends on the product names.
+        """
+        key = (operation, args)
+        stamp = self._stamp(names_only)
+        entries = self._entries
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None:
+                if entry[0] == stamp:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del entries[key]
+                self.invalidations += 1
+            self.misses += 1
+
+        result = compute()
+        if isinstance(result, list) and len(result) > self.max_rows:
+            return result
+        with self._lock:
+            entries[key] = (stamp, result)
+            entries.move_to_end(key)
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        """Drop every cached result (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the counters: hits, misses, evictions, invalidations, size, maxsize and hit_rate."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "maxsize": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+    def on_insert(self, key, name, price, quantity):
+        self.names_version += 1
+
+    def on_delete(self, key, name, price, quantity):
+        self.names_version += 1
+
+    def on_reset(self, store):
+        self.names_version += 1
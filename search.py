@@ -0,0 +1,151 @@
+import bisect
+
+from listeners import InventoryListener
+from utils import normalize_name
+
+# Results returned by prefix and fuzzy searches unless a limit is given
+DEFAULT_LIMIT = 10
+
+# Gram length of the typo-tolerant index
+GRAM_SIZE = 3
+
+
+def name_grams(key):
+    """Return the set of character trigrams of a (padded, lowercase) name."""
+    padded = f"  {key.lower()} "
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def bounded_distance(first, second, limit):
+    """Levenshtein distance between two strings, or None if it exceeds ``limit``.
+
+    Only the diagonal band of width ``2 * limit + 1`` is computed, so the
+    cost is O(limit * len) instead of O(len^2).
+    """
+    if abs(len(first) - len(second)) > limit:
+        return None
+
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, start=1):
+        low = max(1, i - limit)
+        high = min(len(second), i + limit)
+        current = [i] + [limit + 1] * len(second)
+        for j in range(low, high + 1):
+            cost = 0 if char == second[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        if min(current[max(0, low - 1):high + 1]) > limit:
+            return None
+        previous = current
+
+    distance = previous[len(second)]
+    return distance if distance <= limit else None
+
+
+class SearchIndex(InventoryListener):
+    """Prefix and typo-tolerant name search over an inventory.
+
+    Keeps the normalized product names in a sorted array (prefix queries
+    by binary search) and a trigram inverted index partitioned by name
+    length (fuzzy queries), both updated incrementally from store events.
+    """
+
+    def __init__(self):
+        self._sorted = []
+        self._grams = {}
+
+    def _add(self, key):
+        position = bisect.bisect_left(self._sorted, key)
+        if position < len(self._sorted) and self._sorted[position] == key:
+            return
+        self._sorted.insert(position, key)
+        length = len(key)
+        for gram in name_grams(key):
+            self._grams.setdefault((gram, length), set()).add(key)
+
+    def _discard(self, key):
+        position = bisect.bisect_left(self._sorted, key)
+        if position < len(self._sorted) and self._sorted[position] == key:
+            del self._sorted[position]
+        length = len(key)
+        for gram in name_grams(key):
+            postings = self._grams.get((gram, length))
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._grams[(gram, length)]
+
+    def on_insert(self, key, name, price, quantity):
+        self._add(key)
+
+    def on_delete(self, key, name, price, quantity):
+        self._discard(key)
+
+    def on_reset(self, store):
+        self._grams = {}
+        keys = sorted({store.key_for(product["name"]) for product in store})
+        self._sorted = keys
+        for key in keys:
+            length = len(key)
+            for gram in name_grams(key):
+                self._grams.setdefault((gram, length), set()).add(key)
+
+    def sorted_keys(self):
+        """Return every indexed key in name order."""
+        return list(self._sorted)
+
+    def prefix(self, text, limit=DEFAULT_LIMIT):
+        """Return up to ``limit`` keys starting with ``text``, in name order."""
+        prefix = normalize_name(text)
+        if not prefix:
+            return []
+
+        start = bisect.bisect_left(self._sorted, prefix)
+        matches = []
+        for key in self._sorted[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+        return matches
+
+    def fuzzy(self, text, limit=DEFAULT_LIMIT, max_distance=None):
+        """Return up to ``limit`` keys within a small edit distance of ``text``.
+
+        Candidates are taken from the trigram index (they must share enough
+        trigrams with the query to be within reach) and verified with a
+        bounded edit distance. ``max_distance`` defaults to 1 for names up
+        to 4 characters and 2 for longer ones. Results are ordered by
+        distance, then name.
+        """
+        query = normalize_name(text)
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = 1 if len(query) <= 4 else 2
+
+        query_grams = name_grams(query)
+        # Each edit destroys at most GRAM_SIZE grams of the query
+        needed = max(1, len(query_grams) - GRAM_SIZE * max_distance)
+
+        # A key sharing `needed` grams must contain one of the
+        # len - needed + 1 rarest ones, so only their postings are scanned;
+        # lengths beyond max_distance are never looked at
+        grams = self._grams
+        keep = len(query_grams) - needed + 1
+        candidates = set()
+        for length in range(len(query) - max_distance, len(query) + max_distance + 1):
+            postings = [grams.get((gram, length), ()) for gram in query_grams]
+            postings.sort(key=len)
+            for keys in postings[:keep]:
+                candidates.update(keys)
+
+        lowered = query.lower()
+        scored = []
+        for key in candidates:
+            if len(query_grams & name_grams(key)) < needed:
+                continue
+            distance = bounded_distance(lowered, key.lower(), max_distance)
+            if distance is not None:
+                scored.append((distance, key))
+
+        scored.sort()
+        return [key for _, key in scored[:limit]]
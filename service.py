@@ -0,0 +1,301 @@
+"""Asyncio inventory service speaking line-delimited JSON.
+
+Several clients can share one inventory over a local TCP or Unix socket.
+Each request is one JSON command per line, in the format of batch.py,
+optionally with an ``"id"`` that is echoed in the response::
+
+    {"id": 7, "op": "search", "name": "Pan"}
+    {"id": 7, "product": {...}, "ok": true, "op": "search"}
+
+Responses on a connection come back in request order.
+
+Concurrency rules:
+
+- Mutations (add, update, delete, rename, import) hold a writer lock, so
+  they apply one at a time and each one is atomic. On the in-memory
+  store they also run as ``ConcurrentInventory`` transactions: a
+  mutation that fails halfway is rolled back.
+- Reads (search, stats) never take the lock. They run on the event loop
+  between mutations, so they always see a consistent inventory.
+- Reads that need a full pass run in a worker thread while the writer
+  lock is held, so reads go on and the inventory does not change
+  underneath them: statistics on backends without an incremental engine
+  (SQLite, lazy, columnar) and delta exports. ``validate`` only reads a
+  file and runs in a worker thread without the lock.
+- Imports parse the CSV file in a worker thread (feed imports in a
+  process pool driven from a worker thread) and only take the lock to
+  apply the parsed rows. Exports write the file in a worker thread from
+  a point-in-time snapshot, in snapshot order (on other backends, from
+  rows copied on the loop). Neither blocks reads while it does I/O.
+- Mutations finished in the same loop pass share one commit (journal
+  group commit) before their responses are sent.
+
+Every request has a timeout. Backpressure has three parts:
+
+- A connection is not read while its request is running.
+- Responses wait for the socket to drain.
+- At most ``max_in_flight`` requests run at once.
+"""
+import asyncio
+import contextlib
+import json
+import signal
+
+import batch
+from data import expand_feed_paths, export_to_csv, merge_feeds, merge_products, parse_feeds, read_csv_products
+from metrics import timed
+from store import InventoryStore
+from versioned import ConcurrentInventory
+
+# Seconds a request may run (including waiting for the writer lock)
+DEFAULT_TIMEOUT = 30.0
+
+# Requests executed at the same time across all connections
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# Longest accepted request line, in bytes
+DEFAULT_LINE_LIMIT = 1024 * 1024
+
+# Ops that change the inventory (or its change tracker) and therefore hold the writer lock
+MUTATIONS = frozenset({
+    "add", "update", "delete", "rename", "import", "import_feeds", "import_delta", "export_delta",
+    "set_reorder_point",
+})
+
+# Ops that read a file or the whole store, run in a worker thread
+THREADED = frozenset({"validate", "export_delta"})
+
+
+class InventoryService:
+    """Serve one inventory store to many socket clients.
+
+    Parameters
+    ----------
+    store : InventoryStore
+        The shared inventory (any backend).
+    on_commit : callable, optional
+        Called with no arguments to make finished mutations durable
+        (for example the journal's group commit).
+    request_timeout : float, optional
+        Seconds before a request fails with a timeout error.
+    max_in_flight : int, optional
+        Requests allowed to run at the same time.
+    line_limit : int, optional
+        Maximum size of a request line in bytes.
+    """
+
+    def __init__(self, store, on_commit=None, request_timeout=DEFAULT_TIMEOUT,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT, line_limit=DEFAULT_LINE_LIMIT):
+        self.store = store
+        # Snapshots keep a copy of every product, so only the in-memory store gets them
+        self.shared = ConcurrentInventory(store) if store.incremental_statistics else None
+        self.on_commit = on_commit
+        self.request_timeout = request_timeout
+        self.line_limit = line_limit
+        self._write_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._commit_waiter = None
+        self._decode = json.JSONDecoder().decode
+        self._encode = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+
+    async def execute(self, command):
+        """Run one command and return its result dict.
+
+        Raises
+        ------
+        CommandError, ValueError, OSError, TypeError, KeyError
+            As ``batch.execute`` (see ``batch.COMMAND_ERRORS``).
+        """
+        if not isinstance(command, dict):
+            raise batch.CommandError("A command must be a JSON object.")
+
+        op = command.get("op")
+        if not isinstance(op, str):
+            raise batch.CommandError(f"Unknown op '{op}'.")
+        if op in ("import", "import_feeds", "export"):
+            handler = {"import": self._import, "import_feeds": self._import_feeds, "export": self._export}[op]
+            with timed(f"op.{op}"):
+                return await handler(command)
+        if op == "validate":
+            return await asyncio.to_thread(batch.execute, self.store, command)
+        if op in THREADED or (op == "stats" and not self.store.incremental_statistics):
+            result = await self._locked_in_thread(command)
+            if op in MUTATIONS:
+                await self._committed()
+            return result
+        if op not in MUTATIONS:
+            return batch.execute(self.store, command)
+
+        async with self._write_lock:
+            with self._transaction():
+                result = batch.execute(self.store, command)
+        await self._committed()
+        return result
+
+    def _transaction(self):
+        """Undo a mutation that fails halfway (on the in-memory store)."""
+        if self.shared is None:
+            return contextlib.nullcontext(self.store)
+        return self.shared.transaction()
+
+    async def _locked_in_thread(self, command):
+        """Run a command in a worker thread while holding the writer lock.
+
+        The lock is kept until the thread finishes, even when the request
+        times out, so no mutation runs alongside it.
+        """
+        async with self._write_lock:
+            work = asyncio.ensure_future(asyncio.to_thread(batch.execute, self.store, command))
+            try:
+                return await asyncio.shield(work)
+            except asyncio.CancelledError:
+                await asyncio.wait([work])
+                raise
+
+    async def _import(self, command):
+        path = batch._field(command, "path")
+        mode = command.get("mode", "merge")
+        if mode not in ("merge", "overwrite"):
+            raise batch.CommandError("Mode must be 'merge' or 'overwrite'.")
+
+        products, invalid_rows = await asyncio.to_thread(read_csv_products, path)
+        if mode == "overwrite" and products:
+            staging = await asyncio.to_thread(merge_products, InventoryStore(), products)
+
+        # Applied without any await, so no reader sees a half-applied file
+        async with self._write_lock:
+            with self._transaction():
+                if mode == "merge":
+                    merge_products(self.store, products)
+                elif products:
+                    self.store.replace(staging)
+        await self._committed()
+        return {"path": path, "mode": mode, "loaded": len(products), "invalid_rows": invalid_rows}
+
+    async def _import_feeds(self, command):
+        source = batch._field(command, "source")
+        mode = command.get("mode", "merge")
+        if mode not in ("merge", "overwrite"):
+            raise batch.CommandError("Mode must be 'merge' or 'overwrite'.")
+        workers = batch._number(command, "workers", integer=True)
+
+        paths = await asyncio.to_thread(expand_feed_paths, source)
+        if not paths:
+            raise batch.CommandError(f"No CSV files match '{source}'.")
+        parsed = await asyncio.to_thread(parse_feeds, paths, workers or None)
+        loaded = any(report.loaded for report, _ in parsed)
+        if mode == "overwrite" and loaded:
+            staging = InventoryStore()
+            await asyncio.to_thread(merge_feeds, staging, parsed)
+
+        async with self._write_lock:
+            with self._transaction():
+                if mode == "merge":
+                    reports = merge_feeds(self.store, parsed)
+                else:
+                    reports = [report for report, _ in parsed]
+                    if loaded:
+                        self.store.replace(staging)
+        await self._committed()
+        return {"source": source, "mode": mode, "files": batch.feed_records(reports)}
+
+    async def _export(self, command):
+        path = batch._field(command, "path")
+        if self.shared is not None:
+            # A snapshot never changes, so it is written as is
+            rows = self.shared.snapshot()
+        else:
+            # Copy the rows on the loop: later mutations cannot tear the file
+            rows = [batch.product_record(product) for product in self.store]
+        saved = await asyncio.to_thread(export_to_csv, rows, path)
+        if not saved:
+            raise batch.CommandError("The inventory could not be exported.")
+        return {"path": path, "products": len(rows)}
+
+    async def _committed(self):
+        """Wait for the group commit shared by the mutations of this loop pass."""
+        if self.on_commit is None:
+            return
+        if self._commit_waiter is None:
+            self._commit_waiter = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_soon(self._flush)
+        await asyncio.shield(self._commit_waiter)
+
+    def _flush(self):
+        waiter, self._commit_waiter = self._commit_waiter, None
+        try:
+            self.on_commit()
+        except Exception as e:
+            waiter.set_exception(e)
+        else:
+            waiter.set_result(None)
+
+    async def respond(self, line):
+        """Return the response dict for one request line."""
+        request_id = None
+        try:
+            command = self._decode(line)
+            if isinstance(command, dict):
+                request_id = command.get("id")
+            async with self._slots:
+                result = await asyncio.wait_for(self.execute(command), self.request_timeout)
+            result["ok"] = True
+            result["op"] = command["op"]
+        except asyncio.TimeoutError:
+            result = {"ok": False, "error": f"Request timed out after {self.request_timeout} s."}
+        except batch.COMMAND_ERRORS as e:
+            # A bad request fails alone; the connection stays open
+            result = {"ok": False, "error": str(e) or e.__class__.__name__}
+
+        if request_id is not None:
+            result["id"] = request_id
+        return result
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line longer than line_limit: the stream cannot be resynchronized
+                    writer.write(self._encode({"ok": False, "error": "Request line too long."}).encode() + b"\n")
+                    break
+                if not line:
+                    break
+
+                text = line.decode("utf-8", errors="replace").strip()
+                if not text:
+                    continue
+                response = await self.respond(text)
+                writer.write(self._encode(response).encode("utf-8") + b"\n")
+                # Stop reading while a slow client is not consuming responses
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """Start listening on TCP ``host:port`` or, with ``path``, on a Unix socket."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path, limit=self.line_limit)
+        return await asyncio.start_server(self.handle_client, host, port, limit=self.line_limit)
+
+
+async def serve(store, host="127.0.0.1", port=8765, path=None, on_commit=None,
+                request_timeout=DEFAULT_TIMEOUT):
+    """Run an ``InventoryService`` until SIGINT or SIGTERM."""
+    service = InventoryService(store, on_commit=on_commit, request_timeout=request_timeout)
+    server = await service.start(host, port, path)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Not available on this platform; Ctrl+C still interrupts
+
+    async with server:
+        await stop.wait()
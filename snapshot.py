@@ -0,0 +1,254 @@
+"""Binary inventory snapshots loaded through ``mmap``.
+
+A snapshot stores the inventory as fixed-width columns plus a string
+table, so loading it is a checksum pass over the mapping, one decode of
+the names and one read of each row instead of parsing and validating
+CSV text. It is not zero-copy: the store built from it (any backend,
+see ``Snapshot.products``) owns its data and the mapping is closed once
+it is loaded. CSV stays the interchange format; the snapshot
+is a cache written next to it (``inventory.csv`` -> ``inventory.snap``).
+
+Layout (little endian, every section 8-byte aligned)::
+
+    header      magic, version, crc32, count, source size, source mtime,
+                log sequence number (see wal.py)
+    prices      float64[count]
+    quantities  int64[count]
+    offsets     uint64[count + 1]   byte offsets into the string table
+    names       UTF-8 string table
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from columnar import ColumnarInventoryStore
+
+MAGIC = b"INVSNAP\0"
+FORMAT_VERSION = 2
+
+# magic, version, reserved, crc32, count, source_size, source_mtime_ns, lsn
+HEADER = struct.Struct("<8sHHIQQqQ")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is corrupt, stale or has an unknown format."""
+
+
+def snapshot_path_for(csv_path):
+    """Return the snapshot path that belongs to a CSV file."""
+    return os.path.splitext(csv_path)[0] + ".snap"
+
+
+def source_fingerprint(source_path):
+    """Return (size, mtime_ns) of the source CSV, or (0, 0) if it is missing."""
+    try:
+        info = os.stat(source_path)
+    except OSError:
+        return 0, 0
+    return info.st_size, info.st_mtime_ns
+
+
+def _columns(inventory):
+    """Return (names, prices, quantities) columns for any inventory."""
+    if isinstance(inventory, ColumnarInventoryStore):
+        return inventory._names, inventory._prices, inventory._quantities
+
+    names = []
+    prices = array("d")
+    quantities = array("q")
+    for product in inventory:
+        names.append(product["name"])
+        prices.append(product["price"])
+        quantities.append(product["quantity"])
+    return names, prices, quantities
+
+
+def _native(column):
+    """Return the column bytes in little-endian order."""
+    if sys.byteorder == "little":
+        return column.tobytes()
+    swapped = array(column.typecode, column)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _padding(length):
+    return b"\0" * (-length % 8)
+
+
+def write_snapshot(inventory, path, source_path=None, lsn=0):
+    """Write the inventory to a binary snapshot file.
+
+    The file is written to a temporary name and renamed into place, so a
+    crash never leaves a half-written snapshot behind.
+
+    Parameters
+    ----------
+    inventory : iterable
+        Any inventory (list, InventoryStore or ColumnarInventoryStore).
+    path : str
+        Destination snapshot path.
+    source_path : str, optional
+        CSV file the snapshot mirrors; its size and modification time are
+        recorded so a later edit of the CSV makes the snapshot stale.
+    lsn : int, optional
+        Sequence number of the last write-ahead log record the snapshot
+        includes; replay starts after it.
+    """
+    names, prices, quantities = _columns(inventory)
+    count = len(names)
+
+    encoded = [name.encode("utf-8") for name in names]
+    offsets = array("Q", [0]) * (count + 1)
+    position = 0
+    for index, name in enumerate(encoded):
+        position += len(name)
+        offsets[index + 1] = position
+    table = b"".join(encoded)
+
+    payload = b"".join((
+        _native(array("d", prices)),
+        _native(array("q", quantities)),
+        _native(offsets),
+        table,
+        _padding(len(table)),
+    ))
+
+    size, mtime_ns = source_fingerprint(source_path) if source_path else (0, 0)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, zlib.crc32(payload), count, size, mtime_ns, lsn)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class Snapshot:
+    """Memory-mapped, read-only view of a snapshot file.
+
+    The numeric columns are exposed as ``memoryview`` objects over the
+    mapping (``prices``, ``quantities``), so reading them in place copies
+    nothing; ``to_store`` copies them into arrays the store owns. Use as
+    a context manager, or call ``close()`` when done.
+    """
+
+    def __init__(self, path, source_path=None, verify=True):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError("The snapshot file is empty.")
+
+        try:
+            self._open(source_path, verify)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, source_path, verify):
+        if len(self._map) < HEADER.size:
+            raise SnapshotError("The snapshot file is truncated.")
+
+        magic, version, _, crc, count, size, mtime_ns, lsn = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise SnapshotError("Not an inventory snapshot.")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}.")
+        self.has_source = size != 0 or mtime_ns != 0
+        if source_path is not None and self.has_source and (size, mtime_ns) != source_fingerprint(source_path):
+            raise SnapshotError("The snapshot is stale: the CSV file changed after it was written.")
+
+        self.count = count
+        self.lsn = lsn
+        with memoryview(self._map) as view:
+            column = 8 * count
+            start = HEADER.size
+            prices_end = start + column
+            quantities_end = prices_end + column
+            offsets_end = quantities_end + column + 8
+
+            if len(self._map) < offsets_end:
+                raise SnapshotError("The snapshot file is truncated.")
+            if verify and zlib.crc32(view[start:]) != crc:
+                raise SnapshotError("Snapshot checksum mismatch: the file is corrupt.")
+
+            self.prices = view[start:prices_end].cast("d")
+            self.quantities = view[prices_end:quantities_end].cast("q")
+            self.offsets = view[quantities_end:offsets_end].cast("Q")
+            table_end = offsets_end + self.offsets[count]
+            if len(self._map) < table_end:
+                raise SnapshotError("The snapshot file is truncated.")
+            self.table = view[offsets_end:table_end]
+
+    def name(self, index):
+        """Decode the name of the product at ``index``."""
+        return bytes(self.table[self.offsets[index]:self.offsets[index + 1]]).decode("utf-8")
+
+    def names(self):
+        """Return every product name, in row order."""
+        offsets = self.offsets
+        table = bytes(self.table)
+        text = table.decode("utf-8")
+        if len(text) == len(table):
+            # ASCII table: byte offsets are character offsets
+            return [text[offsets[i]:offsets[i + 1]] for i in range(self.count)]
+        return [table[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.count)]
+
+    def _native_columns(self):
+        """Return copies of the price and quantity columns in native byte order."""
+        prices = array("d")
+        quantities = array("q")
+        prices.frombytes(self.prices.cast("B"))
+        quantities.frombytes(self.quantities.cast("B"))
+        if sys.byteorder != "little":
+            prices.byteswap()
+            quantities.byteswap()
+        return prices, quantities
+
+    def products(self):
+        """Yield a product dict per row, read from the mapped columns in row order."""
+        prices, quantities = self.prices, self.quantities
+        if sys.byteorder != "little":
+            prices, quantities = self._native_columns()
+        for name, price, quantity in zip(self.names(), prices, quantities):
+            yield {"name": name, "price": price, "quantity": quantity}
+
+    def to_store(self):
+        """Build a ColumnarInventoryStore with copies of the mapped columns."""
+        return ColumnarInventoryStore.from_columns(self.names(), *self._native_columns())
+
+    def close(self):
+        for attribute in ("prices", "quantities", "offsets", "table"):
+            view = self.__dict__.pop(attribute, None)
+            if view is not None:
+                view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_snapshot(path, source_path=None):
+    """Load a snapshot into a ColumnarInventoryStore.
+
+    Raises
+    ------
+    SnapshotError
+        If the snapshot is corrupt, stale (``source_path`` changed) or
+        has an unknown format.
+    FileNotFoundError
+        If the snapshot does not exist.
+    """
+    with Snapshot(path, source_path) as snapshot:
+        return snapshot.to_store()
@@ -0,0 +1,435 @@
+import sqlite3
+
+from alerts import DEFAULT_REORDER_THRESHOLD, LowStockAlert, LowStockMonitor
+from listing import DEFAULT_PAGE_SIZE, InventoryListing
+from query import check_field
+from store import InventoryStore
+from utils import normalize_name
+
+# Writes grouped into one transaction before an automatic commit
+DEFAULT_BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_name ON products (name);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price);
+CREATE INDEX IF NOT EXISTS idx_products_quantity ON products (quantity);
+CREATE INDEX IF NOT EXISTS idx_products_value ON products (price * quantity);
+"""
+
+_ORDER_BY = {
+    "none": "id",
+    "name": "key",
+    "price": "price, key",
+    "quantity": "quantity, key",
+    "value": "price * quantity, key",
+}
+
+# Query fields (see query.py) as SQL expressions served by the indexes
+_QUERY_COLUMNS = {
+    "price": "price",
+    "quantity": "quantity",
+    "value": "price * quantity",
+}
+
+# Rows fetched per round trip while iterating
+FETCH_SIZE = 1000
+
+
+def _product(row):
+    name, price, quantity = row
+    return {"name": name, "price": price, "quantity": quantity}
+
+
+class SQLiteListing(InventoryListing):
+    """Paged listing that lets SQLite sort and slice with its indexes."""
+
+    def page_products(self, page, page_size=DEFAULT_PAGE_SIZE, sort_key="none", descending=False):
+        order = _ORDER_BY.get(sort_key)
+        if order is None:
+            return super().page_products(page, page_size, sort_key, descending)
+        if descending:
+            order = ", ".join(f"{column} DESC" for column in order.split(", "))
+
+        rows = self.store._connection.execute(
+            f"SELECT name, price, quantity FROM products ORDER BY {order} LIMIT ? OFFSET ?",
+            (page_size, (page - 1) * page_size),
+        )
+        return [_product(row) for row in rows]
+
+
+class SQLiteStockMonitor(LowStockMonitor):
+    """Low-stock monitor that asks SQLite for the low products.
+
+    Only the keys of the products below their reorder point are kept in
+    memory (to raise an alert when a product crosses into low stock);
+    the report is read with the quantity index instead of loading every
+    row. Products with their own reorder point are looked up one by one.
+    """
+
+    def __init__(self, store, default_threshold=DEFAULT_REORDER_THRESHOLD, sink=None):
+        super().__init__(default_threshold, sink)
+        self.store = store
+        self._low = set()
+
+    def _low_rows(self):
+        """Return (key, name, quantity, threshold) of the low products, most urgent first."""
+        connection = self.store._connection
+        thresholds = self.thresholds
+        rows = [
+            (key, name, quantity, self.default_threshold)
+            for key, name, quantity in connection.execute(
+                "SELECT key, name, quantity FROM products WHERE quantity < ?", (self.default_threshold,)
+            )
+            if key not in thresholds
+        ]
+        for key, threshold in thresholds.items():
+            row = self.store._row(key)
+            if row is not None and row[2] < threshold:
+                rows.append((key, row[0], row[2], threshold))
+        rows.sort(key=lambda row: (row[2] - row[3], row[0]))
+        return rows
+
+    def rebuild(self, store):
+        """Find the low products without raising alerts."""
+        self._recompute()
+
+    def _recompute(self):
+        self._low = {row[0] for row in self._low_rows()}
+
+    def _check(self, key, quantity):
+        """Track ``key`` and return True when it just became low."""
+        threshold = self.threshold_for(key)
+        if quantity >= threshold:
+            self._low.discard(key)
+            return False
+        was_low = key in self._low
+        self._low.add(key)
+        return not was_low
+
+    def _raise(self, name, quantity, threshold):
+        if self.sink is not None:
+            self.sink(LowStockAlert(name, quantity, threshold))
+
+    def on_insert(self, key, name, price, quantity):
+        if self._check(key, quantity):
+            self._raise(name, quantity, self.threshold_for(key))
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        if self._check(key, quantity) and quantity != old_quantity:
+            self._raise(name, quantity, self.threshold_for(key))
+
+    def on_delete(self, key, name, price, quantity):
+        self._low.discard(key)
+
+    def on_reset(self, store):
+        was_low = self._low
+        rows = self._low_rows()
+        self._low = {row[0] for row in rows}
+        for key, name, quantity, threshold in rows:
+            if key not in was_low:
+                self._raise(name, quantity, threshold)
+
+    def set_threshold(self, name, threshold):
+        """Give one product its own reorder point (None to use the global one again)."""
+        key = normalize_name(name)
+        if threshold is None:
+            self.thresholds.pop(key, None)
+        else:
+            self.thresholds[key] = threshold
+        row = self.store._row(key)
+        if row is not None:
+            self._check(key, row[2])
+
+    def low_stock(self, limit=None):
+        """Return the low products as (name, quantity, threshold), most urgent first."""
+        rows = self._low_rows()
+        if limit is not None:
+            rows = rows[:max(0, limit)]
+        return [(name, quantity, threshold) for _, name, quantity, threshold in rows]
+
+
+class SQLiteInventoryStore(InventoryStore):
+    """Inventory backend stored in an embedded SQLite database.
+
+    Products live in an indexed table (name, price and quantity), so CRUD
+    and statistics work on inventories larger than memory. Writes are
+    grouped into transactions of ``batch_size`` statements (committed
+    early by ``commit()``), statements are prepared once and cached by
+    the sqlite3 module, and statistics and the low-stock report are
+    computed with SQL.
+
+    Products are returned as plain dicts; ``update`` also refreshes the
+    dict it is given, as the in-memory store does. The connection may be
+    used from a worker thread (the service runs statistics there while
+    the writer lock is held); SQLite serializes the calls.
+    """
+
+    incremental_statistics = False
+
+    def __init__(self, path=":memory:", batch_size=DEFAULT_BATCH_SIZE, products=None):
+        self.path = path
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path, cached_statements=64, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._pending_writes = 0
+        self._count = self._connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        super().__init__(products)
+
+    def __iter__(self):
+        cursor = self._connection.execute("SELECT name, price, quantity FROM products ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield _product(row)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, name):
+        return self._row(normalize_name(name)) is not None
+
+    def __repr__(self):
+        return f"SQLiteInventoryStore({self.path!r}, {self._count} products)"
+
+    @property
+    def listing(self):
+        if self._listing is None:
+            self._listing = SQLiteListing(self)
+        return self._listing
+
+    @property
+    def stock_monitor(self):
+        """``SQLiteStockMonitor`` of reorder points, answered with SQL (see ``InventoryStore``)."""
+        if self._stock_monitor is None:
+            monitor = SQLiteStockMonitor(self)
+            monitor.rebuild(self)
+            self._stock_monitor = self.subscribe(monitor, sync=False)
+        return self._stock_monitor
+
+    def _row(self, key):
+        return self._connection.execute(
+            "SELECT name, price, quantity FROM products WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _wrote(self, statements=1):
+        self._pending_writes += statements
+        if self._pending_writes >= self.batch_size:
+            self.commit()
+
+    def get(self, name):
+        """Return the product with the given name as a dict, or None."""
+        row = self._row(normalize_name(name))
+        return _product(row) if row is not None else None
+
+    def append(self, product):
+        """Insert a product, or replace the price and quantity of an existing one."""
+        name = product["name"]
+        price = float(product["price"])
+        quantity = int(product["quantity"])
+        key = normalize_name(name)
+        previous = self._row(key)
+
+        if previous is None:
+            self._connection.execute(
+                "INSERT INTO products (key, name, price, quantity) VALUES (?, ?, ?, ?)",
+                (key, name, price, quantity),
+            )
+            self._count += 1
+            self._wrote()
+            self._notify_insert(key, name, price, quantity)
+        else:
+            self._connection.execute(
+                "UPDATE products SET name = ?, price = ?, quantity = ? WHERE key = ?",
+                (name, price, quantity, key),
+            )
+            self._wrote()
+            self._notify_update(key, name, previous[1], previous[2], price, quantity)
+
+        return {"name": name, "price": price, "quantity": quantity}
+
+    def extend(self, products):
+        """Insert many products in one transaction with a prepared statement.
+
+        Products whose name already exists fall back to ``append``.
+        """
+        fresh = {}
+        for product in products:
+            key = normalize_name(product["name"])
+            if key in fresh:
+                # Repeated name in the batch: write the batch, then replace
+                self._insert_many(list(fresh.values()))
+                fresh = {}
+            if self._row(key) is not None:
+                self.append(product)
+                continue
+            fresh[key] = (key, product["name"], float(product["price"]), int(product["quantity"]))
+            if len(fresh) >= self.batch_size:
+                self._insert_many(list(fresh.values()))
+                fresh = {}
+        if fresh:
+            self._insert_many(list(fresh.values()))
+
+    def _insert_many(self, rows):
+        self._connection.executemany(
+            "INSERT INTO products (key, name, price, quantity) VALUES (?, ?, ?, ?)", rows
+        )
+        self._count += len(rows)
+        self._wrote(len(rows))
+        for key, name, price, quantity in rows:
+            self._notify_insert(key, name, price, quantity)
+
+    def update(self, product, price=None, quantity=None):
+        """Change the price and/or quantity of a stored product."""
+        key = normalize_name(product["name"])
+        row = self._row(key)
+        if row is None:
+            raise ValueError(f"Product '{product['name']}' is not in the inventory.")
+
+        name, old_price, old_quantity = row
+        new_price = old_price if price is None else float(price)
+        new_quantity = old_quantity if quantity is None else int(quantity)
+        self._connection.execute(
+            "UPDATE products SET price = ?, quantity = ? WHERE key = ?",
+            (new_price, new_quantity, key),
+        )
+        self._wrote()
+
+        product["price"] = new_price
+        product["quantity"] = new_quantity
+        if "total_cost" in product:
+            product["total_cost"] = new_price * new_quantity
+
+        self._notify_update(key, name, old_price, old_quantity, new_price, new_quantity)
+        return product
+
+    def rename(self, product, new_name):
+        """Give a stored product a new name (see ``InventoryStore.rename``)."""
+        old_key = normalize_name(product["name"])
+        new_key = normalize_name(new_name)
+        if new_key != old_key and self._row(new_key) is not None:
+            raise ValueError(f"A product named '{new_name}' already exists.")
+
+        old_name, price, quantity = self._row(old_key)
+        self._connection.execute(
+            "UPDATE products SET key = ?, name = ? WHERE key = ?", (new_key, new_name, old_key)
+        )
+        self._wrote()
+        product["name"] = new_name
+
+        self._notify_delete(old_key, old_name, price, quantity)
+        self._notify_insert(new_key, new_name, price, quantity)
+        return product
+
+    def remove(self, product):
+        """Delete a product from the table.
+
+        Raises
+        ------
+        ValueError
+            If the product is not in the store.
+        """
+        key = normalize_name(product["name"])
+        row = self._row(key)
+        if row is None:
+            raise ValueError(f"Product '{product['name']}' is not in the inventory.")
+
+        self._connection.execute("DELETE FROM products WHERE key = ?", (key,))
+        self._count -= 1
+        self._wrote()
+        self._notify_delete(key, *row)
+
+    def clear(self):
+        """Delete every product."""
+        self._connection.execute("DELETE FROM products")
+        self._count = 0
+        self._wrote()
+        self._notify_reset()
+
+    def _query(self, field, where, parameters, descending, limit):
+        check_field(field)
+        column = _QUERY_COLUMNS[field]
+        direction = " DESC" if descending else ""
+        rows = self._connection.execute(
+            f"SELECT name, price, quantity FROM products {where}"
+            f" ORDER BY {column}{direction}, key{direction} LIMIT ?",
+            (*parameters, -1 if limit is None else max(0, limit)),
+        )
+        return [_product(row) for row in rows]
+
+    def products_in_range(self, field, low=None, high=None, limit=None):
+        """Return the products whose ``field`` is between ``low`` and ``high`` using the SQL indexes."""
+        conditions = []
+        parameters = []
+        column = _QUERY_COLUMNS.get(field)
+        if low is not None:
+            conditions.append(f"{column} >= ?")
+            parameters.append(low)
+        if high is not None:
+            conditions.append(f"{column} <= ?")
+            parameters.append(high)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(field, where, parameters, False, limit)
+
+    def top_products(self, field, k):
+        """Return the ``k`` products with the highest ``field``, highest first."""
+        return self._query(field, "", (), True, k)
+
+    def bottom_products(self, field, k):
+        """Return the ``k`` products with the lowest ``field``, lowest first."""
+        return self._query(field, "", (), False, k)
+
+    def iter_rows(self):
+        """Yield (name, price, quantity) tuples straight from a cursor."""
+        return self._connection.execute("SELECT name, price, quantity FROM products ORDER BY id")
+
+    def copy(self):
+        """Return an in-memory InventoryStore with the same products."""
+        return InventoryStore(self)
+
+    def commit(self):
+        """Commit the open transaction."""
+        self._connection.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        """Commit and close the database connection."""
+        self.commit()
+        self._connection.close()
+
+    def statistics(self):
+        """Return (total_value, total_units, max_price, max_quantity) from SQL aggregates."""
+        total_value, total_units, max_price, max_quantity = self._connection.execute(
+            "SELECT COALESCE(SUM(price * quantity), 0), COALESCE(SUM(quantity), 0),"
+            " MAX(price), MAX(quantity) FROM products"
+        ).fetchone()
+        return total_value, total_units, max_price, max_quantity
+
+    def _bulk(self, assignment, parameters, predicate):
+        if predicate is None:
+            cursor = self._connection.execute(f"UPDATE products SET {assignment}", parameters)
+        else:
+            self._connection.create_function("name_matches", 1, lambda name: bool(predicate(name)))
+            cursor = self._connection.execute(
+                f"UPDATE products SET {assignment} WHERE name_matches(name)", parameters
+            )
+        self._wrote()
+        if cursor.rowcount:
+            self._notify_reset()
+        return cursor.rowcount
+
+    def bulk_reprice(self, percent, predicate=None):
+        """Change matching prices by a percentage in one UPDATE statement."""
+        return self._bulk("price = price * ?", (1 + percent / 100,), predicate)
+
+    def bulk_restock(self, delta, predicate=None):
+        """Add ``delta`` units to matching products (never below zero) in one UPDATE."""
+        return self._bulk("quantity = MAX(0, quantity + ?)", (delta,), predicate)
@@ -0,0 +1,164 @@
+import heapq
+import math
+
+from listeners import InventoryListener
+
+
+def recompute_statistics(products):
+    """Compute inventory statistics with a full pass over the products.
+
+    Parameters
+    ----------
+    products : iterable
+        Product records with ``price`` and ``quantity`` keys.
+
+    Returns
+    -------
+    tuple
+        (total_value, total_units, max_price, max_quantity); the maxima are
+        None when there are no products.
+    """
+    total_value = 0
+    total_units = 0
+    max_price = None
+    max_quantity = None
+
+    for product in products:
+        price = product.get("price", 0)
+        quantity = product.get("quantity", 0)
+        total_value += price * quantity
+        total_units += quantity
+        if max_price is None or price > max_price:
+            max_price = price
+        if max_quantity is None or quantity > max_quantity:
+            max_quantity = quantity
+
+    return total_value, total_units, max_price, max_quantity
+
+
+class _MaxTracker:
+    """Max-heap with lazy deletion over one numeric field of the products.
+
+    Stale heap entries (products that were removed or whose value changed)
+    are discarded when they reach the top, so ``max`` is amortized
+    O(log n) and every mutation is O(log n).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._current = {}
+
+    def set(self, key, value):
+        self._current[key] = value
+        heapq.heappush(self._heap, (-value, key))
+        # Keep stale entries from outgrowing the live ones
+        if len(self._heap) > 2 * len(self._current) + 64:
+            self._rebuild()
+
+    def __len__(self):
+        return len(self._current)
+
+    def discard(self, key):
+        self._current.pop(key, None)
+
+    def clear(self):
+        self._heap.clear()
+        self._current.clear()
+
+    def max(self):
+        heap = self._heap
+        current = self._current
+        while heap:
+            negated, key = heap[0]
+            if current.get(key) == -negated:
+                return -negated
+            heapq.heappop(heap)
+        return None
+
+    def _rebuild(self):
+        self._heap = [(-value, key) for key, value in self._current.items()]
+        heapq.heapify(self._heap)
+
+
+class StatisticsEngine(InventoryListener):
+    """Incrementally maintained inventory statistics.
+
+    Keeps running totals of units and stock value, and tracks the highest
+    price and quantity with lazy-deletion heaps, so statistics are read in
+    O(1)/O(log n) instead of scanning the inventory.
+    """
+
+    def __init__(self):
+        self.total_value = 0
+        self.total_units = 0
+        self._prices = _MaxTracker()
+        self._quantities = _MaxTracker()
+
+    def on_insert(self, key, name, price, quantity):
+        self.total_value += price * quantity
+        self.total_units += quantity
+        self._prices.set(key, price)
+        self._quantities.set(key, quantity)
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self.total_value += price * quantity - old_price * old_quantity
+        self.total_units += quantity - old_quantity
+        if price != old_price:
+            self._prices.set(key, price)
+        if quantity != old_quantity:
+            self._quantities.set(key, quantity)
+
+    def on_delete(self, key, name, price, quantity):
+        self.total_value -= price * quantity
+        self.total_units -= quantity
+        self._prices.discard(key)
+        self._quantities.discard(key)
+        if not self._prices:
+            # Drop accumulated floating-point error once the inventory is empty
+            self.total_value = 0
+            self.total_units = 0
+
+    def on_reset(self, store):
+        self.total_value = 0
+        self.total_units = 0
+        self._prices.clear()
+        self._quantities.clear()
+        for product in store:
+            self.on_insert(
+                store.key_for(product["name"]),
+                product["name"],
+                product["price"],
+                product["quantity"],
+            )
+
+    def statistics(self):
+        """Return (total_value, total_units, max_price, max_quantity)."""
+        return (
+            self.total_value,
+            self.total_units,
+            self._prices.max(),
+            self._quantities.max(),
+        )
+
+
+def check_statistics_consistency(store, rel_tol=1e-9):
+    """Compare the store's incremental statistics with a full recompute.
+
+    Parameters
+    ----------
+    store : InventoryStore
+        The inventory whose statistics engine is checked.
+    rel_tol : float, optional
+        Relative tolerance for the floating-point stock value.
+
+    Returns
+    -------
+    tuple
+        (consistent: bool, incremental: tuple, recomputed: tuple)
+    """
+    incremental = store.statistics()
+    recomputed = recompute_statistics(store)
+
+    value_ok = math.isclose(incremental[0], recomputed[0], rel_tol=rel_tol, abs_tol=1e-9)
+    consistent = value_ok and incremental[1:] == recomputed[1:]
+    return consistent, incremental, recomputed
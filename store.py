@@ -0,0 +1,379 @@
+from alerts import LowStockMonitor
+from changes import ChangeTracker
+from listing import InventoryListing
+from query import QueryIndex
+from results import ResultCache
+from search import SearchIndex
+from stats import StatisticsEngine
+from utils import normalize_name, recalc_total_cost
+
+# A bulk change touching more than this share of the products sends
+# listeners one on_reset (a rebuild) instead of one on_update per product
+BULK_RESET_SHARE = 0.1
+
+
+class InventoryStore:
+    """Inventory container with a normalized-name index.
+
+    Products are kept in insertion order inside a dictionary keyed by the
+    normalized product name (``name.strip().capitalize()``), so lookups,
+    inserts and removals run in constant time instead of scanning a list.
+    The store iterates, sizes and tests for emptiness like the plain list
+    it replaces, so ``show_inventory`` and ``ensure_inventory_not_empty``
+    keep working unchanged.
+
+    Every mutation increments ``version`` and is reported to the
+    subscribed listeners (see ``listeners.InventoryListener``). Unless
+    ``incremental_statistics`` is disabled by a subclass, a
+    ``StatisticsEngine`` is subscribed so ``statistics()`` never needs a
+    full pass.
+
+    This class is also the storage backend interface: the columnar and
+    SQLite backends subclass it and keep the same public methods.
+    """
+
+    incremental_statistics = True
+
+    def __init__(self, products=None):
+        self._products = {}
+        self._listeners = []
+        self.version = 0
+        self.stats_engine = None
+        self._search_index = None
+        self._listing = None
+        self._changes = None
+        self._query_index = None
+        self._stock_monitor = None
+        self._results = None
+        if self.incremental_statistics:
+            self.stats_engine = self.subscribe(StatisticsEngine())
+        if products is not None:
+            self.extend(products)
+
+    def __iter__(self):
+        return iter(self._products.values())
+
+    def __len__(self):
+        return len(self._products)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._products
+
+    def __repr__(self):
+        return f"InventoryStore({list(self._products.values())!r})"
+
+    @staticmethod
+    def key_for(name):
+        """Return the index key for a product name."""
+        return normalize_name(name)
+
+    def subscribe(self, listener, sync=True):
+        """Register a listener.
+
+        With ``sync`` (the default) the listener receives an ``on_reset``
+        right away so it starts from the current contents; pass False for
+        listeners that were already built from the same data.
+        """
+        self._listeners.append(listener)
+        if sync and len(self):
+            listener.on_reset(self)
+        return listener
+
+    def unsubscribe(self, listener):
+        """Stop sending mutation events to a listener."""
+        self._listeners.remove(listener)
+
+    @property
+    def search_index(self):
+        """Prefix/fuzzy ``SearchIndex``, built on first use and kept in sync."""
+        if self._search_index is None:
+            self._search_index = self.subscribe(SearchIndex())
+        return self._search_index
+
+    @property
+    def changes(self):
+        """``ChangeTracker`` of the products changed since the last delta export.
+
+        Tracking starts the first time this property is used.
+        """
+        if self._changes is None:
+            self._changes = self.subscribe(ChangeTracker(), sync=False)
+        return self._changes
+
+    @property
+    def stock_monitor(self):
+        """``LowStockMonitor`` of reorder points and low-stock alerts, started on first use.
+
+        Products that are already low when it starts do not raise alerts.
+        """
+        if self._stock_monitor is None:
+            monitor = LowStockMonitor()
+            monitor.rebuild(self)
+            self._stock_monitor = self.subscribe(monitor, sync=False)
+        return self._stock_monitor
+
+    @property
+    def results(self):
+        """``ResultCache`` of read-only query results, invalidated by every mutation."""
+        if self._results is None:
+            self._results = self.subscribe(ResultCache(self), sync=False)
+        return self._results
+
+    @property
+    def query_index(self):
+        """``QueryIndex`` of products sorted by price, quantity and value, built on first use."""
+        if self._query_index is None:
+            self._query_index = self.subscribe(QueryIndex())
+        return self._query_index
+
+    def products_in_range(self, field, low=None, high=None, limit=None):
+        """Return the products whose ``field`` is between ``low`` and ``high``.
+
+        Parameters
+        ----------
+        field : str
+            "price", "quantity" or "value" (price * quantity).
+        low, high : float, optional
+            Inclusive bounds; open-ended when None.
+        limit : int, optional
+            Maximum number of products returned.
+
+        Returns
+        -------
+        list
+            Full product records in ascending ``field`` order (ties by name).
+        """
+        return [self.get(key) for key in self.query_index.range_keys(field, low, high, limit)]
+
+    def top_products(self, field, k):
+        """Return the ``k`` products with the highest ``field``, highest first."""
+        return [self.get(key) for key in self.query_index.top_keys(field, k)]
+
+    def bottom_products(self, field, k):
+        """Return the ``k`` products with the lowest ``field``, lowest first."""
+        return [self.get(key) for key in self.query_index.bottom_keys(field, k)]
+
+    @property
+    def listing(self):
+        """Paged ``InventoryListing`` with cached sort orders."""
+        if self._listing is None:
+            self._listing = InventoryListing(self)
+        return self._listing
+
+    def get(self, name):
+        """Return the product with the given name, or None if not found."""
+        return self._products.get(normalize_name(name))
+
+    def append(self, product):
+        """Add a product dict to the store.
+
+        If a product with the same normalized name already exists, the new
+        product replaces it in place (keeping its position).
+        """
+        key = normalize_name(product["name"])
+        previous = self._products.get(key)
+        self._products[key] = product
+
+        if previous is None:
+            self._notify_insert(key, product["name"], product["price"], product["quantity"])
+        else:
+            self._notify_update(
+                key, product["name"],
+                previous["price"], previous["quantity"],
+                product["price"], product["quantity"],
+            )
+        return product
+
+    def extend(self, products):
+        """Add every product from an iterable of product dicts."""
+        for product in products:
+            self.append(product)
+
+    def update(self, product, price=None, quantity=None):
+        """Change the price and/or quantity of a stored product.
+
+        Parameters
+        ----------
+        product : dict
+            A product returned by ``get``.
+        price : float, optional
+            New unit price; unchanged when None.
+        quantity : int, optional
+            New stock quantity; unchanged when None.
+        """
+        key = normalize_name(product["name"])
+        old_price = product["price"]
+        old_quantity = product["quantity"]
+
+        if price is not None:
+            product["price"] = price
+        if quantity is not None:
+            product["quantity"] = quantity
+        if "total_cost" in product:
+            recalc_total_cost(product)
+
+        self._notify_update(
+            key, product["name"], old_price, old_quantity,
+            product["price"], product["quantity"],
+        )
+        return product
+
+    def rename(self, product, new_name):
+        """Give a stored product a new name.
+
+        Listeners see the rename as a deletion under the old name followed
+        by an insertion under the new one.
+
+        Raises
+        ------
+        ValueError
+            If another product already uses the new name.
+        """
+        old_key = normalize_name(product["name"])
+        new_key = normalize_name(new_name)
+        if new_key != old_key and new_key in self._products:
+            raise ValueError(f"A product named '{new_name}' already exists.")
+
+        old_name = product["name"]
+        del self._products[old_key]
+        product["name"] = new_name
+        self._products[new_key] = product
+
+        self._notify_delete(old_key, old_name, product["price"], product["quantity"])
+        self._notify_insert(new_key, new_name, product["price"], product["quantity"])
+        return product
+
+    def remove(self, product):
+        """Remove a product from the store.
+
+        Raises
+        ------
+        ValueError
+            If the product is not in the store.
+        """
+        key = normalize_name(product["name"])
+        if self._products.get(key) is not product:
+            raise ValueError(f"Product '{product['name']}' is not in the inventory.")
+        del self._products[key]
+
+        self._notify_delete(key, product["name"], product["price"], product["quantity"])
+
+    def clear(self):
+        """Remove every product from the store."""
+        self._products.clear()
+        self._notify_reset()
+
+    def replace(self, products):
+        """Replace every product with those of an iterable of product dicts (an overwrite).
+
+        Listeners are not told about the clear and each insert: they get a
+        single ``on_reset`` once the new products are in (so, for example,
+        the write-ahead log writes one snapshot of the result instead of an
+        empty one followed by a record per product).
+        """
+        listeners = self._listeners
+        self._listeners = []
+        try:
+            self.clear()
+            self.extend(products)
+        finally:
+            # Also after a failure: listeners rebuild from whatever is stored
+            self._listeners = listeners
+            self._notify_reset()
+
+    def iter_rows(self):
+        """Yield (name, price, quantity) tuples in iteration order (used by exports)."""
+        for product in self._products.values():
+            yield product["name"], product["price"], product["quantity"]
+
+    def copy(self):
+        """Return a shallow copy of the store (products are shared)."""
+        return InventoryStore(self._products.values())
+
+    def commit(self):
+        """Make pending writes durable; a no-op for in-memory stores."""
+
+    def close(self):
+        """Release the resources held by the store."""
+        self.commit()
+
+    def bulk_reprice(self, percent, predicate=None):
+        """Change the price of many products by a percentage.
+
+        Parameters
+        ----------
+        percent : float
+            Price change in percent (10 raises prices by 10%, -10 lowers them).
+        predicate : callable, optional
+            ``predicate(name) -> bool`` selecting the products to change;
+            every product when None.
+
+        Returns
+        -------
+        int
+            Number of products repriced.
+        """
+        factor = 1 + percent / 100
+        return self._apply_bulk(lambda price, quantity: (price * factor, quantity), predicate)
+
+    def bulk_restock(self, delta, predicate=None):
+        """Add ``delta`` units (negative to remove) to many products.
+
+        Quantities never drop below zero. ``predicate`` works as in
+        ``bulk_reprice``. Returns the number of products restocked.
+        """
+        return self._apply_bulk(lambda price, quantity: (price, max(0, quantity + delta)), predicate)
+
+    def _apply_bulk(self, change, predicate):
+        """Apply ``change(price, quantity) -> (price, quantity)`` to the matching products.
+
+        One pass over the product dicts, written in place (not vectorized:
+        see ``ColumnarInventoryStore`` for that). When more than
+        ``BULK_RESET_SHARE`` of the products change, listeners get a
+        single ``on_reset``, which is cheaper than one update each.
+        """
+        selected = [
+            (key, product) for key, product in self._products.items()
+            if predicate is None or predicate(product["name"])
+        ]
+        reset = len(selected) > BULK_RESET_SHARE * len(self._products)
+        for key, product in selected:
+            old_price = product["price"]
+            old_quantity = product["quantity"]
+            price, quantity = change(old_price, old_quantity)
+            product["price"] = price
+            product["quantity"] = quantity
+            if "total_cost" in product:
+                product["total_cost"] = price * quantity
+            if not reset:
+                self._notify_update(key, product["name"], old_price, old_quantity, price, quantity)
+        if reset:
+            self._notify_reset()
+        return len(selected)
+
+    def statistics(self):
+        """Return (total_value, total_units, max_price, max_quantity).
+
+        The maxima are None when the store is empty.
+        """
+        return self.stats_engine.statistics()
+
+    def _notify_insert(self, key, name, price, quantity):
+        self.version += 1
+        for listener in self._listeners:
+            listener.on_insert(key, name, price, quantity)
+
+    def _notify_update(self, key, name, old_price, old_quantity, price, quantity):
+        self.version += 1
+        for listener in self._listeners:
+            listener.on_update(key, name, old_price, old_quantity, price, quantity)
+
+    def _notify_delete(self, key, name, price, quantity):
+        self.version += 1
+        for listener in self._listeners:
+            listener.on_delete(key, name, price, quantity)
+
+    def _notify_reset(self):
+        self.version += 1
+        for listener in self._listeners:
+            listener.on_reset(self)
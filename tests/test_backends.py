@@ -0,0 +1,141 @@
+"""Every backend behaves like the in-memory InventoryStore."""
+import math
+import random
+
+import pytest
+
+from columnar import ColumnarInventoryStore
+from lazy_store import LazyInventoryStore
+from sqlite_store import SQLiteInventoryStore
+from store import InventoryStore
+
+BACKENDS = ["columnar", "sqlite", "lazy"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path):
+    if request.param == "columnar":
+        store = ColumnarInventoryStore()
+    elif request.param == "sqlite":
+        store = SQLiteInventoryStore(str(tmp_path / "inventory.db"), batch_size=50)
+    else:
+        store = LazyInventoryStore(str(tmp_path / "inventory.csv"), cache_size=8)
+    yield store
+    store.close()
+
+
+def rows(store):
+    return sorted((product["name"], product["price"], product["quantity"]) for product in store)
+
+
+def product(name, rng):
+    return {"name": name, "price": float(rng.randint(0, 500)) / 4, "quantity": rng.randint(0, 20)}
+
+
+def mutate(store, rng, names):
+    """Apply one random mutation, choosing the product by name."""
+    name = rng.choice(names)
+    existing = store.get(name)
+    roll = rng.random()
+    if existing is None or roll < 0.2:
+        store.append(product(name, rng))
+    elif roll < 0.55:
+        store.update(existing, price=float(rng.randint(0, 500)) / 4, quantity=rng.randint(0, 20))
+    elif roll < 0.7:
+        new_name = rng.choice(names)
+        if store.get(new_name) is None:
+            store.rename(existing, new_name)
+    elif roll < 0.85:
+        store.remove(existing)
+    elif roll < 0.92:
+        store.bulk_restock(rng.randint(-3, 3), lambda product_name: product_name < name)
+    else:
+        store.bulk_reprice(10, lambda product_name: product_name > name)
+
+
+def play(store, seed, steps=400):
+    rng = random.Random(seed)
+    names = [f"Item {i}" for i in range(60)]
+    for _ in range(steps):
+        mutate(store, rng, names)
+        if rng.random() < 0.05:
+            store.commit()
+    return names
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_same_products_after_random_changes(backend, seed):
+    reference = InventoryStore()
+    names = play(reference, seed)
+    play(backend, seed)
+
+    assert rows(backend) == rows(reference)
+    assert len(backend) == len(reference)
+    for name in names:
+        expected = reference.get(name.upper())
+        found = backend.get(name.upper())
+        assert (found is None) == (expected is None)
+        if expected is not None:
+            assert (found["name"], found["price"], found["quantity"]) == (
+                expected["name"], expected["price"], expected["quantity"])
+            assert name in backend
+
+
+def test_same_statistics_and_queries(backend):
+    reference = InventoryStore()
+    play(reference, 7)
+    play(backend, 7)
+
+    expected = reference.statistics()
+    found = backend.statistics()
+    assert math.isclose(found[0], expected[0])
+    assert tuple(found[1:]) == tuple(expected[1:])
+
+    for field in ("price", "quantity", "value"):
+        assert rows(backend.products_in_range(field, 10, 40)) == rows(reference.products_in_range(field, 10, 40))
+        for query in ("top_products", "bottom_products"):
+            value = (lambda p: p["price"] * p["quantity"]) if field == "value" else (lambda p: p[field])
+            assert ([value(p) for p in getattr(backend, query)(field, 5)]
+                    == [value(p) for p in getattr(reference, query)(field, 5)])
+
+
+def test_same_low_stock(backend):
+    reference = InventoryStore()
+    play(reference, 11, steps=150)
+    play(backend, 11, steps=150)
+
+    for store in (reference, backend):
+        store.stock_monitor.set_default_threshold(6)
+        store.stock_monitor.set_threshold("Item 3", 15)
+    assert backend.stock_monitor.low_stock() == reference.stock_monitor.low_stock()
+
+
+def test_replace_and_clear(backend):
+    reference = InventoryStore()
+    play(reference, 5, steps=100)
+    play(backend, 5, steps=100)
+
+    new_products = [{"name": "Pan", "price": 2.0, "quantity": 3}, {"name": "Tea", "price": 4.0, "quantity": 1}]
+    for store in (reference, backend):
+        store.replace(dict(product) for product in new_products)
+    assert rows(backend) == rows(reference) == [("Pan", 2.0, 3), ("Tea", 4.0, 1)]
+
+    backend.clear()
+    assert len(backend) == 0 and rows(backend) == []
+
+
+def test_lazy_store_reopens_with_its_changes(tmp_path):
+    path = str(tmp_path / "inventory.csv")
+    reference = InventoryStore()
+    store = LazyInventoryStore(path, cache_size=4)
+    play(reference, 9)
+    play(store, 9)
+    store.close()
+
+    reopened = LazyInventoryStore(path)
+    try:
+        assert rows(reopened) == rows(reference)
+        reopened.compact()
+        assert rows(reopened) == rows(reference)
+    finally:
+        reopened.close()
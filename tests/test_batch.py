@@ -0,0 +1,61 @@
+"""Error handling of batch command runs."""
+import io
+import json
+
+import pytest
+
+import batch
+from store import InventoryStore
+
+
+def run(store, *lines):
+    output = io.StringIO()
+    counts = batch.run(store, lines, output)
+    return counts, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("line", [
+    "not json",
+    "[1, 2]",
+    '{"op": 5}',
+    '{"op": "nope"}',
+    '{"op": "add", "name": null, "price": 1, "quantity": 1}',
+    '{"op": "add", "name": 7, "price": 1, "quantity": 1}',
+    '{"op": "add", "name": "Pan", "price": true, "quantity": 1}',
+    '{"op": "add", "name": "Pan", "price": [1], "quantity": 1}',
+    '{"op": "add", "name": "Pan", "price": -1, "quantity": 1}',
+    '{"op": "query", "field": "price", "mode": "range", "low": "x"}',
+    '{"op": "query", "field": "price", "mode": "top"}',
+    '{"op": "query", "field": "color", "mode": "top", "k": 3}',
+    '{"op": "low_stock", "limit": "ten"}',
+    '{"op": "import", "path": "missing.csv"}',
+    '{"op": "import", "path": "inventory.csv", "chunk_size": 0}',
+    '{"op": "import", "path": "inventory.csv", "chunk_size": -5}',
+])
+def test_bad_command_fails_alone(line):
+    store = InventoryStore()
+    (executed, failed), results = run(
+        store,
+        line,
+        '{"op": "add", "name": "Pan", "price": 2, "quantity": 3}',
+    )
+
+    assert (executed, failed) == (2, 1)
+    assert results[0]["ok"] is False and results[0]["line"] == 1 and results[0]["error"]
+    assert results[1]["ok"] is True and results[1]["line"] == 2
+    assert [product["name"] for product in store] == ["Pan"]
+
+
+def test_blank_and_comment_lines_are_skipped():
+    (executed, failed), results = run(InventoryStore(), "", "# note", '{"op": "stats"}')
+    assert (executed, failed) == (1, 0)
+    assert results[0]["line"] == 3
+
+
+def test_add_merges_like_the_import():
+    store = InventoryStore()
+    run(store,
+        '{"op": "add", "name": "Pan", "price": 2, "quantity": 3}',
+        '{"op": "add", "name": "pan", "price": "2.5", "quantity": "4"}')
+    product = store.get("Pan")
+    assert (product["price"], product["quantity"]) == (2.5, 7)
@@ -0,0 +1,74 @@
+"""Bulk repricing and restocking."""
+import pytest
+
+from columnar import ColumnarInventoryStore
+from listeners import InventoryListener
+from sqlite_store import SQLiteInventoryStore
+from store import BULK_RESET_SHARE, InventoryStore
+
+
+class Recorder(InventoryListener):
+    def __init__(self):
+        self.updates = 0
+        self.resets = 0
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self.updates += 1
+
+    def on_reset(self, store):
+        self.resets += 1
+
+
+def catalog(count=50):
+    return [{"name": f"Item {i}", "price": 10.0, "quantity": i % 7, "total_cost": 10.0 * (i % 7)}
+            for i in range(count)]
+
+
+def rows(store):
+    return sorted((product["name"], product["price"], product["quantity"]) for product in store)
+
+
+@pytest.mark.parametrize("backend", [InventoryStore, ColumnarInventoryStore, SQLiteInventoryStore])
+def test_backends_agree(backend):
+    reference = InventoryStore(catalog())
+    store = backend(products=catalog())
+    for target in (reference, store):
+        assert target.bulk_reprice(10, lambda name: name.endswith("1")) == 5
+        assert target.bulk_restock(-3) == 50
+
+    assert rows(store) == pytest.approx(rows(reference))
+    assert store.statistics() == pytest.approx(reference.statistics())
+
+
+def test_total_cost_and_statistics_follow():
+    store = InventoryStore(catalog())
+    store.bulk_reprice(50)
+    product = store.get("Item 3")
+    assert product["price"] == 15.0 and product["total_cost"] == 45.0
+    assert store.statistics() == (15.0 * sum(i % 7 for i in range(50)), sum(i % 7 for i in range(50)), 15.0, 6)
+
+
+def test_restock_never_goes_below_zero():
+    store = InventoryStore(catalog())
+    store.bulk_restock(-4)
+    assert min(product["quantity"] for product in store) == 0
+
+
+def test_a_few_changes_are_updates_and_many_are_one_reset():
+    store = InventoryStore(catalog(100))
+    recorder = store.subscribe(Recorder(), sync=False)
+
+    few = int(BULK_RESET_SHARE * 100)
+    store.bulk_restock(1, lambda name: int(name.split()[1]) < few)
+    assert (recorder.updates, recorder.resets) == (few, 0)
+
+    store.bulk_reprice(5)
+    assert (recorder.updates, recorder.resets) == (few, 1)
+
+
+def test_nothing_selected_notifies_nothing():
+    store = InventoryStore(catalog())
+    recorder = store.subscribe(Recorder(), sync=False)
+    version = store.version
+    assert store.bulk_reprice(10, lambda name: False) == 0
+    assert (recorder.updates, recorder.resets, store.version) == (0, 0, version)
@@ -0,0 +1,99 @@
+"""Delta exports and imports of the changes since the last sync point."""
+import csv
+
+import pytest
+
+from data import apply_delta, apply_delta_to_csv, export_delta, export_to_csv
+from store import InventoryStore
+
+
+def rows(store):
+    return sorted((product["name"], product["price"], product["quantity"]) for product in store)
+
+
+def read(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+@pytest.fixture
+def store():
+    store = InventoryStore([
+        {"name": "Apple", "price": 1.0, "quantity": 3},
+        {"name": "Pear", "price": 2.0, "quantity": 4},
+        {"name": "Fig", "price": 3.0, "quantity": 5},
+    ])
+    store.changes.mark_clean()
+    return store
+
+
+def test_delta_holds_only_the_changes(store, tmp_path):
+    store.update(store.get("Apple"), quantity=9)
+    store.remove(store.get("Pear"))
+    store.append({"name": "Kiwi", "price": 4.0, "quantity": 1})
+
+    path = str(tmp_path / "delta.csv")
+    assert export_delta(store, path) == 3
+    assert read(path) == [
+        ["name", "price", "quantity", "op"],
+        ["Apple", "1.0", "9", "upsert"],
+        ["Kiwi", "4.0", "1", "upsert"],
+        ["Pear", "", "", "delete"],
+    ]
+    assert not store.changes
+
+
+def test_delta_round_trip(store, tmp_path):
+    replica = store.copy()
+    store.update(store.get("Fig"), price=3.5)
+    store.remove(store.get("Apple"))
+    path = str(tmp_path / "delta.csv")
+    export_delta(store, path)
+
+    assert apply_delta(replica, path) == (2, 0)
+    assert rows(replica) == rows(store)
+
+
+def test_bulk_change_sends_every_product(store, tmp_path):
+    replica = InventoryStore([{"name": "Old", "price": 1.0, "quantity": 1}])
+    store.bulk_reprice(10)
+    path = str(tmp_path / "delta.csv")
+    export_delta(store, path)
+
+    assert read(path)[1] == ["", "", "", "reset"]
+    apply_delta(replica, path)
+    assert rows(replica) == rows(store)
+
+
+def test_applying_a_delta_to_a_csv_file(store, tmp_path):
+    base = str(tmp_path / "base.csv")
+    export_to_csv(store, base)
+    store.update(store.get("Pear"), quantity=1)
+    delta = str(tmp_path / "delta.csv")
+    export_delta(store, delta)
+
+    assert apply_delta_to_csv(base, delta) == (1, 0)
+    assert sorted(read(base)[1:]) == [["Apple", "1.0", "3"], ["Fig", "3.0", "5"], ["Pear", "2.0", "1"]]
+
+
+def test_delta_deleting_every_product_leaves_a_header_only_file(store, tmp_path):
+    base = str(tmp_path / "base.csv")
+    export_to_csv(store, base)
+    for name in ("Apple", "Pear", "Fig"):
+        store.remove(store.get(name))
+    delta = str(tmp_path / "delta.csv")
+    export_delta(store, delta)
+
+    assert apply_delta_to_csv(base, delta) == (3, 0)
+    assert read(base) == [["name", "price", "quantity"]]
+
+
+def test_failed_write_is_raised(store, tmp_path):
+    base = str(tmp_path / "base.csv")
+    export_to_csv(store, base)
+    store.update(store.get("Pear"), quantity=1)
+    delta = str(tmp_path / "delta.csv")
+    export_delta(store, delta)
+
+    with pytest.raises(OSError):
+        apply_delta_to_csv(base, delta, str(tmp_path / "missing" / "out.csv"))
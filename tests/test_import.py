@@ -0,0 +1,120 @@
+"""CSV imports: streamed merges, overwrites and parallel parsing."""
+import pytest
+
+import data
+from data import ImportCounter, parse_csv_parallel, read_csv_products, stream_import_csv
+from sqlite_store import SQLiteInventoryStore
+from store import InventoryStore
+
+
+def rows(store):
+    return sorted((product["name"], product["price"], product["quantity"]) for product in store)
+
+
+def write_csv(path, lines, tail=b""):
+    with open(path, "wb") as file:
+        file.write(b"name,price,quantity\r\n")
+        for line in lines:
+            file.write(line.encode("utf-8") + b"\r\n")
+        file.write(tail)
+    return str(path)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request):
+    products = [{"name": "Apple", "price": 1.0, "quantity": 3}, {"name": "Item 1", "price": 1.0, "quantity": 1}]
+    if request.param == "sqlite":
+        store = SQLiteInventoryStore(products=products)
+        yield store
+        store.close()
+    else:
+        yield InventoryStore(products)
+
+
+def test_streamed_merge(store, tmp_path):
+    path = write_csv(tmp_path / "in.csv", ["Apple,2.0,4", "Pear,1.5,2", "bad,row", "Pear,1.75,1"])
+    final, loaded, invalid = stream_import_csv(store, path, "merge", chunk_size=2)
+
+    assert final is store
+    assert (loaded, invalid) == (3, 1)
+    assert rows(store) == [("Apple", 2.0, 7), ("Item 1", 1.0, 1), ("Pear", 1.75, 3)]
+
+
+def test_failed_streamed_merge_leaves_the_store_unchanged(store, tmp_path):
+    before = rows(store)
+    lines = [f"Item {i},2.5,3" for i in range(50)] + ["Apple,9.0,9"]
+    path = write_csv(tmp_path / "in.csv", lines, tail=b"Bad\xff\xfe,1,1\r\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        stream_import_csv(store, path, "merge", chunk_size=10)
+    assert rows(store) == before
+
+
+def test_failed_streamed_overwrite_leaves_the_store_unchanged(store, tmp_path):
+    before = rows(store)
+    path = write_csv(tmp_path / "in.csv", ["Pear,1.5,2"], tail=b"Bad\xff,1,1\r\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        stream_import_csv(store, path, "overwrite", chunk_size=1)
+    assert rows(store) == before
+
+
+def test_parallel_parse_matches_sequential(tmp_path, monkeypatch):
+    lines = []
+    for i in range(3000):
+        lines.append(f"Item {i},{i % 97}.5,{i % 13}" if i % 101 else f"Item {i},-1,x")
+    path = write_csv(tmp_path / "in.csv", lines)
+    monkeypatch.setattr(data, "MIN_PARALLEL_RANGE_BYTES", 4096)
+
+    sequential = ImportCounter()
+    expected, expected_invalid = read_csv_products(path, sequential)
+    assert len(data.split_byte_ranges(path, 4)) == 4
+    parallel = ImportCounter()
+    products, invalid = parse_csv_parallel(path, workers=4, counter=parallel)
+
+    assert products == expected
+    assert invalid == expected_invalid == 30
+    assert parallel.errors == sequential.errors
+
+
+def test_streamed_import_holds_one_batch_at_a_time(tmp_path, monkeypatch):
+    rows_in_file = 3 * data.PHASE_ROWS
+    path = write_csv(tmp_path / "in.csv", [f"Item {i},1.5,{i % 9}" for i in range(rows_in_file)])
+    # As if the file were above the parallel threshold on a multi-core machine
+    monkeypatch.setattr(data, "use_parallel_parse", lambda path: True)
+
+    parsed = 0
+    applied = 0
+    held = []
+    reads = data.iter_csv_products
+    merges = data.merge_products
+
+    def counting_reads(file, counter):
+        nonlocal parsed
+        for product in reads(file, counter):
+            parsed += 1
+            yield product
+
+    def counting_merges(store, products):
+        nonlocal applied
+        held.append(parsed - applied)
+        applied += len(products)
+        return merges(store, products)
+
+    def no_parallel(*args, **kwargs):
+        raise AssertionError("a streamed import must not parse the whole file at once")
+
+    monkeypatch.setattr(data, "iter_csv_products", counting_reads)
+    monkeypatch.setattr(data, "merge_products", counting_merges)
+    monkeypatch.setattr(data, "parse_csv_parallel", no_parallel)
+    progress = []
+    final, loaded, _ = stream_import_csv(
+        InventoryStore(), path, "overwrite", chunk_size=1000,
+        progress=lambda loaded, invalid: progress.append(loaded),
+    )
+
+    assert loaded == len(final) == rows_in_file
+    assert max(held) <= 1000
+    # Rows are validated a block ahead of the batches, never the whole file
+    assert len(progress) == 13
+    assert progress[0] == data.PHASE_ROWS and progress[-1] == rows_in_file
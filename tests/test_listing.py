@@ -0,0 +1,74 @@
+"""Paged, sorted listings."""
+import io
+
+import pytest
+
+from store import InventoryStore
+
+
+def catalog():
+    return InventoryStore([
+        {"name": "Drill", "price": 80.0, "quantity": 2, "total_cost": 160.0},
+        {"name": "Bolt", "price": 0.5, "quantity": 400, "total_cost": 200.0},
+        {"name": "Saw", "price": 25.0, "quantity": 4, "total_cost": 100.0},
+        {"name": "Anvil", "price": 150.0, "quantity": 1, "total_cost": 150.0},
+        {"name": "Clamp", "price": 8.0, "quantity": 10, "total_cost": 80.0},
+    ])
+
+
+def names(products):
+    return [product["name"] for product in products]
+
+
+@pytest.mark.parametrize("sort_key, expected", [
+    ("none", ["Drill", "Bolt", "Saw", "Anvil", "Clamp"]),
+    ("name", ["Anvil", "Bolt", "Clamp", "Drill", "Saw"]),
+    ("price", ["Bolt", "Clamp", "Saw", "Drill", "Anvil"]),
+    ("quantity", ["Anvil", "Drill", "Saw", "Clamp", "Bolt"]),
+    ("value", ["Clamp", "Saw", "Anvil", "Drill", "Bolt"]),
+])
+def test_sort_keys(sort_key, expected):
+    listing = catalog().listing
+    assert names(listing.page_products(1, 10, sort_key)) == expected
+    assert names(listing.page_products(1, 10, sort_key, descending=True)) == expected[::-1]
+
+
+def test_pages():
+    listing = catalog().listing
+    assert listing.page_count(2) == 3
+    assert listing.page_count(5) == 1
+    assert names(listing.page_products(2, 2, "name")) == ["Clamp", "Drill"]
+    assert names(listing.page_products(3, 2, "name")) == ["Saw"]
+    assert listing.page_products(4, 2, "name") == []
+    assert InventoryStore().listing.page_count() == 1
+
+
+def test_unknown_sort_key():
+    with pytest.raises(ValueError, match="Unknown sort key"):
+        catalog().listing.order("weight")
+
+
+def test_order_follows_store_changes():
+    store = catalog()
+    listing = store.listing
+    assert listing.order("price")[0] == "Bolt"
+
+    store.update(store.get("Bolt"), price=200.0)
+    assert listing.order("price")[-1] == "Bolt"
+
+    store.append({"name": "Adze", "price": 3.0, "quantity": 1, "total_cost": 3.0})
+    assert listing.order("name")[0] == "Adze"
+    assert listing.order("price")[0] == "Adze"
+
+
+def test_render_and_write_page():
+    listing = catalog().listing
+    text = listing.render_page(2, 2, "name")
+    assert "Product 3:" in text and "Clamp" in text
+    assert "Product 4:" in text and "Drill" in text
+    assert "Anvil" not in text
+    assert text.endswith("-- Page 2 of 3 (5 products) --\n")
+
+    output = io.StringIO()
+    listing.write_page(2, 2, "name", output=output)
+    assert output.getvalue() == text
@@ -0,0 +1,95 @@
+"""Operation metrics and opt-in profiling."""
+import io
+import json
+
+import pytest
+
+from data import export_to_csv, read_csv_products
+from metrics import CAPTURE_CPROFILE, CAPTURE_TRACEMALLOC, LatencyHistogram, MetricsRegistry, registry
+from store import InventoryStore
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) is None
+    for seconds in (0.000_003, 0.000_003, 0.000_003, 0.010):
+        histogram.record(seconds)
+
+    # 3 us falls in the bucket below 4 us, 10 ms in the one below 16384 us
+    assert histogram.buckets[2] == 3
+    assert histogram.buckets[14] == 1
+    assert histogram.percentile(0.5) == 0.000_004
+    assert histogram.percentile(0.99) == 0.010
+    assert (histogram.count, histogram.min, histogram.max) == (4, 0.000_003, 0.010)
+
+
+def test_timed_counts_rows_and_errors():
+    metrics = MetricsRegistry()
+    with metrics.timed("import", rows=5):
+        pass
+    with metrics.timed("import") as counter:
+        counter["rows"] = 7
+    with pytest.raises(KeyError):
+        with metrics.timed("import"):
+            raise KeyError("boom")
+
+    data = metrics.snapshot()["operations"]["import"]
+    assert (data["calls"], data["errors"], data["rows"]) == (3, 1, 12)
+    assert data["p50_seconds"] <= data["p99_seconds"] <= data["max_seconds"]
+
+
+def test_dump_report_and_reset(tmp_path, capsys):
+    metrics = MetricsRegistry()
+    assert metrics.report() == "No operations recorded yet."
+
+    metrics.record("export", 0.002, rows=1000)
+    path = tmp_path / "metrics.json"
+    metrics.dump(str(path))
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["operations"]["export"]["rows_per_second"] == pytest.approx(500_000)
+
+    metrics.dump("-")
+    assert json.loads(capsys.readouterr().out) == saved
+
+    report = metrics.report().splitlines()
+    assert report[0].startswith("Operation")
+    assert report[1].startswith("export") and "500,000" in report[1]
+
+    metrics.reset()
+    assert metrics.snapshot()["operations"] == {}
+
+
+def test_csv_phases_are_recorded(tmp_path):
+    path = str(tmp_path / "inventory.csv")
+    store = InventoryStore([{"name": "Bolt", "price": 0.5, "quantity": 4, "total_cost": 2.0}])
+    registry.reset()
+    assert export_to_csv(store, path)
+    products, _ = read_csv_products(path)
+
+    operations = registry.snapshot()["operations"]
+    assert len(products) == 1
+    assert operations["csv.export.write"]["rows"] == 1
+    assert operations["csv.import.parse"]["calls"] == 1
+
+
+@pytest.mark.parametrize("mode, title", [
+    (CAPTURE_CPROFILE, "cProfile capture"),
+    (CAPTURE_TRACEMALLOC, "tracemalloc capture"),
+])
+def test_capture_profiles_the_next_block_only(mode, title):
+    metrics = MetricsRegistry()
+    metrics.arm_capture(mode)
+    output = io.StringIO()
+    with metrics.capture_armed(output):
+        sorted(range(1000), key=str)
+    assert title in output.getvalue()
+
+    output = io.StringIO()
+    with metrics.capture_armed(output):
+        pass
+    assert output.getvalue() == ""
+
+
+def test_unknown_capture_mode():
+    with pytest.raises(ValueError, match="Unknown capture mode"):
+        MetricsRegistry().arm_capture("perf")
@@ -0,0 +1,132 @@
+"""Recovery of the inventory from its snapshot and write-ahead log."""
+import pytest
+
+import app
+from store import InventoryStore
+from snapshot import Snapshot
+from wal import OP_PUT, WriteAheadLog, read_records
+
+
+@pytest.fixture
+def restore(tmp_path, monkeypatch):
+    """Return a function that restarts the application on files in ``tmp_path``."""
+    monkeypatch.setattr(app, "WAL_PATH", str(tmp_path / "inventory.wal"))
+    monkeypatch.setattr(app, "journal", None)
+
+    def restart():
+        if app.journal is not None:
+            app.journal.close()
+        monkeypatch.setattr(app, "inventory", InventoryStore())
+        return app.restore_inventory(str(tmp_path / "inventory.csv"))
+
+    yield restart
+    if app.journal is not None:
+        app.journal.close()
+
+
+def rows(store):
+    return sorted((product["name"], product["price"], product["quantity"]) for product in store)
+
+
+def test_nothing_to_recover_journals_the_global_inventory(restore):
+    store = restore()
+    assert store is app.inventory
+    assert app.journal.store is store
+
+    store.append({"name": "Apple", "price": 1.5, "quantity": 3})
+    assert rows(restore()) == [("Apple", 1.5, 3)]
+
+
+def test_empty_recovered_store_keeps_later_changes(restore):
+    store = restore()
+    store.remove(store.append({"name": "Apple", "price": 1.5, "quantity": 3}))
+
+    # The log replays to an empty store; it must still be the journaled one
+    store = restore()
+    assert len(store) == 0
+    assert app.journal.store is store
+
+    store.append({"name": "Pear", "price": 2.0, "quantity": 4})
+    assert rows(restore()) == [("Pear", 2.0, 4)]
+
+
+def test_log_is_replayed_after_a_checkpoint(restore):
+    store = restore()
+    store.append({"name": "Apple", "price": 1.5, "quantity": 3})
+    app.journal.checkpoint()
+    store.update(store.get("Apple"), quantity=7)
+    store.append({"name": "Pear", "price": 2.0, "quantity": 4})
+
+    assert rows(restore()) == [("Apple", 1.5, 7), ("Pear", 2.0, 4)]
+
+
+def test_snapshot_is_restored_into_the_default_store(restore):
+    store = restore()
+    for name in ("Pear", "Apple", "Fig"):
+        store.append({"name": name, "price": 1.0, "quantity": 2})
+    store.remove(store.get("Pear"))
+    app.journal.checkpoint()
+
+    restored = restore()
+    assert type(restored) is InventoryStore
+    assert restored.incremental_statistics
+    assert [product["name"] for product in restored] == ["Apple", "Fig"]
+    assert restored.statistics() == (4.0, 4, 1.0, 2)
+
+
+def test_corrupt_snapshot_is_replaced(restore, tmp_path):
+    store = restore()
+    store.append({"name": "Apple", "price": 1.5, "quantity": 3})
+    app.journal.checkpoint()
+    app.journal.close()
+    app.journal = None
+
+    snapshot = tmp_path / "inventory.snap"
+    data = bytearray(snapshot.read_bytes())
+    data[-1] ^= 0xFF
+    snapshot.write_bytes(bytes(data))
+
+    store = restore()
+    assert len(store) == 0
+    store.append({"name": "Pear", "price": 2.0, "quantity": 4})
+    assert rows(restore()) == [("Pear", 2.0, 4)]
+
+
+def test_log_of_a_corrupt_snapshot_is_kept(restore, tmp_path, capsys):
+    store = restore()
+    store.append({"name": "Apple", "price": 1.5, "quantity": 3})
+    app.journal.checkpoint()
+    store.append({"name": "Pear", "price": 2.0, "quantity": 4})
+    app.journal.close()
+    app.journal = None
+
+    snapshot = tmp_path / "inventory.snap"
+    data = bytearray(snapshot.read_bytes())
+    data[-1] ^= 0xFF
+    snapshot.write_bytes(bytes(data))
+
+    assert len(restore()) == 0
+    kept = list(tmp_path.glob("inventory.wal.*.unreplayed"))
+    assert len(kept) == 1
+    assert [(op, name) for _, op, name, _, _ in read_records(str(kept[0]))[0]] == [(OP_PUT, "Pear")]
+    assert "could not be replayed" in capsys.readouterr().out
+    assert read_records(app.WAL_PATH)[0] == []
+
+
+def test_overwrite_is_one_checkpoint(tmp_path):
+    store = InventoryStore([{"name": "Old", "price": 1.0, "quantity": 1}])
+    log_path = str(tmp_path / "inventory.wal")
+    snapshot_path = str(tmp_path / "inventory.snap")
+    journal = WriteAheadLog(store, log_path, snapshot_path, compact_after=2)
+    checkpoints = []
+    checkpoint = journal.checkpoint
+    journal.checkpoint = lambda *args: checkpoints.append(len(store)) or checkpoint(*args)
+
+    store.replace({"name": f"Item {i}", "price": 1.0, "quantity": i} for i in range(5))
+    journal.commit()
+
+    assert checkpoints == [5]
+    assert read_records(log_path)[0] == []
+    with Snapshot(snapshot_path) as snapshot:
+        assert sorted(product["name"] for product in snapshot.products()) == [f"Item {i}" for i in range(5)]
+    journal.close()
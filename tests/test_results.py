@@ -0,0 +1,105 @@
+"""Cache of read-only query results."""
+from results import ResultCache
+from store import InventoryStore
+
+
+def catalog(count=3):
+    return InventoryStore([{"name": f"Item {i}", "price": 1.0, "quantity": i, "total_cost": float(i)}
+                           for i in range(count)])
+
+
+class Counter:
+    def __init__(self, result="result"):
+        self.calls = 0
+        self.result = result
+
+    def __call__(self):
+        self.calls += 1
+        return self.result
+
+
+def test_hit_and_miss():
+    results = catalog().results
+    compute = Counter()
+    assert results.get("stats", (), compute) == "result"
+    assert results.get("stats", (), compute) == "result"
+    assert results.get("stats", ("other",), compute) == "result"
+    assert compute.calls == 2
+    assert results.stats() == {
+        "hits": 1, "misses": 2, "evictions": 0, "invalidations": 0,
+        "size": 2, "maxsize": 256, "hit_rate": 1 / 3,
+    }
+
+
+def test_any_mutation_invalidates():
+    store = catalog()
+    results = store.results
+    compute = Counter()
+    results.get("stats", (), compute)
+
+    store.update(store.get("Item 1"), price=2.0)
+    results.get("stats", (), compute)
+    store.append({"name": "Item 9", "price": 1.0, "quantity": 1, "total_cost": 1.0})
+    results.get("stats", (), compute)
+    store.bulk_restock(1)
+    results.get("stats", (), compute)
+
+    assert compute.calls == 4
+    assert results.stats()["invalidations"] == 3
+    assert len(results) == 1
+
+
+def test_names_only_survives_price_and_quantity_updates():
+    store = catalog()
+    results = store.results
+    compute = Counter(["Item 1"])
+    results.get("prefix", ("item",), compute, names_only=True)
+
+    store.update(store.get("Item 1"), price=5.0, quantity=7)
+    results.get("prefix", ("item",), compute, names_only=True)
+    assert compute.calls == 1
+
+    store.remove(store.get("Item 2"))
+    results.get("prefix", ("item",), compute, names_only=True)
+    store.rename(store.get("Item 0"), "Widget")
+    results.get("prefix", ("item",), compute, names_only=True)
+    store.replace([{"name": "Item 1", "price": 1.0, "quantity": 1, "total_cost": 1.0}])
+    results.get("prefix", ("item",), compute, names_only=True)
+    assert compute.calls == 4
+
+
+def test_least_recently_used_is_evicted():
+    results = ResultCache(catalog(), max_entries=2)
+    compute = Counter()
+    results.get("a", (), compute)
+    results.get("b", (), compute)
+    results.get("a", (), compute)
+    results.get("c", (), compute)
+    assert results.stats()["evictions"] == 1
+
+    results.get("a", (), compute)
+    results.get("b", (), compute)
+    assert compute.calls == 4
+
+
+def test_long_lists_are_not_cached():
+    results = ResultCache(catalog(), max_rows=2)
+    short, long = Counter([1, 2]), Counter([1, 2, 3])
+    for _ in range(2):
+        results.get("short", (), short)
+        results.get("long", (), long)
+    assert short.calls == 1
+    assert long.calls == 2
+    assert len(results) == 1
+
+
+def test_clear_keeps_counters():
+    results = catalog().results
+    compute = Counter()
+    results.get("stats", (), compute)
+    results.get("stats", (), compute)
+    results.clear()
+    results.get("stats", (), compute)
+    assert compute.calls == 2
+    assert results.stats()["hits"] == 1
+    assert results.stats()["misses"] == 2
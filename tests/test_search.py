@@ -0,0 +1,59 @@
+"""Prefix and typo-tolerant name search."""
+from search import bounded_distance, name_grams
+from store import InventoryStore
+
+
+def store_of(*names):
+    return InventoryStore([{"name": name, "price": 1.0, "quantity": 1, "total_cost": 1.0} for name in names])
+
+
+def test_prefix_in_name_order_with_limit():
+    store = store_of("Apple juice", "Banana", "apple", "Apricot", "Avocado")
+    index = store.search_index
+    assert index.prefix("ap") == ["Apple", "Apple juice", "Apricot"]
+    assert index.prefix("  AP", limit=2) == ["Apple", "Apple juice"]
+    assert index.prefix("cherry") == []
+    assert index.prefix("   ") == []
+
+
+def test_fuzzy_orders_by_distance_then_name():
+    store = store_of("Hammer", "Hammers", "Hamper", "Drill", "Banner")
+    index = store.search_index
+    assert index.fuzzy("hammer") == ["Hammer", "Hammers", "Hamper"]
+    assert index.fuzzy("hammer", max_distance=0) == ["Hammer"]
+    assert index.fuzzy("hammer", limit=1) == ["Hammer"]
+    # Short names allow a single edit by default
+    assert index.fuzzy("dril") == ["Drill"]
+    assert index.fuzzy("drl") == []
+
+
+def test_index_follows_store_changes():
+    store = store_of("Bolt", "Nut")
+    index = store.search_index
+
+    store.append({"name": "Bolt cutter", "price": 2.0, "quantity": 1, "total_cost": 2.0})
+    assert index.prefix("bo") == ["Bolt", "Bolt cutter"]
+
+    store.rename(store.get("Bolt"), "Washer")
+    assert index.prefix("bo") == ["Bolt cutter"]
+    assert index.fuzzy("wesher") == ["Washer"]
+
+    store.remove(store.get("Nut"))
+    assert index.sorted_keys() == ["Bolt cutter", "Washer"]
+    assert index.fuzzy("nut") == []
+
+    store.replace([{"name": "Screw", "price": 1.0, "quantity": 1, "total_cost": 1.0}])
+    assert index.sorted_keys() == ["Screw"]
+    assert index.fuzzy("scre") == ["Screw"]
+
+
+def test_bounded_distance():
+    assert bounded_distance("kitten", "sitting", 3) == 3
+    assert bounded_distance("kitten", "sitting", 2) is None
+    assert bounded_distance("same", "same", 0) == 0
+    assert bounded_distance("ab", "abcd", 1) is None
+
+
+def test_name_grams_are_padded_and_lowercase():
+    assert name_grams("Ab") == {"  a", " ab", "ab "}
+    assert name_grams("ab") == name_grams("AB")
@@ -0,0 +1,100 @@
+"""Requests to the asyncio inventory service."""
+import asyncio
+import csv
+import json
+
+import pytest
+
+from service import InventoryService
+from sqlite_store import SQLiteInventoryStore
+from store import InventoryStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request):
+    if request.param == "sqlite":
+        store = SQLiteInventoryStore()
+        yield store
+        store.close()
+    else:
+        yield InventoryStore()
+
+
+def respond(service, *lines):
+    async def main():
+        return [await service.respond(line) for line in lines]
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("line", [
+    "not json",
+    '"text"',
+    '{"id": 1, "op": null}',
+    '{"id": 1, "op": "add", "name": null, "price": 1, "quantity": 1}',
+    '{"id": 1, "op": "query", "field": "price", "mode": "range", "low": "x"}',
+    '{"id": 1, "op": "import", "path": "missing.csv"}',
+    '{"id": 1, "op": "import_feeds", "source": "missing-*.csv"}',
+    '{"id": 1, "op": "validate", "path": "missing.csv"}',
+])
+def test_bad_request_gets_an_error_response(store, line):
+    service = InventoryService(store)
+    bad, good = respond(service, line, '{"id": 2, "op": "add", "name": "Pan", "price": 2, "quantity": 3}')
+
+    assert bad["ok"] is False and bad["error"]
+    if line.startswith("{"):
+        assert bad["id"] == 1
+    assert good == {"id": 2, "ok": True, "op": "add",
+                    "product": {"name": "Pan", "price": 2.0, "quantity": 3, "total_cost": 6.0}}
+    assert len(store) == 1
+
+
+def test_full_pass_reads(store, tmp_path):
+    service = InventoryService(store)
+    stats, export, delta = respond(
+        service,
+        '{"op": "add", "name": "Pan", "price": 2, "quantity": 3}',
+        '{"op": "stats"}',
+        json.dumps({"op": "export", "path": str(tmp_path / "out.csv")}),
+        json.dumps({"op": "export_delta", "path": str(tmp_path / "delta.csv")}),
+    )[1:]
+
+    assert stats["ok"] and stats["total_value"] == 6.0
+    assert export["ok"] and export["products"] == 1
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as file:
+        assert list(csv.reader(file)) == [["name", "price", "quantity"], ["Pan", "2.0", "3"]]
+    assert delta["ok"]
+
+
+def test_export_is_a_snapshot():
+    store = InventoryStore([{"name": "Pan", "price": 2.0, "quantity": 3}])
+    service = InventoryService(store)
+    before = service.shared.snapshot()
+    respond(service, '{"op": "update", "name": "Pan", "quantity": 9}')
+
+    assert before.get("Pan")["quantity"] == 3
+    assert service.shared.snapshot().get("Pan")["quantity"] == 9
+
+
+def test_socket_round_trip():
+    async def main():
+        service = InventoryService(InventoryStore())
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            writer.write(b'{"id": 1, "op": "add", "name": "Pan", "price": 2, "quantity": 3}\n'
+                         b'oops\n'
+                         b'{"id": 2, "op": "search", "name": "pan"}\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(3)]
+        finally:
+            writer.close()
+            await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+        return responses
+
+    added, bad, found = asyncio.run(main())
+    assert added["ok"] and added["id"] == 1
+    assert bad["ok"] is False
+    assert found["ok"] and found["id"] == 2 and found["product"]["name"] == "Pan"
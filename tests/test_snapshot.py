@@ -0,0 +1,98 @@
+"""Binary snapshots written next to the CSV file."""
+import os
+
+import pytest
+
+from columnar import ColumnarInventoryStore
+from data import export_to_csv
+from snapshot import HEADER, Snapshot, SnapshotError, load_snapshot, snapshot_path_for, write_snapshot
+from store import InventoryStore
+
+
+def catalog():
+    return InventoryStore([
+        {"name": "Bolt", "price": 0.5, "quantity": 400, "total_cost": 200.0},
+        {"name": "Crème brûlée torch", "price": 32.25, "quantity": 3, "total_cost": 96.75},
+        {"name": "Saw", "price": 25.0, "quantity": 0, "total_cost": 0.0},
+    ])
+
+
+def rows(inventory):
+    return [(product["name"], product["price"], product["quantity"]) for product in inventory]
+
+
+@pytest.fixture
+def saved(tmp_path):
+    csv_path = str(tmp_path / "inventory.csv")
+    store = catalog()
+    assert export_to_csv(store, csv_path)
+    path = snapshot_path_for(csv_path)
+    write_snapshot(store, path, csv_path, lsn=7)
+    return store, path, csv_path
+
+
+def test_round_trip(saved):
+    store, path, csv_path = saved
+    assert path.endswith("inventory.snap")
+    with Snapshot(path, csv_path) as snapshot:
+        assert (snapshot.count, snapshot.lsn, snapshot.has_source) == (3, 7, True)
+        assert rows(snapshot.products()) == rows(store)
+
+    loaded = load_snapshot(path, csv_path)
+    assert isinstance(loaded, ColumnarInventoryStore)
+    assert rows(loaded) == rows(store)
+
+
+def test_stale_when_the_csv_changes(saved):
+    store, path, csv_path = saved
+    with open(csv_path, "a", encoding="utf-8") as file:
+        file.write("Nail,0.05,1000\n")
+    with pytest.raises(SnapshotError, match="stale"):
+        load_snapshot(path, csv_path)
+
+
+def test_stale_when_only_the_mtime_changes(saved):
+    store, path, csv_path = saved
+    info = os.stat(csv_path)
+    os.utime(csv_path, ns=(info.st_atime_ns, info.st_mtime_ns + 1_000_000_000))
+    with pytest.raises(SnapshotError, match="stale"):
+        load_snapshot(path, csv_path)
+
+
+def test_without_a_source_it_is_never_stale(tmp_path):
+    path = str(tmp_path / "inventory.snap")
+    write_snapshot(catalog(), path)
+    with Snapshot(path, str(tmp_path / "missing.csv")) as snapshot:
+        assert not snapshot.has_source
+        assert snapshot.count == 3
+
+
+def test_corrupt_payload(saved):
+    store, path, csv_path = saved
+    with open(path, "r+b") as file:
+        file.seek(HEADER.size)
+        byte = file.read(1)
+        file.seek(HEADER.size)
+        file.write(bytes([byte[0] ^ 0xFF]))
+    with pytest.raises(SnapshotError, match="checksum"):
+        load_snapshot(path, csv_path)
+
+
+@pytest.mark.parametrize("keep", [HEADER.size - 1, HEADER.size + 8])
+def test_truncated(saved, keep):
+    store, path, csv_path = saved
+    with open(path, "r+b") as file:
+        file.truncate(keep)
+    with pytest.raises(SnapshotError, match="truncated"):
+        load_snapshot(path, csv_path)
+
+
+def test_empty_and_foreign_files(tmp_path):
+    path = tmp_path / "inventory.snap"
+    path.write_bytes(b"")
+    with pytest.raises(SnapshotError, match="empty"):
+        load_snapshot(str(path))
+
+    path.write_bytes(b"name,price,quantity\n" * 10)
+    with pytest.raises(SnapshotError, match="Not an inventory snapshot"):
+        load_snapshot(str(path))
@@ -0,0 +1,76 @@
+"""Transactions and snapshot reads of ConcurrentInventory."""
+import pytest
+
+from listeners import InventoryListener
+from store import InventoryStore
+from versioned import ConcurrentInventory
+
+
+class Recorder(InventoryListener):
+    def __init__(self):
+        self.events = []
+
+    def on_insert(self, key, name, price, quantity):
+        self.events.append("insert")
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self.events.append("update")
+
+    def on_delete(self, key, name, price, quantity):
+        self.events.append("delete")
+
+    def on_reset(self, store):
+        self.events.append("reset")
+
+
+def rows(store):
+    return sorted((product["name"], product["price"], product["quantity"]) for product in store)
+
+
+@pytest.fixture
+def store():
+    return InventoryStore([{"name": "Apple", "price": 1.0, "quantity": 3}, {"name": "Pear", "price": 2.0, "quantity": 4}])
+
+
+def test_changes_are_published_when_the_transaction_ends(store):
+    shared = ConcurrentInventory(store)
+    before = shared.snapshot()
+    with shared.transaction() as writer:
+        writer.update(writer.get("Apple"), quantity=9)
+        assert shared.snapshot() is before
+
+    assert before.get("Apple")["quantity"] == 3
+    assert shared.snapshot().get("Apple")["quantity"] == 9
+    assert shared.snapshot().version == before.version + 1
+
+
+def test_failed_transaction_is_undone_without_a_reset(store):
+    recorder = store.subscribe(Recorder(), sync=False)
+    shared = ConcurrentInventory(store)
+    before = rows(store)
+
+    with pytest.raises(ValueError):
+        with shared.transaction() as writer:
+            writer.update(writer.get("Apple"), price=9.0)
+            writer.rename(writer.get("Pear"), "Plum")
+            writer.append({"name": "Kiwi", "price": 1.0, "quantity": 1})
+            raise ValueError("abort")
+
+    assert rows(store) == before
+    assert rows(shared.snapshot()) == before
+    assert "reset" not in recorder.events
+
+
+def test_failed_overwrite_is_undone(store):
+    shared = ConcurrentInventory(store)
+    before = rows(store)
+
+    with pytest.raises(ValueError):
+        with shared.transaction() as writer:
+            writer.replace([{"name": "Fig", "price": 1.0, "quantity": 1}])
+            raise ValueError("abort")
+
+    assert rows(store) == before
+    with shared.transaction() as writer:
+        writer.append({"name": "Fig", "price": 1.0, "quantity": 1})
+    assert len(shared.snapshot()) == 3
@@ -1,3 +1,31 @@
+import functools
+
+# Distinct raw names remembered by the name validation cache
+NAME_CACHE_SIZE = 65_536
+
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def _checked_name(user_input):
+    """
+    Normalize and check a raw product name once per distinct input.
+    returns:
+    - (normalized name, error message or None)
+    """
+    name = user_input.strip().capitalize()
+
+    if not name:
+        return name, "Product name can’t be empty. Please enter it to continue."
+
+    # Fast path: words separated by plain spaces are checked in one C call
+    if name.replace(" ", "").isalpha():
+        return name, None
+
+    if not all(c.isalpha() or c.isspace() for c in name):
+        return name, "The product name must contain only letters and spaces."
+
+    return name, None
+
+
 def validate_product_name(user_input):
     """
     Validate and normalize a product name.
@@ -6,22 +34,37 @@ def validate_product_name(user_input):
     - Not empty after stripping spaces
     - Only letters and spaces
     - Capitalize first letter
+    Results are kept in a bounded LRU cache, so repeated names (bulk
+    loads) are checked once; see name_cache_stats().
     parameters:
     - user_input: str, raw input from user
     returns:
     - normalized name string
     """
-    name = user_input.strip().capitalize()
-
-    if not name:
-        raise ValueError("Product name can’t be empty. Please enter it to continue.")
+    name, error = _checked_name(user_input)
 
-    if not all(c.isalpha() or c.isspace() for c in name):
-        raise ValueError("The product name must contain only letters and spaces.")
+    if error is not None:
+        raise ValueError(error)
 
     return name
 
 
+def name_cache_stats():
+    """Return the hit/miss counters of the name validation cache.
+    returns:
+    - dict with hits, misses, size, maxsize and hit_rate (None before any lookup)
+    """
+    info = _checked_name.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": info.hits / lookups if lookups else None,
+    }
+
+
 def validate_price(user_input):
     """
     Validate and convert product price.
@@ -77,15 +120,29 @@ def validate_quantity(user_input):
 
 
 
+def normalize_name(name):
+    """Return the normalized form of a product name used for lookups.
+    parameters:
+    - name: str, raw product name
+    returns:
+    - stripped and capitalized name
+    """
+    return name.strip().capitalize()
+
+
 def get_product_by_name(inventory, name):
     """Return the product dict with the given name, or None if not found.
+    Uses the name index when the inventory is an InventoryStore, otherwise
+    falls back to a linear scan.
     parameters:
-    - inventory: list of product dicts
+    - inventory: InventoryStore or list of product dicts
     - name: str, product name to search for
     returns:
     - product dict if found, else None
     """
-    normalized_name = name.strip().capitalize()
+    if hasattr(inventory, "get"):
+        return inventory.get(name)
+    normalized_name = normalize_name(name)
     return next((p for p in inventory if p["name"] == normalized_name), None)
 
 def recalc_total_cost(product):
@@ -0,0 +1,258 @@
+"""Column-at-a-time validation of imported rows.
+
+``validate_rows`` checks a block of CSV rows with the same rules as
+``data.parse_row``, but converts whole columns at once instead of one
+value at a time: the price and quantity columns go through a single
+C-level ``map(float, ...)`` / ``map(int, ...)`` into typed arrays (NumPy
+arrays when NumPy is installed, ``array.array`` otherwise) and the
+negative checks run over the arrays. A block with a bad value is split
+into parts of ``SPLIT_SIZE`` rows and only the parts holding bad rows are
+checked value by value, to find the rows and reasons.
+
+The result keeps the valid rows as typed columns plus, for every row of
+the block, a reason code (``ROW_VALID`` for good rows) and its line
+number in the file, so invalid rows can be reported and fixed.
+"""
+from array import array
+from itertools import compress
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; array.array columns are used instead
+    np = None
+
+# Reason codes of the rows of a block
+ROW_VALID = 0
+ROW_BLANK = 1       # ignored, like a blank line; not an error
+ROW_COLUMNS = 2
+ROW_PRICE = 3
+ROW_QUANTITY = 4
+ROW_NEGATIVE = 5
+ROW_TOO_LARGE = 6
+
+REASONS = {
+    ROW_VALID: "valid",
+    ROW_BLANK: "blank row",
+    ROW_COLUMNS: "expected 3 columns",
+    ROW_PRICE: "price is not a number",
+    ROW_QUANTITY: "quantity is not a whole number",
+    ROW_NEGATIVE: "price and quantity must be >= 0",
+    ROW_TOO_LARGE: "quantity is too large",
+}
+
+# Largest quantity a typed (64-bit) column can hold
+MAX_QUANTITY = 2 ** 63 - 1
+
+# Rows per part when a block with a bad value is split up
+SPLIT_SIZE = 256
+
+
+def _float_column(values):
+    if np is not None:
+        return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+    return array("d", map(float, values))
+
+
+def _int_column(values):
+    if np is not None:
+        return np.fromiter(map(int, values), dtype=np.int64, count=len(values))
+    return array("q", map(int, values))
+
+
+def _concat(columns):
+    if np is not None:
+        return np.concatenate(columns)
+    joined = columns[0]
+    for column in columns[1:]:
+        joined.extend(column)
+    return joined
+
+
+def _join(blocks):
+    """Join consecutive blocks into one."""
+    return ValidatedBlock(
+        [name for block in blocks for name in block.names],
+        _concat([block.prices for block in blocks]),
+        _concat([block.quantities for block in blocks]),
+        [reason for block in blocks for reason in block.reasons],
+        blocks[0].first_line,
+    )
+
+
+def _has_negative(column):
+    """True when a value is negative, or when a NaN makes the minimum unreliable."""
+    if not len(column):
+        return False
+    smallest = column.min() if np is not None else min(column)
+    return not smallest >= 0
+
+
+class ValidatedBlock:
+    """Outcome of validating one block of rows.
+
+    Attributes
+    ----------
+    names : list of str
+        Stripped names of the valid rows.
+    prices, quantities : array
+        Typed columns (float64 / int64) of the valid rows.
+    reasons : list of int
+        One reason code per input row (``ROW_VALID`` for valid rows).
+    first_line : int
+        Line number of the first input row.
+    """
+
+    __slots__ = ("names", "prices", "quantities", "reasons", "first_line")
+
+    def __init__(self, names, prices, quantities, reasons, first_line):
+        self.names = names
+        self.prices = prices
+        self.quantities = quantities
+        self.reasons = reasons
+        self.first_line = first_line
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def invalid(self):
+        """Number of invalid rows (blank rows are not counted)."""
+        return sum(1 for reason in self.reasons if reason > ROW_BLANK)
+
+    def invalid_mask(self):
+        """Return one bool per input row, True for invalid rows."""
+        mask = [reason > ROW_BLANK for reason in self.reasons]
+        return np.array(mask, dtype=bool) if np is not None else mask
+
+    def errors(self):
+        """Yield (line number, reason text) for every invalid row."""
+        for offset, reason in enumerate(self.reasons):
+            if reason > ROW_BLANK:
+                yield self.first_line + offset, REASONS[reason]
+
+    def rows(self):
+        """Return the valid rows as (name, price, quantity) tuples of Python values."""
+        return list(zip(self.names, self.prices.tolist(), self.quantities.tolist()))
+
+    def products(self):
+        """Return the valid rows as product dicts."""
+        return [
+            {"name": name, "price": price, "quantity": quantity}
+            for name, price, quantity in zip(self.names, self.prices.tolist(), self.quantities.tolist())
+        ]
+
+
+def _check_row(name, price_text, quantity_text):
+    """Reason code and typed values of one row (the slow path)."""
+    try:
+        price = float(price_text)
+    except ValueError:
+        return ROW_PRICE, None, None
+    try:
+        quantity = int(quantity_text)
+    except ValueError:
+        return ROW_QUANTITY, None, None
+    if price < 0 or quantity < 0:
+        return ROW_NEGATIVE, None, None
+    if quantity > MAX_QUANTITY:
+        return ROW_TOO_LARGE, None, None
+    return ROW_VALID, price, quantity
+
+
+def validate_columns(names, prices, quantities, first_line=1):
+    """Validate three parallel columns of raw strings.
+
+    Parameters
+    ----------
+    names, prices, quantities : sequence of str
+        Raw column values, one per row.
+    first_line : int, optional
+        Line number of the first row, for the error report.
+
+    Returns
+    -------
+    ValidatedBlock
+    """
+    names = list(map(str.strip, names))
+    count = len(names)
+
+    if all(names):
+        try:
+            price_column = _float_column(prices)
+            quantity_column = _int_column(quantities)
+        except (ValueError, OverflowError):
+            pass
+        else:
+            if not _has_negative(price_column) and not _has_negative(quantity_column):
+                return ValidatedBlock(names, price_column, quantity_column, [ROW_VALID] * count, first_line)
+
+    if count > SPLIT_SIZE:
+        # Split the block so only the parts holding bad rows go row by row
+        return _join([
+            validate_columns(
+                names[start:start + SPLIT_SIZE],
+                prices[start:start + SPLIT_SIZE],
+                quantities[start:start + SPLIT_SIZE],
+                first_line + start,
+            )
+            for start in range(0, count, SPLIT_SIZE)
+        ])
+
+    # Slow path: find the bad rows one by one
+    reasons = []
+    good_prices = []
+    good_quantities = []
+    for name, price_text, quantity_text in zip(names, prices, quantities):
+        if not name and not price_text.strip() and not quantity_text.strip():
+            reasons.append(ROW_BLANK)
+            continue
+        reason, price, quantity = _check_row(name, price_text, quantity_text)
+        reasons.append(reason)
+        if reason == ROW_VALID:
+            good_prices.append(price)
+            good_quantities.append(quantity)
+
+    valid = [reason == ROW_VALID for reason in reasons]
+    return ValidatedBlock(
+        list(compress(names, valid)),
+        _float_column(good_prices),
+        _int_column(good_quantities),
+        reasons,
+        first_line,
+    )
+
+
+_COLUMN_GETTERS = (itemgetter(0), itemgetter(1), itemgetter(2))
+
+
+def _columns(rows):
+    """Split 3-column rows into (names, prices, quantities) lists."""
+    return [list(map(getter, rows)) for getter in _COLUMN_GETTERS]
+
+
+def validate_rows(rows, first_line=1):
+    """Validate a block of CSV rows (lists of strings) with the rules of ``data.parse_row``.
+
+    Rows that do not have exactly 3 columns are blank (every column
+    empty) or invalid (``ROW_COLUMNS``); the others are validated by
+    column with ``validate_columns``.
+
+    Returns
+    -------
+    ValidatedBlock
+    """
+    if all(len(row) == 3 for row in rows):
+        return validate_columns(*_columns(rows), first_line)
+
+    # Mixed widths: validate the 3-column rows, then merge the reasons back
+    block = validate_columns(*_columns([row for row in rows if len(row) == 3]), first_line)
+
+    reasons = iter(block.reasons)
+    block.reasons = [
+        next(reasons) if len(row) == 3
+        else ROW_BLANK if all(col.strip() == "" for col in row)
+        else ROW_COLUMNS
+        for row in rows
+    ]
+    return block
@@ -0,0 +1,271 @@
+"""Thread-safe inventory access with point-in-time snapshot reads.
+
+``ConcurrentInventory`` wraps an ``InventoryStore`` for use from several
+threads:
+
+- Writers run inside ``transaction()``. A writer lock serializes them,
+  and their changes become visible to readers all at once when the
+  transaction ends. A failed transaction is rolled back: the products
+  it touched are put back one by one, so other listeners of the store
+  (journal, change tracking, statistics) see ordinary changes, not a
+  reset.
+- Readers call ``snapshot()`` and get an immutable
+  ``InventorySnapshot``. It never changes and never takes the writer
+  lock, so statistics, listings and exports always see one consistent
+  version of the inventory.
+
+Snapshots are maintained copy-on-write. The products are split into
+``BUCKETS`` dicts by name hash. A transaction copies only the buckets it
+touches, so a single change copies about 1/``BUCKETS`` of the inventory,
+and publishing a new version is a single reference swap.
+"""
+import contextlib
+import threading
+
+from data import merge_products, read_csv_products
+from listeners import InventoryListener
+from listing import InventoryListing
+from stats import recompute_statistics
+from store import InventoryStore
+from utils import normalize_name
+
+# Copy-on-write granularity: a change copies one bucket of the snapshot
+BUCKETS = 256
+
+
+def _bucket_of(key):
+    return hash(key) % BUCKETS
+
+
+class SnapshotListing(InventoryListing):
+    """Listing over a snapshot; name order is sorted from the snapshot itself."""
+
+    def order(self, sort_key="none", descending=False):
+        if sort_key != "name":
+            return super().order(sort_key, descending)
+
+        cached = self._orders.get((sort_key, descending))
+        if cached is None:
+            keys = sorted(self.store.key_for(product["name"]) for product in self.store)
+            if descending:
+                keys.reverse()
+            cached = self._orders[(sort_key, descending)] = (self.store.version, keys)
+        return cached[1]
+
+
+class InventorySnapshot:
+    """Immutable, point-in-time view of an inventory.
+
+    Iterates, sizes and looks products up like a store, so it can be
+    passed to ``export_to_csv`` or ``recompute_statistics``. Products are
+    private copies and must not be modified. Statistics and sort orders
+    are computed once per snapshot and cached.
+    """
+
+    __slots__ = ("version", "_buckets", "_count", "_statistics", "_listing")
+
+    def __init__(self, version, buckets, count):
+        self.version = version
+        self._buckets = buckets
+        self._count = count
+        self._statistics = None
+        self._listing = None
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket.values()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __repr__(self):
+        return f"InventorySnapshot(version={self.version}, {self._count} products)"
+
+    key_for = staticmethod(normalize_name)
+
+    def get(self, name):
+        """Return the product with the given name, or None if not found."""
+        key = normalize_name(name)
+        return self._buckets[_bucket_of(key)].get(key)
+
+    def statistics(self):
+        """Return (total_value, total_units, max_price, max_quantity) for this version."""
+        if self._statistics is None:
+            self._statistics = recompute_statistics(self)
+        return self._statistics
+
+    @property
+    def listing(self):
+        """Paged listing of this version (see ``InventoryListing``)."""
+        if self._listing is None:
+            self._listing = SnapshotListing(self)
+        return self._listing
+
+
+class ConcurrentInventory(InventoryListener):
+    """Reader-writer access to an inventory store from several threads.
+
+    Parameters
+    ----------
+    store : InventoryStore, optional
+        The store to guard (a new empty one by default). After wrapping,
+        it must only be mutated inside ``transaction()``.
+    """
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else InventoryStore()
+        self._write_lock = threading.RLock()
+        self._working = None
+        self._copied = set()
+        self._touched = set()
+        self._count = 0
+        self._snapshot = InventorySnapshot(0, tuple({} for _ in range(BUCKETS)), 0)
+        # A non-empty store sends on_reset right away, publishing version 1
+        self.store.subscribe(self)
+
+    def snapshot(self):
+        """Return the latest published snapshot (never blocks)."""
+        return self._snapshot
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Hold the writer lock and yield the store to mutate.
+
+        Readers keep seeing the previous snapshot until the block ends,
+        then see every change at once. If the block raises, the store is
+        restored to the previous snapshot and the exception propagates.
+        Transactions may be nested; only the outermost one publishes.
+        """
+        with self._write_lock:
+            if self._working is not None:
+                yield self.store
+                return
+
+            self._begin()
+            try:
+                yield self.store
+            except BaseException:
+                self._rollback()
+                raise
+            self._publish()
+
+    def merge(self, products):
+        """Merge products (see ``data.merge_products``) in one transaction."""
+        with self.transaction() as store:
+            merge_products(store, products)
+
+    def import_csv(self, path, action="merge"):
+        """Apply a CSV file in one transaction.
+
+        The file is parsed before the writer lock is taken, so readers and
+        other writers only wait for the apply step.
+
+        Returns
+        -------
+        tuple
+            (loaded_rows, invalid_rows)
+
+        Raises
+        ------
+        CSVFormatError, OSError
+            If the file cannot be read; the inventory is unchanged.
+        """
+        products, invalid_rows = read_csv_products(path)
+        if action == "overwrite" and products:
+            staging = merge_products(InventoryStore(), products)
+            with self.transaction() as store:
+                store.replace(staging)
+        elif action == "merge":
+            self.merge(products)
+        return len(products), invalid_rows
+
+    def _begin(self):
+        self._working = list(self._snapshot._buckets)
+        self._copied = set()
+        self._touched = set()
+        self._count = len(self._snapshot)
+
+    def _publish(self):
+        if self._working is None:
+            self._begin()
+        self._snapshot = InventorySnapshot(self._snapshot.version + 1, tuple(self._working), self._count)
+        self._working = None
+
+    def _rollback(self):
+        published = self._snapshot
+        touched = self._touched
+        if touched is None:
+            # The store was reset: every product may differ
+            touched = {normalize_name(product["name"]) for product in published}
+            touched.update(normalize_name(product["name"]) for product in self.store)
+
+        # Stop following events while the touched products are put back
+        self._working = None
+        self._touched = set()
+        self.store.unsubscribe(self)
+        try:
+            for key in touched:
+                before = published.get(key)
+                current = self.store.get(key)
+                if before is None:
+                    if current is not None:
+                        self.store.remove(current)
+                elif current is None or any(current[field] != before[field] for field in before):
+                    self.store.append(dict(before))
+        finally:
+            self.store.subscribe(self, sync=False)
+
+    def _bucket(self, key):
+        """Return the working bucket for ``key``, copying it on first write."""
+        if self._working is None:
+            # A change made outside transaction(): publish it on its own
+            self._begin()
+        index = _bucket_of(key)
+        if index not in self._copied:
+            self._working[index] = dict(self._working[index])
+            self._copied.add(index)
+        if self._touched is not None:
+            self._touched.add(key)
+        return self._working[index]
+
+    def on_insert(self, key, name, price, quantity):
+        implicit = self._working is None
+        self._bucket(key)[key] = {"name": name, "price": price, "quantity": quantity}
+        self._count += 1
+        if implicit:
+            self._publish()
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        implicit = self._working is None
+        self._bucket(key)[key] = {"name": name, "price": price, "quantity": quantity}
+        if implicit:
+            self._publish()
+
+    def on_delete(self, key, name, price, quantity):
+        implicit = self._working is None
+        self._bucket(key).pop(key, None)
+        self._count -= 1
+        if implicit:
+            self._publish()
+
+    def on_reset(self, store):
+        implicit = self._working is None
+        buckets = [{} for _ in range(BUCKETS)]
+        count = 0
+        for product in store:
+            key = normalize_name(product["name"])
+            buckets[_bucket_of(key)][key] = {
+                "name": product["name"],
+                "price": product["price"],
+                "quantity": product["quantity"],
+            }
+            count += 1
+        self._working = buckets
+        self._copied = set(range(BUCKETS))
+        self._touched = None
+        self._count = count
+        if implicit:
+            self._publish()
@@ -0,0 +1,272 @@
+"""Append-only write-ahead log for inventory mutations.
+
+Every change to the inventory is appended to the log as a small binary
+record, so saving costs as much as the change itself instead of a full
+CSV rewrite, and edits survive a crash. The log is periodically
+compacted into a binary snapshot (see snapshot.py); recovery loads the
+snapshot and replays the records written after it.
+
+Record framing (little endian)::
+
+    length  uint32   size of the body
+    crc32   uint32   checksum of the body
+    body    lsn uint64, op byte, payload
+            PUT     price float64, quantity int64, UTF-8 name
+            DELETE  UTF-8 name
+
+A torn or corrupt tail (crash in the middle of a write) is detected by
+the checksum and cut off when the log is reopened.
+"""
+import os
+import struct
+import zlib
+
+from listeners import InventoryListener
+from snapshot import Snapshot, write_snapshot
+
+FRAME = struct.Struct("<II")
+RECORD = struct.Struct("<QB")
+PUT_VALUES = struct.Struct("<dq")
+
+OP_PUT = 1
+OP_DELETE = 2
+
+# fsync policies
+FSYNC_ALWAYS = "always"  # write and fsync every record on its own
+FSYNC_GROUP = "group"    # write and fsync once per group commit
+FSYNC_NEVER = "never"    # write per group commit, let the OS flush
+
+DEFAULT_GROUP_SIZE = 256
+DEFAULT_COMPACT_AFTER = 100_000
+
+
+def encode_record(lsn, op, name, price=0.0, quantity=0):
+    """Return the framed bytes of one log record."""
+    body = RECORD.pack(lsn, op)
+    if op == OP_PUT:
+        body += PUT_VALUES.pack(price, quantity)
+    body += name.encode("utf-8")
+    return FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def read_records(path):
+    """Read every intact record from a log file.
+
+    Returns
+    -------
+    tuple
+        (records, valid_end) where records is a list of
+        (lsn, op, name, price, quantity) tuples and valid_end is the byte
+        offset right after the last intact record.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return [], 0
+
+    records = []
+    position = 0
+    while position + FRAME.size <= len(data):
+        length, crc = FRAME.unpack_from(data, position)
+        start = position + FRAME.size
+        body = data[start:start + length]
+        if len(body) != length or length < RECORD.size or zlib.crc32(body) != crc:
+            break
+
+        lsn, op = RECORD.unpack_from(body, 0)
+        if op == OP_PUT:
+            price, quantity = PUT_VALUES.unpack_from(body, RECORD.size)
+            name = body[RECORD.size + PUT_VALUES.size:].decode("utf-8")
+        else:
+            price, quantity = 0.0, 0
+            name = body[RECORD.size:].decode("utf-8")
+
+        records.append((lsn, op, name, price, quantity))
+        position = start + length
+
+    return records, position
+
+
+def apply_record(store, op, name, price, quantity):
+    """Apply one replayed log record to a store."""
+    existing = store.get(name)
+    if op == OP_PUT:
+        if existing is None:
+            store.append({"name": name, "price": price, "quantity": quantity})
+        else:
+            store.update(existing, price=price, quantity=quantity)
+    elif existing is not None:
+        store.remove(existing)
+
+
+def set_aside(log_path):
+    """Move a log that cannot be replayed out of the way, so a new log can start.
+
+    Used when its snapshot is unusable: the records only make sense on
+    top of that snapshot, but they are the only copy of those changes.
+
+    Returns
+    -------
+    tuple
+        (kept_path, records) where kept_path is None when the log held
+        no intact record (it is then left to be truncated).
+    """
+    records, _ = read_records(log_path)
+    if not records:
+        return None, 0
+
+    kept_path = f"{log_path}.{records[0][0]}-{records[-1][0]}.unreplayed"
+    os.replace(log_path, kept_path)
+    return kept_path, len(records)
+
+
+def recover(store_factory, snapshot_path, log_path, source_path=None):
+    """Rebuild the inventory from the last snapshot plus the log.
+
+    Parameters
+    ----------
+    store_factory : callable
+        Builds the store: called with the snapshot's product dicts, or
+        without arguments (an empty store) when there is no snapshot.
+        The store class itself works (``InventoryStore``).
+    snapshot_path : str
+        Snapshot written by the last checkpoint or save.
+    log_path : str
+        Write-ahead log.
+    source_path : str, optional
+        CSV file the snapshot mirrors. When the log is empty, a snapshot
+        taken at save time must still match this file (see snapshot.py).
+
+    Returns
+    -------
+    tuple
+        (store, last_lsn), or (None, 0) when neither file has any data.
+
+    Raises
+    ------
+    SnapshotError
+        If the snapshot is corrupt or stale.
+    """
+    records, _ = read_records(log_path)
+    store = None
+    last_lsn = 0
+
+    if os.path.exists(snapshot_path):
+        # Pending log records legitimately make the state differ from the CSV
+        with Snapshot(snapshot_path, None if records else source_path) as snapshot:
+            store = store_factory(snapshot.products())
+            last_lsn = snapshot.lsn
+
+    if store is None:
+        if not records:
+            return None, 0
+        store = store_factory()
+
+    for lsn, op, name, price, quantity in records:
+        if lsn > last_lsn:
+            apply_record(store, op, name, price, quantity)
+            last_lsn = lsn
+
+    return store, last_lsn
+
+
+class WriteAheadLog(InventoryListener):
+    """Listener that journals every mutation of a store.
+
+    Parameters
+    ----------
+    store : InventoryStore
+        The inventory to journal; the log subscribes to it.
+    log_path : str
+        Append-only log file.
+    snapshot_path : str
+        Snapshot written by ``checkpoint``.
+    fsync_policy : str, optional
+        ``FSYNC_ALWAYS``, ``FSYNC_GROUP`` (default) or ``FSYNC_NEVER``.
+    group_size : int, optional
+        Pending records that trigger an automatic group commit.
+    compact_after : int, optional
+        Log records after which a commit also compacts the log into a
+        new snapshot.
+    last_lsn : int, optional
+        Sequence number returned by ``recover``.
+    """
+
+    def __init__(self, store, log_path, snapshot_path, fsync_policy=FSYNC_GROUP,
+                 group_size=DEFAULT_GROUP_SIZE, compact_after=DEFAULT_COMPACT_AFTER, last_lsn=0):
+        if fsync_policy not in (FSYNC_ALWAYS, FSYNC_GROUP, FSYNC_NEVER):
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+
+        self.store = store
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path
+        self.fsync_policy = fsync_policy
+        self.group_size = 1 if fsync_policy == FSYNC_ALWAYS else group_size
+        self.compact_after = compact_after
+        self.lsn = last_lsn
+
+        records, valid_end = read_records(log_path)
+        if records:
+            self.lsn = max(self.lsn, records[-1][0])
+        self._logged = len(records)
+        self._pending = []
+
+        self._file = open(log_path, "ab")
+        if self._file.tell() != valid_end:
+            # Cut off a torn record left by a crash
+            self._file.truncate(valid_end)
+
+        store.subscribe(self, sync=False)
+
+    def _append(self, op, name, price=0.0, quantity=0):
+        self.lsn += 1
+        self._pending.append(encode_record(self.lsn, op, name, price, quantity))
+        if len(self._pending) >= self.group_size:
+            self.commit()
+
+    def on_insert(self, key, name, price, quantity):
+        self._append(OP_PUT, name, price, quantity)
+
+    def on_update(self, key, name, old_price, old_quantity, price, quantity):
+        self._append(OP_PUT, name, price, quantity)
+
+    def on_delete(self, key, name, price, quantity):
+        self._append(OP_DELETE, name)
+
+    def on_reset(self, store):
+        # A bulk change is cheaper to persist as a fresh snapshot
+        self.checkpoint()
+
+    def commit(self):
+        """Write the pending records (one group commit) and apply the fsync policy."""
+        if not self._pending:
+            return
+
+        self._file.write(b"".join(self._pending))
+        self._file.flush()
+        if self.fsync_policy != FSYNC_NEVER:
+            os.fsync(self._file.fileno())
+        self._logged += len(self._pending)
+        self._pending.clear()
+
+        if self._logged >= self.compact_after:
+            self.checkpoint()
+
+    def checkpoint(self, source_path=None):
+        """Compact the log: write a full snapshot and empty the log.
+
+        ``source_path`` records the CSV file the snapshot mirrors (used
+        when the inventory has just been saved to CSV).
+        """
+        self._pending.clear()
+        write_snapshot(self.store, self.snapshot_path, source_path=source_path, lsn=self.lsn)
+        self._file.truncate(0)
+        self._file.seek(0)
+        self._logged = 0
+
+    def close(self):
+        """Commit pending records, stop journaling and close the log."""
+        self.commit()
+        self.store.unsubscribe(self)
+        self._file.close()